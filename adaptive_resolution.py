@@ -0,0 +1,193 @@
+# ═══════════════════════════════════════════════════════════════
+# WildGuard - Adaptive Input Resolution
+# Picks the YOLO inference size per frame and per camera from recent
+# detection sizes and risk levels
+# ═══════════════════════════════════════════════════════════════
+
+import json
+import math
+import os
+import time
+from collections import deque
+
+from detections import is_animal
+
+STRIDE = 32  # YOLOv8 input sizes must be multiples of the max stride
+HIGH_RISK_LEVELS = ('WARNING', 'CRITICAL')
+MIN_BOX_FRACTION = 1e-3  # Degenerate (zero-width) boxes count as this small
+
+
+def round_to_stride(size):
+    return int(math.ceil(size / STRIDE) * STRIDE)
+
+
+# ═══════════════════════════════════════════════════════════════
+# RESOLUTION POLICY
+# ═══════════════════════════════════════════════════════════════
+
+class ResolutionPolicy:
+    """
+    Chooses an input size so the smallest recently seen animal still spans
+    at least target_box_px pixels at inference scale. Large nearby animals
+    allow the size to drop towards min_size; cameras with nothing recent
+    use idle_size, and recent WARNING/CRITICAL risk keeps at least
+    risk_min_size so an animal near the road is not lost.
+    """
+    def __init__(self, min_size=320, max_size=1280, idle_size=640, risk_min_size=640,
+                 target_box_px=48, history=8):
+        self.min_size = round_to_stride(min_size)
+        self.max_size = round_to_stride(max_size)
+        self.idle_size = round_to_stride(idle_size)
+        self.risk_min_size = round_to_stride(risk_min_size)
+        self.target_box_px = target_box_px
+        self.history = history
+        self.cameras = {}  # camera_id -> deque of (smallest box fraction or None, high risk)
+
+    def choose(self, camera_id):
+        recent = self.cameras.get(camera_id)
+        if not recent:
+            return self.idle_size
+
+        fractions = [fraction for fraction, _ in recent if fraction is not None]
+        if fractions:
+            size = self.target_box_px / max(min(fractions), MIN_BOX_FRACTION)
+        else:
+            size = self.idle_size
+
+        if any(high_risk for _, high_risk in recent):
+            size = max(size, self.risk_min_size)
+
+        return min(max(round_to_stride(size), self.min_size), self.max_size)
+
+    def observe(self, camera_id, detections, image_shape, alert_levels=()):
+        """
+        Record one frame's detections; only animals count, and box size is
+        measured relative to the longest image side since that is what
+        imgsz scales. alert_levels are parallel to detections.
+        """
+        recent = self.cameras.get(camera_id)
+        if recent is None:
+            recent = self.cameras[camera_id] = deque(maxlen=self.history)
+
+        longest = max(image_shape[:2])
+        animals = [i for i, det in enumerate(detections) if is_animal(det['class'])]
+        fractions = [
+            max(det['bbox'][2] - det['bbox'][0], det['bbox'][3] - det['bbox'][1], 0) / longest
+            for det in (detections[i] for i in animals)
+        ]
+        smallest = min(fractions) if fractions else None
+        levels = list(alert_levels)
+        high_risk = any(i < len(levels) and levels[i] in HIGH_RISK_LEVELS for i in animals)
+        recent.append((smallest, high_risk))
+
+    # ── Persistence ───────────────────────────────────────────
+
+    def save(self, path):
+        """
+        Write the recent observations so one-shot processes (detect_cli)
+        can continue from the previous request
+        """
+        state = {camera_id: [list(entry) for entry in recent] for camera_id, recent in self.cameras.items()}
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+
+    def load(self, path):
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return self
+        for camera_id, recent in state.items():
+            self.cameras[camera_id] = deque((tuple(entry) for entry in recent), maxlen=self.history)
+        return self
+
+
+# ═══════════════════════════════════════════════════════════════
+# ADAPTIVE DETECTOR
+# ═══════════════════════════════════════════════════════════════
+
+class AdaptiveDetector:
+    """
+    Wraps a WildGuardDetector-style object (detect(image, imgsz=...,
+    camera_id=...)) and runs each frame at the size chosen by the policy.
+
+    Latency, detection count and mean confidence are tracked per size.
+    With audit_every > 0, every Nth frame is also run at max_size and the
+    detection count compared, giving a recall estimate for the reduced sizes.
+    """
+    def __init__(self, detector, policy=None, assessor=None, audit_every=0, log_every=100):
+        self.detector = detector
+        self.policy = policy or ResolutionPolicy()
+        self.assessor = assessor
+        self.audit_every = audit_every
+        self.log_every = log_every
+        self.frames = 0
+        self.size_stats = {}
+        self.audit = {'frames': 0, 'detections': 0, 'reference_detections': 0}
+
+    def detect(self, image, imgsz=None, camera_id=None):
+        size = imgsz or self.policy.choose(camera_id)
+
+        start = time.perf_counter()
+        detections = self.detector.detect(image, imgsz=size, camera_id=camera_id)
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        levels = ()
+        if self.assessor is not None:
+            levels = [self.assessor.assess_risk(det['bbox'], image.shape, camera_id=camera_id)['alert_level']
+                      for det in detections]
+        self.policy.observe(camera_id, detections, image.shape, levels)
+        self._record(size, latency_ms, detections)
+
+        self.frames += 1
+        if self.audit_every and self.frames % self.audit_every == 0 and size < self.policy.max_size:
+            reference = self.detector.detect(image, imgsz=self.policy.max_size, camera_id=camera_id)
+            self.audit['frames'] += 1
+            self.audit['detections'] += len(detections)
+            self.audit['reference_detections'] += len(reference)
+
+        if self.log_every and self.frames % self.log_every == 0:
+            self.log_report()
+
+        return detections
+
+    def _record(self, size, latency_ms, detections):
+        stats = self.size_stats.get(size)
+        if stats is None:
+            stats = self.size_stats[size] = {'frames': 0, 'latency_ms': 0.0, 'detections': 0, 'confidence': 0.0}
+        stats['frames'] += 1
+        stats['latency_ms'] += latency_ms
+        stats['detections'] += len(detections)
+        stats['confidence'] += sum(det['confidence'] for det in detections)
+
+    def report(self):
+        sizes = {}
+        for size, stats in sorted(self.size_stats.items()):
+            frames = stats['frames']
+            sizes[size] = {
+                'frames': frames,
+                'share': frames / self.frames if self.frames else 0.0,
+                'mean_latency_ms': stats['latency_ms'] / frames,
+                'detections_per_frame': stats['detections'] / frames,
+                'mean_confidence': stats['confidence'] / stats['detections'] if stats['detections'] else 0.0
+            }
+
+        recall = None
+        if self.audit['reference_detections']:
+            recall = min(self.audit['detections'] / self.audit['reference_detections'], 1.0)
+
+        return {'frames': self.frames, 'sizes': sizes, 'audit_frames': self.audit['frames'],
+                'estimated_recall': recall}
+
+    def log_report(self):
+        report = self.report()
+        print(f"📐 Adaptive resolution after {report['frames']} frames:")
+        for size, stats in report['sizes'].items():
+            print(f"  {size:5}px | {stats['share']:6.1%} of frames | {stats['mean_latency_ms']:7.1f} ms | "
+                  f"{stats['detections_per_frame']:.2f} det/frame | conf {stats['mean_confidence']:.2f}")
+        if report['estimated_recall'] is not None:
+            print(f"  Recall vs {self.policy.max_size}px: {report['estimated_recall']:.1%} "
+                  f"({report['audit_frames']} audited frames)")
@@ -0,0 +1,252 @@
+# ═══════════════════════════════════════════════════════════════
+# WildGuard - Alert Stream
+# In-process pub/sub hub for detection and alert events, served to
+# dashboards over Server-Sent Events
+# ═══════════════════════════════════════════════════════════════
+
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+EVENT_TYPES = ('detection', 'alert')
+
+
+# ═══════════════════════════════════════════════════════════════
+# SUBSCRIPTION - Bounded per-consumer buffer
+# ═══════════════════════════════════════════════════════════════
+
+class Subscription:
+    """
+    Bounded event buffer for one consumer. offer() never blocks the
+    publisher: pending detection events for a camera are coalesced into the
+    newest one, otherwise the oldest detection is dropped (alerts go only
+    when nothing else is pending). A consumer that drops more than
+    max_dropped events without once draining its buffer is closed.
+    """
+    def __init__(self, event_types=None, camera_id=None, max_events=256, max_dropped=1024):
+        self.event_types = set(event_types or EVENT_TYPES)
+        self.camera_id = camera_id
+        self.max_dropped = max_dropped
+        self.events = deque()
+        self.max_events = max_events
+        self.dropped = 0      # Total, for stats
+        self.overflow = 0     # Since the consumer last drained the buffer
+        self.closed = False
+        self._cond = threading.Condition()
+
+    def wants(self, event):
+        if event['type'] not in self.event_types:
+            return False
+        return self.camera_id is None or event['camera_id'] == self.camera_id
+
+    def offer(self, event):
+        with self._cond:
+            if self.closed:
+                return False
+
+            if len(self.events) >= self.max_events:
+                if self._coalesce(event):
+                    self._cond.notify()
+                    return True
+                victim = self._drop_candidate(event)
+                self.dropped += 1
+                self.overflow += 1
+                if self.overflow > self.max_dropped:
+                    self.closed = True
+                    self._cond.notify_all()
+                    return False
+                if victim is None:
+                    return False  # Buffer is all alerts; drop the incoming detection
+                del self.events[victim]
+
+            self.events.append(event)
+            self._cond.notify()
+            return True
+
+    def _coalesce(self, event):
+        """
+        Replace the newest pending detection event from the same camera
+        """
+        if event['type'] != 'detection':
+            return False
+        for i in range(len(self.events) - 1, -1, -1):
+            pending = self.events[i]
+            if pending['type'] == 'detection' and pending['camera_id'] == event['camera_id']:
+                del self.events[i]
+                self.events.append(event)
+                return True
+        return False
+
+    def _drop_candidate(self, event):
+        """
+        Index of the pending event to drop for an incoming one: the oldest
+        non-alert, else the oldest alert if the incoming event is an alert
+        too, else None (drop the incoming event)
+        """
+        for i, pending in enumerate(self.events):
+            if pending['type'] != 'alert':
+                return i
+        return 0 if event['type'] == 'alert' else None
+
+    def get(self, timeout=None):
+        """
+        Wait for the next event; returns None on timeout or when closed
+        """
+        with self._cond:
+            if not self.events and not self.closed:
+                self._cond.wait(timeout)
+            if self.events:
+                event = self.events.popleft()
+                if not self.events:
+                    self.overflow = 0  # Caught up
+                return event
+            return None
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+# ═══════════════════════════════════════════════════════════════
+# ALERT HUB - Fan-out to subscribers
+# ═══════════════════════════════════════════════════════════════
+
+class AlertHub:
+    def __init__(self, max_events=256, max_dropped=1024):
+        self.max_events = max_events
+        self.max_dropped = max_dropped
+        self.subscribers = set()
+        self.sequence = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, event_types=None, camera_id=None):
+        sub = Subscription(event_types, camera_id, self.max_events, self.max_dropped)
+        with self._lock:
+            self.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        sub.close()
+        with self._lock:
+            self.subscribers.discard(sub)
+
+    def publish(self, event_type, data, camera_id=None):
+        """
+        Publish an event to every interested subscriber without blocking
+        """
+        with self._lock:
+            self.sequence += 1
+            event = {
+                'id': self.sequence,
+                'type': event_type,
+                'camera_id': camera_id,
+                'time': time.time(),
+                'data': data
+            }
+            subscribers = list(self.subscribers)
+
+        for sub in subscribers:
+            if sub.wants(event) and not sub.offer(event):
+                if sub.closed:
+                    with self._lock:
+                        self.subscribers.discard(sub)
+        return event
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': len(self.subscribers),
+                'published': self.sequence,
+                'dropped': sum(sub.dropped for sub in self.subscribers)
+            }
+
+
+# ═══════════════════════════════════════════════════════════════
+# SSE SERVER
+# ═══════════════════════════════════════════════════════════════
+
+def format_sse(event):
+    payload = json.dumps({
+        'camera_id': event['camera_id'],
+        'time': event['time'],
+        **event['data']
+    })
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {payload}\n\n".encode('utf-8')
+
+
+def make_handler(hub, heartbeat_s=15.0, live_stats=None, allow_origin=None):
+    class AlertStreamHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/stats':
+                self._send_json(hub.stats())
+                return
+
+            if url.path == '/live' and live_stats is not None:
+                self._send_json(live_stats.snapshot())
+                return
+
+            if url.path != '/events':
+                self.send_error(404)
+                return
+
+            query = parse_qs(url.query)
+            event_types = query['types'][0].split(',') if 'types' in query else None
+            camera_id = query['camera'][0] if 'camera' in query else None
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self._send_cors()
+            self.end_headers()
+
+            sub = hub.subscribe(event_types, camera_id)
+            try:
+                while not sub.closed:
+                    event = sub.get(timeout=heartbeat_s)
+                    chunk = format_sse(event) if event else b": heartbeat\n\n"
+                    self.wfile.write(chunk)
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                hub.unsubscribe(sub)
+
+        def _send_json(self, data):
+            body = json.dumps(data).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self._send_cors()
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_cors(self):
+            if allow_origin:
+                self.send_header('Access-Control-Allow-Origin', allow_origin)
+
+    return AlertStreamHandler
+
+
+def start_server(hub, host='127.0.0.1', port=8000, live_stats=None, allow_origin=None):
+    """
+    Serve hub events at http://host:port/events (and live_stats snapshots
+    at /live) on a daemon thread. Local-only by default; allow_origin sets
+    Access-Control-Allow-Origin for dashboards served from another origin.
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(hub, live_stats=live_stats,
+                                                            allow_origin=allow_origin))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='alert-stream', daemon=True)
+    thread.start()
+    return server
+
+
+hub = AlertHub()
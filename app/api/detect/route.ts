@@ -16,6 +16,11 @@ export async function POST(request: NextRequest) {
       return NextResponse.json({ error: "No file provided" }, { status: 400 })
     }
 
+    // Compact binary results from Python are opt-in per request; JSON stays the default
+    const format = formData.get("format") === "binary" ? "binary" : "json"
+    // Calibrated cameras report metric distance and time-to-road
+    const camera = formData.get("camera")
+
     // Save file temporarily
     const buffer = Buffer.from(await file.arrayBuffer())
     const tempDir = tmpdir()
@@ -29,7 +34,8 @@ export async function POST(request: NextRequest) {
     const pythonScript = join(projectRoot, "detect_cli.py")
     const pythonPath = join(projectRoot, "venv", "bin", "python")
 
-    const detectionResult = await runPythonScript(pythonPath, pythonScript, tempFilePath)
+    const detectionResult = await runPythonScript(pythonPath, pythonScript, tempFilePath, format,
+      typeof camera === "string" && camera ? camera : undefined)
 
     return NextResponse.json(detectionResult)
 
@@ -48,39 +54,158 @@ export async function POST(request: NextRequest) {
   }
 }
 
-function runPythonScript(pythonPath: string, scriptPath: string, imagePath: string): Promise<any> {
+function runPythonScript(
+  pythonPath: string,
+  scriptPath: string,
+  imagePath: string,
+  format = "json",
+  camera?: string,
+): Promise<any> {
   return new Promise((resolve, reject) => {
-    const process = spawn(pythonPath, [scriptPath, imagePath])
+    const args = format === "binary" ? [scriptPath, imagePath, "--format", "binary"] : [scriptPath, imagePath]
+    if (camera) {
+      args.push("--camera", camera)
+    }
+    const process = spawn(pythonPath, args)
     
-    let stdoutData = ""
+    const stdoutChunks: Buffer[] = []
     let stderrData = ""
 
-    process.stdout.on("data", (data) => {
-      stdoutData += data.toString()
+    process.stdout.on("data", (data: Buffer) => {
+      stdoutChunks.push(data)
     })
 
     process.stderr.on("data", (data) => {
       stderrData += data.toString()
     })
 
-    process.on("close", (code) => {
-      if (code !== 0) {
-        console.error("Python script error:", stderrData)
-        reject(new Error(`Python script exited with code ${code}: ${stderrData}`))
-        return
+    // detect_cli closes stdout as soon as the result is written and then
+    // records history, so settle on stdout "end" rather than process "close"
+    let settled = false
+    const settle = (fn: () => void) => {
+      if (!settled) {
+        settled = true
+        fn()
       }
+    }
 
-      try {
-        const result = JSON.parse(stdoutData)
-        if (result.error) {
-          reject(new Error(result.error))
-        } else {
-          resolve(result)
-        }
-      } catch (e) {
-        console.error("Failed to parse Python output:", stdoutData)
-        reject(new Error("Failed to parse detection results"))
+    process.stdout.on("end", () => {
+      const stdoutBuffer = Buffer.concat(stdoutChunks)
+      if (stdoutBuffer.length === 0) {
+        return // Crashed before writing a result: report the exit code on "close"
       }
+      settle(() => parseResult(stdoutBuffer, resolve, reject))
+    })
+
+    process.on("close", (code) => {
+      settle(() => {
+        if (code !== 0) {
+          console.error("Python script error:", stderrData)
+          reject(new Error(`Python script exited with code ${code}: ${stderrData}`))
+          return
+        }
+        parseResult(Buffer.concat(stdoutChunks), resolve, reject)
+      })
     })
   })
 }
+
+function parseResult(stdoutBuffer: Buffer, resolve: (value: any) => void, reject: (reason: Error) => void) {
+  if (isBinaryResult(stdoutBuffer)) {
+    try {
+      resolve(decodeBinaryResult(stdoutBuffer))
+    } catch (e) {
+      reject(new Error("Failed to decode binary detection results"))
+    }
+    return
+  }
+
+  const stdoutData = stdoutBuffer.toString()
+  try {
+    const result = JSON.parse(stdoutData)
+    if (result.error) {
+      reject(new Error(result.error))
+    } else {
+      resolve(result)
+    }
+  } catch (e) {
+    console.error("Failed to parse Python output:", stdoutData)
+    reject(new Error("Failed to parse detection results"))
+  }
+}
+
+// Packed layout written by result_codec.py (all little-endian)
+const BINARY_MAGIC = "WGD1"
+const RISK_LEVELS = ["safe", "caution", "warning", "critical"]
+const ALERT_LEVELS = ["LOW", "CAUTION", "WARNING", "CRITICAL"]
+const HEADER_SIZE = 14
+const DETECTION_SIZE = 47
+const GROUND_SIZE = 24
+const GROUND_DETECTION_SIZE = 17
+
+function isBinaryResult(buffer: Buffer): boolean {
+  return buffer.length >= HEADER_SIZE && buffer.toString("latin1", 0, 4) === BINARY_MAGIC
+}
+
+function decodeBinaryResult(buffer: Buffer) {
+  const version = buffer.readUInt8(4)
+  if (version !== 1) {
+    throw new Error(`Unsupported payload version: ${version}`)
+  }
+  const riskLevel = RISK_LEVELS[buffer.readUInt8(5)]
+  const vehicleSpeed = buffer.readUInt16LE(6)
+  const crossingProbability = buffer.readInt16LE(8)
+  const distanceToRoad = buffer.readInt16LE(10)
+  const count = buffer.readUInt16LE(12)
+
+  let offset = HEADER_SIZE
+  const species: string[] = []
+  const speciesCount = buffer.readUInt8(offset)
+  offset += 1
+  for (let i = 0; i < speciesCount; i++) {
+    const length = buffer.readUInt8(offset)
+    offset += 1
+    species.push(buffer.toString("utf8", offset, offset + length))
+    offset += length
+  }
+
+  const detections = []
+  for (let i = 0; i < count; i++, offset += DETECTION_SIZE) {
+    detections.push({
+      id: buffer.readUInt16LE(offset),
+      animal: species[buffer.readUInt16LE(offset + 2)],
+      confidence: buffer.readUInt16LE(offset + 4) / 10,
+      bbox: {
+        x: buffer.readInt32LE(offset + 6),
+        y: buffer.readInt32LE(offset + 10),
+        width: buffer.readInt32LE(offset + 14),
+        height: buffer.readInt32LE(offset + 18),
+      },
+      risk: {
+        alert_level: ALERT_LEVELS[buffer.readUInt8(offset + 22)],
+        risk_score: buffer.readDoubleLE(offset + 23),
+        crossing_probability: buffer.readDoubleLE(offset + 31),
+        distance_to_road: buffer.readDoubleLE(offset + 39),
+      },
+    })
+  }
+
+  const result: Record<string, any> = { detections, vehicleSpeed, riskLevel, crossingProbability, distanceToRoad }
+
+  // Optional ground-calibration section: metric distance and time-to-road
+  if (offset + GROUND_SIZE <= buffer.length) {
+    const nullable = (value: number) => (Number.isNaN(value) ? null : value)
+    result.distanceToRoadM = buffer.readDoubleLE(offset)
+    result.timeToRoad = nullable(buffer.readDoubleLE(offset + 8))
+    result.vehicleEta = nullable(buffer.readDoubleLE(offset + 16))
+    offset += GROUND_SIZE
+    for (const detection of detections as any[]) {
+      detection.risk.distance_m = nullable(buffer.readDoubleLE(offset))
+      detection.risk.time_to_road_s = nullable(buffer.readDoubleLE(offset + 8))
+      detection.risk.conflict = buffer.readUInt8(offset + 16) === 1
+      offset += GROUND_DETECTION_SIZE
+    }
+  }
+
+  return result
+}
@@ -17,6 +17,9 @@ interface Detection {
   riskLevel: "critical" | "warning" | "caution" | "safe"
   crossingProbability: number
   distanceToRoad: number
+  // Ground-calibrated cameras only
+  distanceToRoadM?: number | null
+  timeToRoad?: number | null
 }
 
 export default function Home() {
@@ -51,6 +54,8 @@ export default function Home() {
         riskLevel: result.riskLevel,
         crossingProbability: result.crossingProbability,
         distanceToRoad: result.distanceToRoad,
+        distanceToRoadM: result.distanceToRoadM ?? null,
+        timeToRoad: result.timeToRoad ?? null,
       }
 
       setDetections([newDetection, ...detections])
@@ -0,0 +1,108 @@
+# ═══════════════════════════════════════════════════════════════
+# WildGuard - Batch Inputs
+# Input expansion, resume state and decode prefetch for
+# detect_cli.py --batch
+# ═══════════════════════════════════════════════════════════════
+
+import glob
+import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.webp')
+
+
+def expand_inputs(inputs, manifest=None):
+    """
+    Expand directories, glob patterns and an optional manifest file (one path
+    per line) into an ordered, de-duplicated list of image paths.
+    """
+    candidates = []
+    if manifest:
+        with open(manifest) as f:
+            candidates.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    candidates.extend(inputs)
+
+    paths = []
+    seen = set()
+    for candidate in candidates:
+        if os.path.isdir(candidate):
+            found = []
+            for root, _, files in os.walk(candidate):
+                found.extend(os.path.join(root, name) for name in files
+                             if name.lower().endswith(IMAGE_EXTENSIONS))
+            found.sort()
+        elif glob.has_magic(candidate):
+            found = sorted(glob.glob(candidate, recursive=True))
+        else:
+            found = [candidate]
+
+        for path in found:
+            if path not in seen:
+                seen.add(path)
+                paths.append(path)
+    return paths
+
+
+def load_checkpoint(checkpoint_path):
+    """
+    Return the set of image paths already written by a previous run.
+    """
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return set()
+    with open(checkpoint_path) as f:
+        return {line.rstrip('\n') for line in f if line.strip()}
+
+
+def load_completed(output_path):
+    """
+    Return the set of image paths that already have a record in the JSONL
+    output. A torn last line from an interrupted write is truncated so the
+    resumed run appends cleanly after the last complete record.
+    """
+    if not output_path or not os.path.exists(output_path):
+        return set()
+    done = set()
+    with open(output_path, 'rb+') as f:
+        good_end = 0
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            good_end += len(line)
+            try:
+                done.add(json.loads(line)['path'])
+            except (ValueError, KeyError, TypeError):
+                continue
+        f.truncate(good_end)
+    return done
+
+
+def prefetch_images(paths, workers):
+    """
+    Decode images on a thread pool, keeping at most 2 * workers decodes in
+    flight, and yield (path, image) in input order. cv2.imread releases the
+    GIL, so decoding overlaps with inference on the main thread.
+    """
+    window = max(1, workers * 2)
+    pending = deque()
+    path_iter = iter(paths)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for path in path_iter:
+            pending.append((path, pool.submit(cv2.imread, path)))
+            if len(pending) >= window:
+                break
+
+        while pending:
+            path, future = pending.popleft()
+            next_path = next(path_iter, None)
+            if next_path is not None:
+                pending.append((next_path, pool.submit(cv2.imread, next_path)))
+            try:
+                image = future.result()
+            except Exception:
+                image = None
+            yield path, image
@@ -0,0 +1,273 @@
+# ═══════════════════════════════════════════════════════════════
+# WildGuard - Multi-Camera Inference Scheduler
+# Shares a fixed pool of inference workers between many roadside
+# cameras, sampling high-risk sites more often than quiet ones
+# ═══════════════════════════════════════════════════════════════
+
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from detections import is_animal
+from risk_assessor import RiskAssessor
+
+# Target sampling rate (frames/s) while a camera sits at each alert level
+RATE_BY_LEVEL = {
+    'CRITICAL': 10.0,
+    'WARNING': 5.0,
+    'CAUTION': 2.0,
+    'LOW': 0.5,
+}
+LEVEL_ORDER = ('LOW', 'CAUTION', 'WARNING', 'CRITICAL')
+ELEVATED_LEVELS = ('WARNING', 'CRITICAL')
+
+
+def read_frames(capture):
+    """
+    Yield frames from a cv2.VideoCapture (or a path / stream URL) until it ends
+    """
+    if not isinstance(capture, cv2.VideoCapture):
+        capture = cv2.VideoCapture(capture)
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            yield frame
+    finally:
+        capture.release()
+
+
+def level_from_result(result, image_shape=None, camera_id=None, assessor=None):
+    """
+    Default risk extraction: detect_cli-style riskLevel, or the highest
+    per-detection alert level of a result dict or a plain detection list.
+    Raw detections without a 'risk' (WildGuardDetector.detect) are scored
+    with assessor when it and image_shape are given; only animals count.
+    """
+    if not result:
+        return 'LOW'
+    if isinstance(result, dict) and 'riskLevel' in result:
+        level = result['riskLevel'].upper()
+        return 'LOW' if level == 'SAFE' else level
+    detections = result if isinstance(result, list) else result.get('detections', [])
+    levels = []
+    for det in detections:
+        if 'risk' in det:
+            levels.append(det['risk']['alert_level'])
+        elif assessor is not None and image_shape is not None and is_animal(det.get('class', '')):
+            levels.append(assessor.assess_risk(det['bbox'], image_shape, camera_id=camera_id)['alert_level'])
+    return max(levels, key=lambda level: LEVEL_ORDER.index(level) if level in LEVEL_ORDER else 0,
+               default='LOW')
+
+
+# ═══════════════════════════════════════════════════════════════
+# CAMERA STATE
+# ═══════════════════════════════════════════════════════════════
+
+class CameraState:
+    def __init__(self, camera_id, fps_window=50):
+        self.camera_id = camera_id
+        self.frame = None              # Latest unprocessed frame (single slot)
+        self.captured_at = None
+        self.frame_seq = 0
+        self.level = 'LOW'
+        self.elevated_until = 0.0
+        self.elevated_level = 'LOW'
+        self.last_started = 0.0
+        self.last_result_captured_at = None
+        self.in_flight = False
+        self.frames_received = 0
+        self.frames_skipped = 0
+        self.inferences = 0
+        self.completed = deque(maxlen=fps_window)
+
+    def target_rate(self, now, min_fps, max_fps):
+        level = self.elevated_level if now < self.elevated_until else self.level
+        return min(max(RATE_BY_LEVEL.get(level, min_fps), min_fps), max_fps)
+
+    def achieved_fps(self, now):
+        if len(self.completed) < 2:
+            return 0.0
+        span = now - self.completed[0]
+        return (len(self.completed) - 1) / span if span > 0 else 0.0
+
+
+# ═══════════════════════════════════════════════════════════════
+# SCHEDULER
+# ═══════════════════════════════════════════════════════════════
+
+class CameraScheduler:
+    """
+    Earliest-deadline-first scheduling of the newest frame of each camera.
+    Each camera is due again 1/rate seconds after its last inference, where
+    the rate follows its recent risk level (WARNING/CRITICAL results keep
+    the elevated rate for risk_hold_s). Total compute is bounded by the
+    number of workers; frames that arrive faster than they are sampled
+    simply replace the pending one.
+
+    process_fn(camera_id, frame) returns a result that level_fn(result)
+    maps to an alert level, e.g. lambda cam, frame: detect_cli.detect_image(frame).
+    Without a level_fn, level_from_result is used and raw detector output
+    (WildGuardDetector.detect) is scored by assessor, by default a
+    RiskAssessor with the 75% road line.
+    """
+    def __init__(self, process_fn, workers=2, min_fps=0.5, max_fps=10.0,
+                 risk_hold_s=10.0, level_fn=None, on_result=None, assessor=None):
+        self.process_fn = process_fn
+        self.workers = workers
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.risk_hold_s = risk_hold_s
+        self.level_fn = level_fn
+        self.assessor = assessor or RiskAssessor()
+        self.on_result = on_result
+        self.cameras = {}
+        self._cond = threading.Condition()
+        self._threads = []
+        self._running = False
+        self._stopped = False
+
+    # ── Frame intake ──────────────────────────────────────────
+
+    def add_camera(self, camera_id, frames=None):
+        """
+        Register a camera; if an iterable of frames is given it is read on
+        its own thread and pushed into the camera's slot
+        """
+        with self._cond:
+            if camera_id not in self.cameras:
+                self.cameras[camera_id] = CameraState(camera_id)
+        if frames is not None:
+            reader = threading.Thread(target=self._read_source, args=(camera_id, frames),
+                                      name=f"camera-{camera_id}", daemon=True)
+            reader.start()
+            self._threads.append(reader)
+
+    def submit_frame(self, camera_id, frame, captured_at=None):
+        """
+        Replace the camera's pending frame; captured_at is a time.monotonic() value
+        """
+        with self._cond:
+            cam = self.cameras.get(camera_id)
+            if cam is None:
+                cam = self.cameras[camera_id] = CameraState(camera_id)
+            if cam.frame is not None:
+                cam.frames_skipped += 1
+            cam.frame = frame
+            cam.captured_at = time.monotonic() if captured_at is None else captured_at
+            cam.frame_seq += 1
+            cam.frames_received += 1
+            self._cond.notify()
+
+    def _read_source(self, camera_id, frames):
+        for frame in frames:
+            if self._stopped:
+                break
+            self.submit_frame(camera_id, frame)
+
+    # ── Scheduling ────────────────────────────────────────────
+
+    def _next_job(self, now):
+        """
+        Return (camera, wait_s): the ready camera with the earliest due time
+        """
+        best, best_due = None, None
+        for cam in self.cameras.values():
+            if cam.frame is None or cam.in_flight:
+                continue
+            due = cam.last_started + 1.0 / cam.target_rate(now, self.min_fps, self.max_fps)
+            if best_due is None or due < best_due:
+                best, best_due = cam, due
+        if best is None:
+            return None, None
+        return best, max(0.0, best_due - now)
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._running:
+                        return
+                    now = time.monotonic()
+                    cam, wait = self._next_job(now)
+                    if cam is not None and wait == 0.0:
+                        break
+                    self._cond.wait(wait)
+
+                frame, captured_at = cam.frame, cam.captured_at
+                cam.frame = None
+                cam.in_flight = True
+                cam.last_started = now
+
+            # A failing callback must not kill the worker or leave the camera
+            # in flight; the camera keeps its previous level
+            result, level = None, None
+            try:
+                result = self.process_fn(cam.camera_id, frame)
+                level = self._level(result, frame, cam.camera_id)
+            except Exception as e:
+                print(f"Scheduler error on camera {cam.camera_id}: {e}")
+            finally:
+                with self._cond:
+                    done = time.monotonic()
+                    cam.in_flight = False
+                    cam.inferences += 1
+                    cam.completed.append(done)
+                    cam.last_result_captured_at = captured_at
+                    if level is not None:
+                        cam.level = level
+                        if level in ELEVATED_LEVELS:
+                            cam.elevated_level = level
+                            cam.elevated_until = done + self.risk_hold_s
+                    self._cond.notify_all()
+
+            if self.on_result is not None:
+                try:
+                    self.on_result(cam.camera_id, frame, result)
+                except Exception as e:
+                    print(f"Scheduler on_result error on camera {cam.camera_id}: {e}")
+
+    def _level(self, result, frame, camera_id):
+        if self.level_fn is not None:
+            return self.level_fn(result)
+        return level_from_result(result, frame.shape, camera_id, self.assessor)
+
+    def start(self):
+        self._running = True
+        for i in range(self.workers):
+            worker = threading.Thread(target=self._worker, name=f"inference-{i}", daemon=True)
+            worker.start()
+            self._threads.append(worker)
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._stopped = True
+            self._cond.notify_all()
+
+    # ── Metrics ───────────────────────────────────────────────
+
+    def stats(self):
+        """
+        Per-camera achieved FPS, target FPS and staleness (age of the frame
+        behind the newest result)
+        """
+        now = time.monotonic()
+        with self._cond:
+            return {
+                camera_id: {
+                    'level': cam.level,
+                    'target_fps': round(cam.target_rate(now, self.min_fps, self.max_fps), 2),
+                    'achieved_fps': round(cam.achieved_fps(now), 2),
+                    'staleness_s': None if cam.last_result_captured_at is None
+                                   else round(now - cam.last_result_captured_at, 3),
+                    'inferences': cam.inferences,
+                    'frames_received': cam.frames_received,
+                    'frames_skipped': cam.frames_skipped
+                }
+                for camera_id, cam in self.cameras.items()
+            }
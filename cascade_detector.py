@@ -0,0 +1,96 @@
+# ═══════════════════════════════════════════════════════════════
+# WildGuard - Nano → Medium Cascade Detector
+# Runs the cheap nano model on every frame and escalates to the medium
+# model only for ambiguous or near-road detections
+# ═══════════════════════════════════════════════════════════════
+
+from detections import is_animal, to_detections
+from model_cache import load_model
+from road_geometry import RoadGeometry
+
+
+class CascadeDetector:
+    """
+    Drop-in replacement for WildGuardDetector.detect().
+
+    A frame is escalated to the accurate model when the fast model reports
+    an animal with confidence inside [ambiguous_low, ambiguous_high), or
+    any animal within road_margin (fraction of image height) of the
+    camera's road geometry. Other classes (vehicles, people) never
+    escalate. Otherwise the fast result is returned, filtered at conf.
+
+    Models given as weights paths are loaded through model_cache
+    (pre-fused artifacts, warm-up); loaded models are used as they are.
+    """
+    def __init__(self, fast_model='yolov8n.pt', accurate_model='yolov8m.pt', conf=0.25,
+                 ambiguous_low=0.15, ambiguous_high=0.5, road_margin=0.15, road_geometry=None,
+                 warmup_sizes=(640,), predict_kwargs=None):
+        print("📥 Loading cascade models...")
+        self.predict_kwargs = predict_kwargs or {}
+
+        def load(model):
+            if isinstance(model, str):
+                return load_model(model, warmup_sizes=warmup_sizes, predict_kwargs=self.predict_kwargs)
+            return model
+
+        self.fast_model = load(fast_model)
+        self.accurate_model = load(accurate_model)
+        print("✅ Cascade models loaded!")
+
+        self.conf = conf
+        self.ambiguous_low = ambiguous_low
+        self.ambiguous_high = ambiguous_high
+        self.road_margin = road_margin
+        # Cameras without configured geometry use the 75% road line
+        self.road_geometry = road_geometry or RoadGeometry()
+        self.stats = {'frames': 0, 'escalated': 0, 'ambiguous': 0, 'near_road': 0}
+
+    def _run(self, model, image, conf, imgsz=None):
+        kwargs = {'imgsz': imgsz} if imgsz else {}
+        results = model(image, conf=conf, verbose=False, **self.predict_kwargs, **kwargs)
+        return to_detections(results[0]) if results else []
+
+    def escalation_reasons(self, detections, image_shape, camera_id=None):
+        """
+        Return the set of reasons ('ambiguous', 'near_road') to escalate
+        """
+        animals = [det for det in detections if is_animal(det['class'])]
+        if not animals:
+            return set()
+
+        reasons = set()
+        distances = self.road_geometry.distances(camera_id, image_shape, [det['bbox'] for det in animals])
+        for det, distance in zip(animals, distances):
+            if self.ambiguous_low <= det['confidence'] < self.ambiguous_high:
+                reasons.add('ambiguous')
+            if distance < self.road_margin:
+                reasons.add('near_road')
+
+        return reasons
+
+    def detect(self, image, imgsz=None, camera_id=None):
+        try:
+            # Run the fast model at the bottom of the ambiguity band so
+            # borderline detections are visible to the escalation check
+            fast = self._run(self.fast_model, image, min(self.conf, self.ambiguous_low), imgsz)
+            reasons = self.escalation_reasons(fast, image.shape, camera_id)
+
+            self.stats['frames'] += 1
+            for reason in reasons:
+                self.stats[reason] += 1
+
+            if reasons:
+                self.stats['escalated'] += 1
+                return self._run(self.accurate_model, image, self.conf, imgsz)
+
+            return [det for det in fast if det['confidence'] >= self.conf]
+        except Exception as e:
+            print(f"Detection error: {e}")
+            return []
+
+    @property
+    def escalation_rate(self):
+        return self.stats['escalated'] / self.stats['frames'] if self.stats['frames'] else 0.0
+
+    def report(self):
+        return {**self.stats, 'escalation_rate': self.escalation_rate}
@@ -50,10 +50,15 @@ export default function AlertCenter({ detection }: AlertCenterProps) {
     })
   }
 
-  if (detection.distanceToRoad < 50) {
+  // Meters only for ground-calibrated cameras; otherwise distanceToRoad is % of frame height
+  const calibrated = detection.distanceToRoadM != null
+  if (calibrated ? detection.distanceToRoadM < 50 : detection.distanceToRoad < 15) {
+    const timeToRoad = detection.timeToRoad != null ? `, about ${detection.timeToRoad}s away` : ""
     alerts.push({
       title: "Close to Road",
-      description: `Animal is only ${detection.distanceToRoad}m from road`,
+      description: calibrated
+        ? `Animal is only ${detection.distanceToRoadM}m from road${timeToRoad}`
+        : `Animal is within ${detection.distanceToRoad}% of the frame height of the road`,
       icon: AlertTriangle,
       color: "text-red-600",
       bgColor: "bg-red-50",
@@ -15,7 +15,10 @@ interface Detection {
   vehicleSpeed: number
   riskLevel: "critical" | "warning" | "caution" | "safe"
   crossingProbability: number
+  // Percent of frame height; metric distance and time-to-road only for calibrated cameras
   distanceToRoad: number
+  distanceToRoadM?: number | null
+  timeToRoad?: number | null
 }
 
 interface DetectionDashboardProps {
@@ -145,7 +148,19 @@ export default function DetectionDashboard({ detection }: DetectionDashboardProp
         </div>
         <div className="rounded-lg border border-border bg-card p-4">
           <p className="text-xs font-medium uppercase text-muted-foreground">Distance to Road</p>
-          <p className="mt-2 text-3xl font-bold text-green-600">{detection.distanceToRoad}m</p>
+          {detection.distanceToRoadM != null ? (
+            <>
+              <p className="mt-2 text-3xl font-bold text-green-600">{detection.distanceToRoadM} m</p>
+              {detection.timeToRoad != null && (
+                <p className="mt-1 text-xs text-muted-foreground">~{detection.timeToRoad}s to reach the road</p>
+              )}
+            </>
+          ) : (
+            <>
+              <p className="mt-2 text-3xl font-bold text-green-600">{detection.distanceToRoad}%</p>
+              <p className="mt-1 text-xs text-muted-foreground">of frame height</p>
+            </>
+          )}
         </div>
       </div>
     </div>
@@ -1,8 +1,22 @@
+import time
+PROCESS_START = time.perf_counter()  # Before the heavy imports: cold start is part of each request
+
 import sys
 import json
+import argparse
 import cv2
 import numpy as np
-from ultralytics import YOLO
+
+import result_codec
+from model_cache import load_model
+from runtime_profile import load_profile, apply_profile
+from road_geometry import RoadGeometry
+from risk_assessor import RiskAssessor
+from adaptive_resolution import ResolutionPolicy
+from ground_calibration import GroundCalibration
+from flight_recorder import FlightRecorder, stage
+from event_store import EventStore
+from batch_inputs import expand_inputs, load_checkpoint, load_completed, prefetch_images
 
 # Initialize model
 # Using absolute path to be safe, or relative to the script location
@@ -11,140 +25,339 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(BASE_DIR, 'yolov8m.pt')
 
 try:
-    model = YOLO(MODEL_PATH)
+    # One-shot process: the request itself is the first inference, so the
+    # pre-fused artifact is used but no warm-up passes are run
+    weights, PREDICT_KWARGS = apply_profile(load_profile(weights=MODEL_PATH), MODEL_PATH)
+    # One process per request: the load is traced by the flight recorder
+    # instead of growing the cold-start log on every call
+    model = load_model(weights, warmup_sizes=(), predict_kwargs=PREDICT_KWARGS, log_path=None)
 except Exception as e:
     print(json.dumps({"error": f"Failed to load model: {str(e)}"}))
     sys.exit(1)
+MODEL_LOADED = time.perf_counter()
 
-class RiskAssessor:
-    def assess_risk(self, bbox, image_shape, vehicle_speed=60):
-        h, w = image_shape[:2]
-        x1, y1, x2, y2 = bbox
-        center_y = (y1 + y2) / 2
-        road_y = h * 0.75  # Road assumed at 75% of image height
-        
-        distance_to_road = abs(center_y - road_y) / h
-        
-        # Risk scoring based on distance
-        if distance_to_road < 0.05:
-            risk_score = 0.95
-            alert_level = "CRITICAL"
-            crossing_prob = 0.98
-        elif distance_to_road < 0.15:
-            risk_score = 0.75
-            alert_level = "WARNING"
-            crossing_prob = 0.80
-        elif distance_to_road < 0.35:
-            risk_score = 0.45
-            alert_level = "CAUTION"
-            crossing_prob = 0.50
-        else:
-            risk_score = 0.15
-            alert_level = "LOW"
-            crossing_prob = 0.20
-        
-        # Speed factor adjustment
-        speed_factor = min(vehicle_speed / 100, 1.0)
-        risk_score = min(risk_score * (1 + speed_factor * 0.5), 1.0)
-        
-        return {
-            'risk_score': risk_score,
-            'alert_level': alert_level,
-            'crossing_probability': crossing_prob,
-            'distance_to_road': distance_to_road
-        }
+road_geometry = RoadGeometry.from_file()
+ground_calibration = GroundCalibration.from_file()
+
+# Adaptive per-camera input size (WILDGUARD_ADAPTIVE_RESOLUTION=1). Every
+# request is a new process, so the policy's history lives in a state file
+RESOLUTION_STATE = os.environ.get('WILDGUARD_RESOLUTION_STATE',
+                                  os.path.join(BASE_DIR, 'logs', 'resolution_state.json'))
+resolution_policy = None
+if os.environ.get('WILDGUARD_ADAPTIVE_RESOLUTION') == '1':
+    resolution_policy = ResolutionPolicy().load(RESOLUTION_STATE)
+VEHICLE_SPEED = 65  # km/h reported to the frontend
 
 def normalize_animal_name(name):
     return name.replace('_', ' ').title()
 
+def detect_image(image, imgsz=None, camera_id=None, trace=None):
+    """
+    Run detection and risk assessment on a decoded BGR image and build the
+    response document expected by the frontend. imgsz overrides the model's
+    default inference size, or the adaptive policy's choice when enabled. For a camera with ground calibration, risks
+    also carry metric distance and time-to-road. Stage timings go to the
+    optional flight recorder trace.
+    """
+    policy_camera = camera_id or 'default'
+    if imgsz is None and resolution_policy is not None:
+        imgsz = resolution_policy.choose(policy_camera)
+    if trace is not None and imgsz:
+        trace.set(imgsz=imgsz)
+
+    # Detect
+    kwargs = {"imgsz": imgsz} if imgsz else {}
+    with stage(trace, "inference"):
+        results = model(image, conf=0.25, verbose=False, **PREDICT_KWARGS, **kwargs)
+
+    detections_list = []
+    max_risk_score = 0
+    max_crossing_prob = 0
+    min_distance_to_road = 1.0
+    overall_alert_level = "safe"
+
+    assessor = RiskAssessor(road_geometry)
+
+    if results and len(results) > 0:
+        result = results[0]
+        if result.boxes is not None:
+            for idx, box in enumerate(result.boxes):
+                xyxy = box.xyxy[0].cpu().numpy()
+                x1, y1, x2, y2 = float(xyxy[0]), float(xyxy[1]), float(xyxy[2]), float(xyxy[3])
+                conf = float(box.conf.cpu().numpy()[0])
+                cls = int(box.cls.cpu().numpy()[0])
+                class_name = result.names[cls]
+
+                # Calculate bbox for frontend (x, y, width, height)
+                bbox_width = x2 - x1
+                bbox_height = y2 - y1
+
+                # Assess risk
+                risk = assessor.assess_risk([x1, y1, x2, y2], image.shape, camera_id=camera_id)
+
+                detections_list.append({
+                    "id": idx,
+                    "animal": normalize_animal_name(class_name),
+                    "confidence": round(conf * 100, 1),
+                    "bbox": {
+                        "x": int(x1),
+                        "y": int(y1),
+                        "width": int(bbox_width),
+                        "height": int(bbox_height)
+                    },
+                    "risk": risk
+                })
+
+                # Update aggregate stats
+                if risk['risk_score'] > max_risk_score:
+                    max_risk_score = risk['risk_score']
+                    overall_alert_level = risk['alert_level'].lower()
+
+                max_crossing_prob = max(max_crossing_prob, risk['crossing_probability'])
+                min_distance_to_road = min(min_distance_to_road, risk['distance_to_road'])
+
+    if resolution_policy is not None:
+        boxes = [{"class": d["animal"],
+                  "bbox": [d["bbox"]["x"], d["bbox"]["y"], d["bbox"]["x"] + d["bbox"]["width"],
+                           d["bbox"]["y"] + d["bbox"]["height"]]} for d in detections_list]
+        resolution_policy.observe(policy_camera, boxes, image.shape,
+                                  [d["risk"]["alert_level"] for d in detections_list])
+        try:
+            resolution_policy.save(RESOLUTION_STATE)
+        except OSError as e:
+            print(f"Could not save resolution state: {e}", file=sys.stderr)
+
+    # Map alert level to frontend expected values
+    if overall_alert_level == "critical":
+        risk_level = "critical"
+    elif overall_alert_level == "warning":
+        risk_level = "warning"
+    elif overall_alert_level == "caution":
+        risk_level = "caution"
+    else:
+        risk_level = "safe"
+
+    output = {
+        "detections": detections_list,
+        "vehicleSpeed": VEHICLE_SPEED,
+        "riskLevel": risk_level,
+        "crossingProbability": round(max_crossing_prob * 100),
+        # Fraction of image height x 100 (distanceToRoadM for calibrated cameras)
+        "distanceToRoad": round(min_distance_to_road * 100)
+    }
+
+    if detections_list and ground_calibration.has_camera(camera_id):
+        with stage(trace, "ground"):
+            add_ground_metrics(output, image.shape, camera_id)
+
+    return output
+
+
+def add_ground_metrics(output, image_shape, camera_id):
+    """
+    Attach metric distance and time-to-road from the camera's ground
+    calibration, computed for all detections in one vectorized pass
+    """
+    detections = output["detections"]
+    bboxes = [[d["bbox"]["x"], d["bbox"]["y"],
+               d["bbox"]["x"] + d["bbox"]["width"], d["bbox"]["y"] + d["bbox"]["height"]] for d in detections]
+    metrics = ground_calibration.time_to_collision(camera_id, image_shape, bboxes,
+                                                   [d["animal"] for d in detections], output["vehicleSpeed"])
+
+    # Boxes above the horizon have no ground distance
+    on_ground = np.isfinite(metrics["distance_m"])
+    if not on_ground.any():
+        return
+
+    finite = lambda v: round(float(v), 2) if np.isfinite(v) else None
+    for i, det in enumerate(detections):
+        det["risk"]["distance_m"] = finite(metrics["distance_m"][i])
+        det["risk"]["time_to_road_s"] = finite(metrics["time_to_road_s"][i])
+        det["risk"]["conflict"] = bool(metrics["conflict"][i])
+
+    # distanceToRoad keeps its normalized unit; meters go in their own field
+    output["distanceToRoadM"] = round(float(np.min(metrics["distance_m"][on_ground])), 2)
+    output["timeToRoad"] = finite(np.min(metrics["time_to_road_s"][on_ground]))
+    output["vehicleEta"] = round(float(metrics["vehicle_eta_s"]), 2)
+
+
+# ═══════════════════════════════════════════════════════════════
+# EVENT HISTORY
+# ═══════════════════════════════════════════════════════════════
+
+def release_stdout():
+    """
+    Close the stdout pipe once the result is written so the caller
+    (app/api/detect/route.ts) can respond without waiting for the work
+    after it. Later writes to stdout go to /dev/null.
+    """
+    sys.stdout.flush()
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+    os.close(devnull)
+
+
+def record_events(output, camera_id=None, store=None):
+    """
+    Write the request's detections, and an alert for its highest-risk
+    detection when riskLevel is not safe, to the event store. The write is
+    synchronous, so call it after release_stdout(): WAL lock waits under
+    concurrent requests must stay off the response path.
+    """
+    store = store or EventStore(background=False)
+    for det in output["detections"]:
+        box = det["bbox"]
+        store.record_detection(det["animal"].lower(),
+                               [box["x"], box["y"], box["x"] + box["width"], box["y"] + box["height"]],
+                               det["confidence"] / 100, det["risk"]["risk_score"], det["risk"]["alert_level"],
+                               camera_id)
+    if output["riskLevel"] != "safe" and output["detections"]:
+        top = max(output["detections"], key=lambda det: det["risk"]["risk_score"])
+        level = top["risk"]["alert_level"]
+        store.record_alert(top["animal"].lower(), level, top["risk"]["risk_score"],
+                           f"{level}: {top['animal'].upper()} near road", camera_id)
+    store.close()
+
+
+# ═══════════════════════════════════════════════════════════════
+# BATCH MODE
+# ═══════════════════════════════════════════════════════════════
+
+def run_batch(paths, output_path=None, checkpoint_path=None, workers=4):
+    """
+    Score every image and emit one JSONL line per image as soon as it is
+    ready. Completed paths are appended to the checkpoint after their result
+    line is flushed, so an interrupted run resumes where it stopped; paths
+    already in the output count as done too, so a crash between the two
+    writes does not duplicate a record.
+    """
+    done = load_checkpoint(checkpoint_path) | load_completed(output_path)
+    todo = [p for p in paths if p not in done]
+
+    out = open(output_path, 'a') if output_path else sys.stdout
+    ckpt = open(checkpoint_path, 'a') if checkpoint_path else None
+    processed = 0
+    failed = 0
+
+    try:
+        for path, image in prefetch_images(todo, workers):
+            if image is None:
+                record = {"path": path, "error": "Could not read image"}
+                failed += 1
+            else:
+                try:
+                    record = {"path": path, **detect_image(image)}
+                except Exception as e:
+                    record = {"path": path, "error": f"Processing error: {str(e)}"}
+                    failed += 1
+
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            if ckpt:
+                ckpt.write(path + "\n")
+                ckpt.flush()
+            processed += 1
+    finally:
+        if output_path:
+            out.close()
+        if ckpt:
+            ckpt.close()
+
+    print(f"Batch complete: {processed} processed, {failed} failed, "
+          f"{len(paths) - len(todo)} skipped from checkpoint", file=sys.stderr)
+    return failed
+
+
+def main_batch(argv):
+    parser = argparse.ArgumentParser(prog="detect_cli.py --batch",
+                                     description="Score many images and write JSONL results")
+    parser.add_argument("inputs", nargs="*", help="Image files, directories or glob patterns")
+    parser.add_argument("--manifest", help="Text file listing one image path per line")
+    parser.add_argument("--output", help="JSONL output file (default: stdout)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--workers", type=int, default=4, help="Image decode prefetch threads")
+    args = parser.parse_args(argv)
+
+    paths = expand_inputs(args.inputs, args.manifest)
+    if not paths:
+        print(json.dumps({"error": "No images found for batch"}))
+        sys.exit(1)
+
+    checkpoint_path = args.checkpoint
+    if checkpoint_path is None and args.output:
+        checkpoint_path = args.output + ".checkpoint"
+
+    run_batch(paths, args.output, checkpoint_path, args.workers)
+
+
 def main():
     if len(sys.argv) < 2:
         print(json.dumps({"error": "No image path provided"}))
         sys.exit(1)
-        
+
+    if sys.argv[1] == "--batch":
+        main_batch(sys.argv[2:])
+        return
+
     img_path = sys.argv[1]
+
+    # Options: --format json|binary (negotiated per call), --camera <id>
+    options = dict(zip(sys.argv[2::2], sys.argv[3::2]))
+    output_format = options.get("--format", "json")
+    camera_id = options.get("--camera")
+    if output_format not in ("json", "binary"):
+        print(json.dumps({"error": f"Unknown output format: {output_format}"}))
+        sys.exit(1)
     
+    # Each request is its own process, so the trace ring lives on disk
+    recorder = FlightRecorder(persist=True)
+    trace = recorder.start(started_at=PROCESS_START, model=os.path.basename(weights),
+                           backend=f"torch-{getattr(model, 'device', 'cpu')}",
+                           camera_id=camera_id, format=output_format)
+    # Imports and model load, measured from the top of this module
+    trace.add_stage("load", (MODEL_LOADED - PROCESS_START) * 1000)
+    trace.set_input(path=img_path)
+    error = None
+
     try:
         # Read image
-        image = cv2.imread(img_path)
+        with trace.stage("decode"):
+            image = cv2.imread(img_path)
         if image is None:
-            print(json.dumps({"error": "Could not read image"}))
+            error = "Could not read image"
+            print(json.dumps({"error": error}))
             sys.exit(1)
+        trace.set(width=image.shape[1], height=image.shape[0])
+        # The route deletes its temp upload once stdout closes, so a slow
+        # capture may need the decoded frame instead of the file
+        trace.set_input(path=img_path, image=image)
             
-        # Detect
-        results = model(image, conf=0.25, verbose=False)
-        
-        detections_list = []
-        max_risk_score = 0
-        max_crossing_prob = 0
-        min_distance_to_road = 1.0
-        overall_alert_level = "safe"
-        
-        assessor = RiskAssessor()
-        
-        if results and len(results) > 0:
-            result = results[0]
-            if result.boxes is not None:
-                for idx, box in enumerate(result.boxes):
-                    xyxy = box.xyxy[0].cpu().numpy()
-                    x1, y1, x2, y2 = float(xyxy[0]), float(xyxy[1]), float(xyxy[2]), float(xyxy[3])
-                    conf = float(box.conf.cpu().numpy()[0])
-                    cls = int(box.cls.cpu().numpy()[0])
-                    class_name = result.names[cls]
-                    
-                    # Calculate bbox for frontend (x, y, width, height)
-                    bbox_width = x2 - x1
-                    bbox_height = y2 - y1
-                    
-                    # Assess risk
-                    risk = assessor.assess_risk([x1, y1, x2, y2], image.shape)
-                    
-                    detections_list.append({
-                        "id": idx,
-                        "animal": normalize_animal_name(class_name),
-                        "confidence": round(conf * 100, 1),
-                        "bbox": {
-                            "x": int(x1),
-                            "y": int(y1),
-                            "width": int(bbox_width),
-                            "height": int(bbox_height)
-                        },
-                        "risk": risk
-                    })
-                    
-                    # Update aggregate stats
-                    if risk['risk_score'] > max_risk_score:
-                        max_risk_score = risk['risk_score']
-                        overall_alert_level = risk['alert_level'].lower()
-                    
-                    max_crossing_prob = max(max_crossing_prob, risk['crossing_probability'])
-                    min_distance_to_road = min(min_distance_to_road, risk['distance_to_road'])
-
-        # Map alert level to frontend expected values
-        if overall_alert_level == "critical":
-            risk_level = "critical"
-        elif overall_alert_level == "warning":
-            risk_level = "warning"
-        elif overall_alert_level == "caution":
-            risk_level = "caution"
-        else:
-            risk_level = "safe"
-
-        output = {
-            "detections": detections_list,
-            "vehicleSpeed": 65, # Default or passed in args
-            "riskLevel": risk_level,
-            "crossingProbability": round(max_crossing_prob * 100),
-            "distanceToRoad": round(min_distance_to_road * 100) # Frontend expects percentage or value? TS says `distanceToRoad: hasHighRiskAnimal ? 8 : 25`. It seems to be meters or arbitrary units. Python gives 0.0-1.0. Let's convert to something reasonable. 
-            # If 0.05 (close) -> maybe 5 meters. If 0.5 (far) -> 50 meters.
-            # Let's just multiply by 100 for now to give a "distance" value.
-        }
+        # "detect" covers inference, risk scoring and ground metrics
+        with trace.stage("detect"):
+            output = detect_image(image, camera_id=camera_id, trace=trace)
+        trace.set(detections=len(output["detections"]))
+        with trace.stage("encode"):
+            if output_format == "binary":
+                sys.stdout.buffer.write(result_codec.encode(output))
+                sys.stdout.buffer.flush()
+            else:
+                print(json.dumps(output))
+            release_stdout()
         
-        print(json.dumps(output))
+        # After the response: the route has its result, so the history write
+        # and trace persistence no longer add to request latency
+        with trace.stage("events"):
+            try:
+                record_events(output, camera_id)
+            except Exception as e:
+                print(f"Event store write failed: {e}", file=sys.stderr)
         
     except Exception as e:
+        error = e
         print(json.dumps({"error": f"Processing error: {str(e)}"}))
         sys.exit(1)
+    finally:
+        trace.finish(error)
 
 if __name__ == "__main__":
     main()
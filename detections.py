@@ -0,0 +1,38 @@
+# ═══════════════════════════════════════════════════════════════
+# WildGuard - Detection Records
+# ultralytics results → the detection dicts shared by WildGuardDetector
+# and CascadeDetector
+# ═══════════════════════════════════════════════════════════════
+
+# COCO classes treated as wildlife (see "Supported Animals" in the README),
+# plus deer for fine-tuned models
+ANIMAL_CLASSES = frozenset({'bird', 'cat', 'dog', 'horse', 'sheep', 'cow', 'elephant',
+                            'bear', 'zebra', 'giraffe', 'deer'})
+
+
+def is_animal(class_name):
+    return class_name.lower().replace('_', ' ') in ANIMAL_CLASSES
+
+
+def to_detections(result):
+    """
+    One {'bbox', 'class', 'confidence', 'class_id'} dict per box of a
+    single ultralytics result
+    """
+    detections = []
+    if result.boxes is not None and len(result.boxes) > 0:
+        for box in result.boxes:
+            xyxy = box.xyxy[0].cpu().numpy()
+            x1, y1, x2, y2 = float(xyxy[0]), float(xyxy[1]), float(xyxy[2]), float(xyxy[3])
+            conf = float(box.conf.cpu().numpy()[0])
+            cls = int(box.cls.cpu().numpy()[0])
+            class_name = result.names[cls]
+            
+            # No filtering - return all detections
+            detections.append({
+                'bbox': [int(x1), int(y1), int(x2), int(y2)],
+                'class': class_name,
+                'confidence': conf,
+                'class_id': cls
+            })
+    return detections
@@ -0,0 +1,228 @@
+# ═══════════════════════════════════════════════════════════════
+# WildGuard - Detection Event Store
+# Embedded SQLite (WAL) history of detections and billboard alerts,
+# written in batches by a background thread
+# ═══════════════════════════════════════════════════════════════
+
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.environ.get('WILDGUARD_EVENT_DB', os.path.join(BASE_DIR, 'logs', 'events.db'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS detections (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    camera_id TEXT,
+    species TEXT NOT NULL,
+    confidence REAL,
+    x1 INTEGER, y1 INTEGER, x2 INTEGER, y2 INTEGER,
+    risk_score REAL,
+    alert_level TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_detections_ts ON detections (ts);
+CREATE INDEX IF NOT EXISTS idx_detections_species_ts ON detections (species, ts);
+CREATE INDEX IF NOT EXISTS idx_detections_camera_ts ON detections (camera_id, ts);
+
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    camera_id TEXT,
+    species TEXT NOT NULL,
+    alert_level TEXT NOT NULL,
+    risk_score REAL,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_ts ON alerts (ts);
+CREATE INDEX IF NOT EXISTS idx_alerts_species_ts ON alerts (species, ts);
+CREATE INDEX IF NOT EXISTS idx_alerts_camera_ts ON alerts (camera_id, ts);
+"""
+
+INSERT_DETECTION = ("INSERT INTO detections (ts, camera_id, species, confidence, x1, y1, x2, y2, risk_score, alert_level) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+INSERT_ALERT = ("INSERT INTO alerts (ts, camera_id, species, alert_level, risk_score, message) "
+                "VALUES (?, ?, ?, ?, ?, ?)")
+
+_STOP = object()
+
+
+def connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+
+class EventStore:
+    """
+    record_*() only enqueue a tuple and never block: if the writer falls
+    behind and the queue is full the event is counted as dropped. The
+    writer thread drains up to batch_size events per transaction.
+
+    background=False is for one-shot processes such as detect_cli: events
+    are held in memory and written in one transaction by flush() / close().
+    """
+    def __init__(self, path=DEFAULT_DB_PATH, batch_size=500, flush_interval_s=0.5, max_queue=50000,
+                 background=True):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.background = background
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._pending = []
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        conn = connect(path)
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        self._writer = None
+        if background:
+            self._writer = threading.Thread(target=self._write_loop, name='event-store', daemon=True)
+            self._writer.start()
+
+    # ── Hot path ──────────────────────────────────────────────
+
+    def _enqueue(self, item):
+        if not self.background:
+            self._pending.append(item)
+            return
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def record_detection(self, species, bbox, confidence, risk_score, alert_level, camera_id=None, ts=None):
+        x1, y1, x2, y2 = [int(v) for v in bbox]
+        self._enqueue((INSERT_DETECTION, (time.time() if ts is None else ts, camera_id, species,
+                                          float(confidence), x1, y1, x2, y2, float(risk_score), alert_level)))
+
+    def record_alert(self, species, alert_level, risk_score, message, camera_id=None, ts=None):
+        self._enqueue((INSERT_ALERT, (time.time() if ts is None else ts, camera_id, species,
+                                      alert_level, float(risk_score), message)))
+
+    # ── Background writer ─────────────────────────────────────
+
+    def _write_loop(self):
+        conn = connect(self.path)
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_interval_s)
+            except queue.Empty:
+                continue
+
+            batch = []
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._flush(conn, batch)
+        conn.close()
+
+    def _flush(self, conn, batch):
+        grouped = {}
+        for sql, params in batch:
+            grouped.setdefault(sql, []).append(params)
+        try:
+            with conn:
+                for sql, rows in grouped.items():
+                    conn.executemany(sql, rows)
+            self.written += len(batch)
+        except sqlite3.Error as e:
+            self.dropped += len(batch)
+            print(f"Event store write error: {e}", file=sys.stderr)
+
+    def flush(self):
+        """
+        Synchronously write events held by a background=False store
+        """
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        conn = connect(self.path)
+        try:
+            self._flush(conn, batch)
+        finally:
+            conn.close()
+
+    def close(self, timeout=5.0):
+        """
+        Flush pending events and stop the writer. If the queue stays full
+        for the whole timeout the writer is abandoned (it is a daemon
+        thread) rather than blocking shutdown.
+        """
+        if self._writer is None:
+            self.flush()
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            print(f"Event store close timed out with {self._queue.qsize()} events queued", file=sys.stderr)
+            return
+        self._writer.join(timeout)
+
+    # ── Queries ───────────────────────────────────────────────
+
+    @staticmethod
+    def _where(start=None, end=None, species=None, camera_id=None):
+        clauses, params = [], []
+        if species is not None:
+            clauses.append('species = ?')
+            params.append(species)
+        if camera_id is not None:
+            clauses.append('camera_id = ?')
+            params.append(camera_id)
+        if start is not None:
+            clauses.append('ts >= ?')
+            params.append(start)
+        if end is not None:
+            clauses.append('ts < ?')
+            params.append(end)
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ''), params
+
+    def _query(self, table, start=None, end=None, species=None, camera_id=None, limit=1000):
+        where, params = self._where(start, end, species, camera_id)
+        conn = connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(f"SELECT * FROM {table} {where} ORDER BY ts DESC LIMIT ?",
+                                params + [limit]).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    def query_detections(self, start=None, end=None, species=None, camera_id=None, limit=1000):
+        return self._query('detections', start, end, species, camera_id, limit)
+
+    def query_alerts(self, start=None, end=None, species=None, camera_id=None, limit=1000):
+        return self._query('alerts', start, end, species, camera_id, limit)
+
+    def species_counts(self, start=None, end=None, camera_id=None):
+        """
+        Detections per species in a time range, for hotspot analysis
+        """
+        where, params = self._where(start, end, camera_id=camera_id)
+        conn = connect(self.path)
+        try:
+            rows = conn.execute(f"SELECT species, COUNT(*) FROM detections {where} "
+                                f"GROUP BY species ORDER BY COUNT(*) DESC", params).fetchall()
+            return dict(rows)
+        finally:
+            conn.close()
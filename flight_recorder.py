@@ -0,0 +1,377 @@
+# ═══════════════════════════════════════════════════════════════
+# WildGuard - Slow-Request Flight Recorder
+# Bounded ring of per-request traces; requests slower than the recent p99
+# keep their input and a stack profile for offline replay
+# ═══════════════════════════════════════════════════════════════
+#
+# Usage:
+#   python flight_recorder.py list             # captured slow requests
+#   python flight_recorder.py replay <capture> # re-run one through detect_cli
+
+import cProfile
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: persisted writes go unlocked
+    fcntl = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CAPTURE_DIR = os.environ.get('WILDGUARD_FLIGHT_DIR', os.path.join(BASE_DIR, 'logs', 'flight_recorder'))
+
+
+def stage(trace, name):
+    """
+    trace.stage(name), or a no-op when tracing is off
+    """
+    return trace.stage(name) if trace is not None else nullcontext()
+
+
+# ═══════════════════════════════════════════════════════════════
+# STACK SAMPLER
+# ═══════════════════════════════════════════════════════════════
+
+class StackSampler:
+    """
+    py-spy style wall-clock sampler: a daemon thread snapshots one target
+    thread's Python stack every interval_s and counts collapsed stacks
+    ("outer;inner N", flamegraph.pl / speedscope format)
+    """
+    def __init__(self, thread_id, interval_s=0.005, max_depth=64):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.max_depth = max_depth
+        self.counts = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='flight-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.counts
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None and len(names) < self.max_depth:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if names:
+                key = ';'.join(reversed(names))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in
+                       sorted(self.counts.items(), key=lambda item: -item[1]))
+
+
+# ═══════════════════════════════════════════════════════════════
+# TRACE
+# ═══════════════════════════════════════════════════════════════
+
+class Trace:
+    def __init__(self, recorder, meta, started_at=None):
+        self.recorder = recorder
+        self.id = uuid.uuid4().hex[:12]
+        self.meta = dict(meta)
+        self.stages = {}
+        self.input_path = None
+        self.input_image = None
+        self._start = time.perf_counter() if started_at is None else started_at
+        self._profiler = None
+        self._sampler = None
+
+        if recorder.profiler == 'cprofile':
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif recorder.profiler == 'sample':
+            self._sampler = StackSampler(threading.get_ident(), recorder.sample_interval_s).start()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def add_stage(self, name, ms):
+        """
+        Record a stage timed outside the trace, e.g. process start-up
+        before the trace began
+        """
+        self.stages[name] = self.stages.get(name, 0.0) + ms
+
+    def set(self, **meta):
+        self.meta.update(meta)
+
+    def set_input(self, path=None, image=None):
+        """
+        Keep the request input for capture: the original file (preferred,
+        byte-exact replay) or a decoded BGR array
+        """
+        self.input_path = path
+        self.input_image = image
+
+    def finish(self, error=None):
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        record = {
+            'id': self.id,
+            'time': datetime.now().isoformat(),
+            'total_ms': round((time.perf_counter() - self._start) * 1000, 2),
+            'stages_ms': {name: round(ms, 2) for name, ms in self.stages.items()},
+            **self.meta
+        }
+        if error is not None:
+            record['error'] = str(error)[:500]
+        return self.recorder.record(self, record)
+
+
+# ═══════════════════════════════════════════════════════════════
+# RECORDER
+# ═══════════════════════════════════════════════════════════════
+
+class FlightRecorder:
+    """
+    Keeps the last ring_size trace records. Once min_samples traces exist,
+    any request above the percentile of the ring (or threshold_ms, if set)
+    is captured to capture_dir/<time>_<id>/ with trace.json, its input and
+    stacks.txt (profiler='sample') or profile.pstats (profiler='cprofile').
+    Only the newest max_captures captures are kept.
+
+    persist=True mirrors the ring to capture_dir/traces.jsonl, for
+    one-shot processes such as detect_cli that see a single request each.
+    """
+    def __init__(self, capture_dir=CAPTURE_DIR, ring_size=1000, percentile=99, min_samples=50,
+                 threshold_ms=None, max_captures=50, profiler='sample', sample_interval_s=0.005,
+                 persist=False):
+        self.capture_dir = capture_dir
+        self.ring_size = ring_size
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.threshold_ms = threshold_ms
+        self.max_captures = max_captures
+        self.profiler = profiler
+        self.sample_interval_s = sample_interval_s
+        self.persist = persist
+        self.traces = deque(maxlen=ring_size)
+        self.captured = 0
+        self._lock = threading.Lock()
+
+        if persist:
+            self.traces.extend(self._load_persisted())
+
+    @property
+    def traces_path(self):
+        return os.path.join(self.capture_dir, 'traces.jsonl')
+
+    def start(self, started_at=None, **meta):
+        """
+        Begin a trace; started_at (a time.perf_counter() value) backdates
+        it so total_ms covers work done before the call
+        """
+        return Trace(self, meta, started_at)
+
+    def threshold(self):
+        """
+        Current slow-request cutoff in ms, or None while warming up
+        """
+        if self.threshold_ms is not None:
+            return self.threshold_ms
+        with self._lock:
+            totals = [t['total_ms'] for t in self.traces]
+        if len(totals) < self.min_samples:
+            return None
+        return float(np.percentile(totals, self.percentile))
+
+    def record(self, trace, record):
+        # Compare against the distribution before this request joins it
+        threshold = self.threshold()
+        with self._lock:
+            self.traces.append(record)
+        if self.persist:
+            self._append_persisted(record)
+
+        if threshold is not None and record['total_ms'] > threshold:
+            record['threshold_ms'] = round(threshold, 2)
+            try:
+                record['capture'] = self._capture(trace, record)
+                self.captured += 1
+            except OSError as e:
+                print(f"Flight recorder capture failed: {e}", file=sys.stderr)
+        return record
+
+    # ── Captures ──────────────────────────────────────────────
+
+    def _capture(self, trace, record):
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')  # Sorts chronologically for rotation
+        path = os.path.join(self.capture_dir, f"{stamp}_{trace.id}")
+        os.makedirs(path, exist_ok=True)
+
+        if trace.input_path and os.path.exists(trace.input_path):
+            ext = os.path.splitext(trace.input_path)[1] or '.bin'
+            shutil.copyfile(trace.input_path, os.path.join(path, 'input' + ext))
+        elif trace.input_image is not None:
+            import cv2
+            cv2.imwrite(os.path.join(path, 'input.png'), trace.input_image)
+
+        if trace._sampler is not None:
+            with open(os.path.join(path, 'stacks.txt'), 'w') as f:
+                f.write(trace._sampler.collapsed())
+        if trace._profiler is not None:
+            trace._profiler.dump_stats(os.path.join(path, 'profile.pstats'))
+
+        with open(os.path.join(path, 'trace.json'), 'w') as f:
+            json.dump({**record, 'capture': path}, f, indent=2)
+
+        self._rotate()
+        return path
+
+    def captures(self):
+        if not os.path.isdir(self.capture_dir):
+            return []
+        return sorted(os.path.join(self.capture_dir, name) for name in os.listdir(self.capture_dir)
+                      if os.path.isfile(os.path.join(self.capture_dir, name, 'trace.json')))
+
+    def _rotate(self):
+        for old in self.captures()[:-self.max_captures]:
+            shutil.rmtree(old, ignore_errors=True)
+
+    # ── Persistence ───────────────────────────────────────────
+
+    def _load_persisted(self):
+        if not os.path.exists(self.traces_path):
+            return []
+        with open(self.traces_path) as f:
+            _flock(f, shared=True)
+            lines = f.readlines()
+        return _parse_lines(lines)[-self.ring_size:]
+
+    def _append_persisted(self, record):
+        """
+        Append under an exclusive lock. Several detect_cli processes share
+        the file, so compaction re-reads it under the same lock and keeps
+        its last ring_size lines rather than writing back this process's
+        (stale) ring
+        """
+        line = json.dumps(record) + '\n'
+        try:
+            os.makedirs(self.capture_dir, exist_ok=True)
+            with open(self.traces_path, 'a+') as f:
+                _flock(f)
+                f.write(line)
+                f.flush()
+                # Compact once the file holds about twice the ring
+                if f.tell() > 2 * self.ring_size * len(line):
+                    f.seek(0)
+                    lines = [l if l.endswith('\n') else l + '\n'
+                             for l in f.readlines()[-self.ring_size:]]
+                    f.seek(0)
+                    f.truncate()
+                    f.writelines(lines)
+                    f.flush()
+        except OSError as e:
+            print(f"Flight recorder persist failed: {e}", file=sys.stderr)
+
+    def summary(self):
+        with self._lock:
+            totals = sorted(t['total_ms'] for t in self.traces)
+        if not totals:
+            return {'traces': 0, 'captured': self.captured}
+        pct = lambda p: round(float(np.percentile(totals, p)), 2)
+        return {'traces': len(totals), 'captured': self.captured,
+                'p50_ms': pct(50), 'p99_ms': pct(99), 'max_ms': totals[-1],
+                'threshold_ms': self.threshold()}
+
+
+def _flock(f, shared=False):
+    """
+    Lock an open file until it is closed (no-op without fcntl)
+    """
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+
+
+def _parse_lines(lines):
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue  # Torn line from a crashed writer
+    return records
+
+
+# ═══════════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════════
+
+def list_captures(capture_dir=CAPTURE_DIR):
+    recorder = FlightRecorder(capture_dir)
+    captures = recorder.captures()
+    if not captures:
+        print(f"No slow requests captured in {capture_dir}")
+        return
+    print(f"{'Capture':40} {'Total ms':>9} {'p99 ms':>8}  Stages")
+    for path in captures:
+        with open(os.path.join(path, 'trace.json')) as f:
+            trace = json.load(f)
+        stages = ', '.join(f"{k}={v:.0f}" for k, v in trace['stages_ms'].items())
+        print(f"{os.path.basename(path):40} {trace['total_ms']:9.1f} {trace.get('threshold_ms', 0):8.1f}  {stages}")
+
+
+def replay(path, runs=3):
+    """
+    Re-run a captured input through detect_cli with the same camera and
+    compare stage timings against the recorded ones
+    """
+    import cv2
+    import detect_cli
+
+    with open(os.path.join(path, 'trace.json')) as f:
+        recorded = json.load(f)
+    inputs = [name for name in os.listdir(path) if name.startswith('input')]
+    if not inputs:
+        print(f"❌ No input captured in {path}")
+        return 1
+    image = cv2.imread(os.path.join(path, inputs[0]))
+
+    print(f"Recorded: {recorded['total_ms']:.1f} ms {recorded['stages_ms']}")
+    replay_recorder = FlightRecorder(profiler=None, threshold_ms=float('inf'))
+    for run in range(runs):
+        trace = replay_recorder.start()
+        with trace.stage('detect'):
+            detect_cli.detect_image(image, camera_id=recorded.get('camera_id'), trace=trace)
+        result = trace.finish()
+        print(f"Replay {run + 1}: {result['total_ms']:.1f} ms {result['stages_ms']}")
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == 'list':
+        list_captures()
+    elif len(sys.argv) >= 3 and sys.argv[1] == 'replay':
+        sys.exit(replay(sys.argv[2]))
+    else:
+        print("Usage: python flight_recorder.py list | replay <capture_dir>")
+        sys.exit(1)
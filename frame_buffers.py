@@ -0,0 +1,93 @@
+# ═══════════════════════════════════════════════════════════════
+# WildGuard - Preallocated Frame Buffers
+# Reuses conversion, resize and annotation arrays across frames so
+# sustained video does not churn full-frame allocations
+# ═══════════════════════════════════════════════════════════════
+
+import os
+import threading
+
+import cv2
+import numpy as np
+from PIL import Image
+
+LOW_MEMORY = os.environ.get('WILDGUARD_LOW_MEMORY', '0') == '1'
+LOW_MEMORY_MAX_SIDE = int(os.environ.get('WILDGUARD_MAX_SIDE', 960))
+
+
+class FramePool:
+    """
+    Per-thread pool of named frame buffers. A buffer is reallocated only
+    when the frame shape changes, so a camera with a fixed resolution
+    reuses the same arrays for every frame.
+
+    low_memory additionally caps frames to max_side pixels on their longest
+    side and returns the pooled output buffer instead of a fresh copy
+    (the returned array is then overwritten by the next frame).
+    """
+    def __init__(self, low_memory=LOW_MEMORY, max_side=LOW_MEMORY_MAX_SIDE):
+        self.low_memory = low_memory
+        self.max_side = max_side if low_memory else None
+        self._local = threading.local()
+
+    def buffer(self, role, shape, dtype=np.uint8):
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            buffers = self._local.buffers = {}
+        buf = buffers.get(role)
+        if buf is None or buf.shape != tuple(shape) or buf.dtype != dtype:
+            buf = buffers[role] = np.empty(shape, dtype=dtype)
+        return buf
+
+    def nbytes(self):
+        buffers = getattr(self._local, 'buffers', {})
+        return sum(buf.nbytes for buf in buffers.values())
+
+    def _cap(self, image):
+        """
+        Downscale into a pooled buffer when the frame exceeds max_side
+        """
+        h, w = image.shape[:2]
+        if self.max_side is None or max(h, w) <= self.max_side:
+            return image
+        scale = self.max_side / max(h, w)
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        dst = self.buffer('scaled', (size[1], size[0]) + image.shape[2:], image.dtype)
+        return cv2.resize(image, size, dst=dst, interpolation=cv2.INTER_AREA)
+
+    def to_bgr(self, image):
+        """
+        Convert a PIL image or RGB / RGBA / grayscale array to BGR in one
+        pass into the pooled 'bgr' buffer
+        """
+        if isinstance(image, Image.Image):
+            if image.mode not in ('RGB', 'RGBA', 'L'):
+                image = image.convert('RGB')
+            # Pillow has no zero-copy export, this is the one remaining per-frame allocation
+            image = np.asarray(image)
+
+        image = self._cap(image)
+        h, w = image.shape[:2]
+        dst = self.buffer('bgr', (h, w, 3))
+
+        if image.ndim == 2:
+            return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR, dst=dst)
+        if image.shape[2] == 4:
+            return cv2.cvtColor(image, cv2.COLOR_RGBA2BGR, dst=dst)
+        return cv2.cvtColor(image, cv2.COLOR_RGB2BGR, dst=dst)
+
+    def annotation_copy(self, image_bgr):
+        """
+        Copy the frame into the pooled annotation buffer for drawing
+        """
+        dst = self.buffer('annotate', image_bgr.shape)
+        np.copyto(dst, image_bgr)
+        return dst
+
+    def to_rgb(self, output_bgr):
+        """
+        Convert the annotated frame back to RGB for display
+        """
+        if self.low_memory:
+            return cv2.cvtColor(output_bgr, cv2.COLOR_BGR2RGB, dst=output_bgr)
+        return cv2.cvtColor(output_bgr, cv2.COLOR_BGR2RGB)
@@ -0,0 +1,201 @@
+# ═══════════════════════════════════════════════════════════════
+# WildGuard - Shared-Memory Frame Ring
+# Fixed-shape frame slots in multiprocessing.shared_memory so decoder
+# and inference processes exchange slot indices instead of pickled frames
+# ═══════════════════════════════════════════════════════════════
+#
+# Slot ownership moves through two queues of small handles:
+#   free  ->  decoder writes frame  ->  ready  ->  worker reads view  ->  free
+# A slot is owned by exactly one process at a time, so a worker's zero-copy
+# view cannot be overwritten while it is in use. When no slot is free the
+# decoder reclaims the oldest ready frame (live video prefers fresh frames).
+
+import multiprocessing as mp
+import queue
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+
+FrameHandle = namedtuple('FrameHandle', 'slot seq height width meta')
+
+# multiprocessing.Queue hands items over through a feeder thread, so a
+# just-released slot can take a moment to become visible to get()
+ACQUIRE_TIMEOUT_S = 0.01
+
+
+class FrameRing:
+    """
+    Create in the parent process and pass to decoder / worker processes as
+    a Process argument; the child side re-attaches to the same segment.
+
+    Frames may be smaller than the slot shape (height x width x channels);
+    views are cropped to the written size.
+    """
+    def __init__(self, slots=8, shape=(1080, 1920, 3), dtype=np.uint8, ctx=None):
+        ctx = ctx or mp.get_context()
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+
+        self._shm = shared_memory.SharedMemory(create=True, size=self._size())
+        self._owner = True
+        self._free = ctx.Queue()
+        self._ready = ctx.Queue()
+        self._counter = ctx.Value('q', 0)
+        self._stats = ctx.Array('q', 3)  # written, reclaimed, dropped
+        self._attach()
+
+        for slot in range(slots):
+            self._free.put(slot)
+
+    def _size(self):
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        return 8 * self.slots + frame_bytes * self.slots
+
+    def _attach(self):
+        buf = self._shm.buf
+        self._seq = np.ndarray((self.slots,), dtype=np.int64, buffer=buf)
+        self._frames = np.ndarray((self.slots,) + self.shape, dtype=self.dtype, buffer=buf, offset=8 * self.slots)
+
+    # ── Pickling (Process arguments) ──────────────────────────
+
+    def __getstate__(self):
+        return {'name': self._shm.name, 'slots': self.slots, 'shape': self.shape, 'dtype': self.dtype.str,
+                'free': self._free, 'ready': self._ready, 'counter': self._counter, 'stats': self._stats}
+
+    def __setstate__(self, state):
+        self.slots = state['slots']
+        self.shape = state['shape']
+        self.dtype = np.dtype(state['dtype'])
+        self._shm = shared_memory.SharedMemory(name=state['name'])
+        self._owner = False
+        self._free = state['free']
+        self._ready = state['ready']
+        self._counter = state['counter']
+        self._stats = state['stats']
+        self._attach()
+
+    # ── Decoder side ──────────────────────────────────────────
+
+    def _acquire_slot(self):
+        try:
+            return self._free.get(timeout=ACQUIRE_TIMEOUT_S)
+        except queue.Empty:
+            pass
+        try:
+            stale = self._ready.get(timeout=ACQUIRE_TIMEOUT_S)
+        except queue.Empty:
+            return None  # Every slot is being processed
+        with self._stats.get_lock():
+            self._stats[1] += 1
+        return stale.slot
+
+    def write(self, frame, **meta):
+        """
+        Copy a frame into a slot and publish it. Returns the handle, or None
+        when every slot is held by a worker and the frame was dropped.
+        """
+        h, w = frame.shape[:2]
+        if h > self.shape[0] or w > self.shape[1] or frame.shape[2:] != self.shape[2:]:
+            raise ValueError(f"Frame {frame.shape} does not fit slot shape {self.shape}")
+
+        slot = self._acquire_slot()
+        if slot is None:
+            with self._stats.get_lock():
+                self._stats[2] += 1
+            return None
+
+        with self._counter.get_lock():
+            self._counter.value += 1
+            seq = self._counter.value
+
+        self._frames[slot, :h, :w] = frame
+        self._seq[slot] = seq
+        meta.setdefault('timestamp', time.time())
+        handle = FrameHandle(slot, seq, h, w, meta)
+        self._ready.put(handle)
+        with self._stats.get_lock():
+            self._stats[0] += 1
+        return handle
+
+    # ── Worker side ───────────────────────────────────────────
+
+    def read(self, timeout=None):
+        """
+        Wait for the next frame. Returns (handle, view) where view is a
+        zero-copy numpy array into shared memory, valid until release(),
+        or (None, None) on timeout.
+        """
+        try:
+            handle = self._ready.get(timeout=timeout)
+        except queue.Empty:
+            return None, None
+        return handle, self.view(handle)
+
+    def view(self, handle):
+        if self._seq[handle.slot] != handle.seq:
+            raise ValueError(f"Slot {handle.slot} no longer holds frame {handle.seq}")
+        return self._frames[handle.slot, :handle.height, :handle.width]
+
+    def release(self, handle):
+        self._free.put(handle.slot)
+
+    # ── Lifecycle ─────────────────────────────────────────────
+
+    def stats(self):
+        with self._stats.get_lock():
+            written, reclaimed, dropped = self._stats[:]
+        return {'slots': self.slots, 'slot_bytes': int(np.prod(self.shape)) * self.dtype.itemsize,
+                'written': written, 'reclaimed': reclaimed, 'dropped': dropped}
+
+    def close(self):
+        """
+        Detach this process; the creating process also frees the segment
+        """
+        self._seq = self._frames = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+# ═══════════════════════════════════════════════════════════════
+# PROCESS LOOPS
+# ═══════════════════════════════════════════════════════════════
+
+def decode_into(ring, source, camera_id, stop_event=None, max_fps=None):
+    """
+    Decoder process body: read a video file / stream into the ring
+    """
+    from camera_scheduler import read_frames
+
+    interval = 1.0 / max_fps if max_fps else 0.0
+    next_at = time.perf_counter()
+    for index, frame in enumerate(read_frames(source)):
+        if stop_event is not None and stop_event.is_set():
+            break
+        ring.write(frame, camera_id=camera_id, frame_index=index)
+        if interval:
+            next_at += interval
+            time.sleep(max(0.0, next_at - time.perf_counter()))
+    ring.close()
+
+
+def consume(ring, process_fn, stop_event, results=None, timeout=0.5):
+    """
+    Inference worker body: run process_fn(view, meta) on each frame and
+    put (meta, result) on the optional results queue
+    """
+    while not stop_event.is_set():
+        handle, view = ring.read(timeout)
+        if handle is None:
+            continue
+        try:
+            result = process_fn(view, handle.meta)
+        finally:
+            view = None  # Exported views would keep close() from detaching
+            ring.release(handle)
+        if results is not None:
+            results.put((handle.meta, result))
+    ring.close()
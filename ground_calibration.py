@@ -0,0 +1,240 @@
+# ═══════════════════════════════════════════════════════════════
+# WildGuard - Ground-Plane Calibration
+# Per-camera homography precomputed into a pixel→meters grid for metric
+# distance to the road and time-to-collision estimates
+# ═══════════════════════════════════════════════════════════════
+#
+# Calibration file (JSON). image_points are normalized 0..1 image
+# coordinates of at least four marks on the ground, ground_points the same
+# marks in meters on the road plane, road the road edge / centre line in
+# ground meters and approach_m the distance over which approaching vehicles
+# are warned (billboard to crossing zone):
+#   {
+#     "cam-north": {
+#       "image_points": [[0.10, 0.95], [0.90, 0.95], [0.70, 0.55], [0.30, 0.55]],
+#       "ground_points": [[-5.0, 0.0], [5.0, 0.0], [5.0, 40.0], [-5.0, 40.0]],
+#       "road": [[-50.0, 2.0], [50.0, 2.0]],
+#       "approach_m": 150
+#     }
+#   }
+#
+# Species speed priors are precomputed from the movement dataset into
+# speed_priors.json, so requests don't parse the CSV:
+#   python ground_calibration.py build-priors
+
+import csv
+import json
+import os
+import sys
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CALIBRATION_PATH = os.environ.get('WILDGUARD_GROUND_CALIBRATION',
+                                          os.path.join(BASE_DIR, 'ground_calibration.json'))
+MOVEMENT_DATASET = os.path.join(BASE_DIR, 'public', 'forest_animal_movement_dataset.csv')
+SPEED_PRIORS_PATH = os.environ.get('WILDGUARD_SPEED_PRIORS', os.path.join(BASE_DIR, 'speed_priors.json'))
+
+# Detector class names that correspond to a movement-dataset species
+SPECIES_ALIASES = {
+    'bear': 'Bear', 'elephant': 'Elephant', 'deer': 'Deer', 'boar': 'Boar', 'wolf': 'Wolf',
+    'leopard': 'Leopard', 'monkey': 'Monkey', 'tiger': 'Tiger', 'rabbit': 'Rabbit', 'fox': 'Fox',
+    'dog': 'Wolf', 'cat': 'Leopard',
+}
+
+DEFAULT_APPROACH_M = 150.0
+SPEED_PERCENTILE = 90  # Conservative prior: most animals move slower than this
+
+
+def load_speed_priors(path=MOVEMENT_DATASET, percentile=SPEED_PERCENTILE):
+    """
+    Per-species movement speed prior (m/s) from movement_speed_mps. The
+    '*' entry is the same percentile over all species, used for classes
+    the dataset does not cover.
+    """
+    speeds = {}
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            speeds.setdefault(row['animal_type'], []).append(float(row['movement_speed_mps']))
+
+    priors = {species: float(np.percentile(values, percentile)) for species, values in speeds.items()}
+    priors['*'] = float(np.percentile(np.concatenate([np.asarray(v) for v in speeds.values()]), percentile))
+    return priors
+
+
+def build_speed_priors(path=SPEED_PRIORS_PATH, dataset=MOVEMENT_DATASET, percentile=SPEED_PERCENTILE):
+    priors = load_speed_priors(dataset, percentile)
+    with open(path, 'w') as f:
+        json.dump({'source': os.path.basename(dataset), 'percentile': percentile,
+                   'priors': {species: round(speed, 4) for species, speed in sorted(priors.items())}}, f, indent=2)
+    print(f"✅ Wrote {len(priors)} speed priors to {path}")
+    return priors
+
+
+def read_speed_priors(path=SPEED_PRIORS_PATH):
+    """
+    Precomputed priors from build_speed_priors(); falls back to parsing
+    the movement dataset when the file is missing or unreadable
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)['priors']
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️  No precomputed speed priors ({e}); parsing {MOVEMENT_DATASET}. "
+              f"Run `python ground_calibration.py build-priors`", file=sys.stderr)
+        return load_speed_priors()
+
+
+def point_to_polyline(points, polyline):
+    """
+    Euclidean distance from each (N, 2) point to the nearest segment of a
+    polyline, vectorized over points
+    """
+    points = np.asarray(points, dtype=np.float64)
+    polyline = np.asarray(polyline, dtype=np.float64)
+    best = np.full(points.shape[0], np.inf)
+    for a, b in zip(polyline[:-1], polyline[1:]):
+        ab = b - a
+        t = np.clip(((points - a) @ ab) / max(ab @ ab, 1e-12), 0.0, 1.0)
+        nearest = a + t[:, None] * ab
+        best = np.minimum(best, np.linalg.norm(points - nearest, axis=1))
+    return best
+
+
+class GroundCalibration:
+    """
+    Registry of per-camera ground homographies. For each (camera, width,
+    height) the ground distance to the road of every grid cell is computed
+    once (grid capped at max_side pixels) and kept in an LRU cache, so a
+    detection costs one array lookup at the bbox bottom-centre, where the
+    animal touches the ground. Cells above the horizon are inf.
+    """
+    def __init__(self, cameras=None, max_side=256, cache_size=32, speed_priors=None):
+        self.cameras = dict(cameras or {})
+        self.max_side = max_side
+        self.cache_size = cache_size
+        self._speed_priors = speed_priors
+        self._grids = OrderedDict()
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_CALIBRATION_PATH, **kwargs):
+        cameras = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                cameras = json.load(f)
+        return cls(cameras, **kwargs)
+
+    def has_camera(self, camera_id):
+        return camera_id in self.cameras
+
+    def set_camera(self, camera_id, image_points, ground_points, road, approach_m=DEFAULT_APPROACH_M):
+        self.cameras[camera_id] = {'image_points': image_points, 'ground_points': ground_points,
+                                   'road': road, 'approach_m': approach_m}
+        for key in [k for k in self._grids if k[0] == camera_id]:
+            del self._grids[key]
+
+    @property
+    def speed_priors(self):
+        if self._speed_priors is None:
+            self._speed_priors = read_speed_priors()
+        return self._speed_priors
+
+    def species_speed(self, species):
+        priors = self.speed_priors
+        name = SPECIES_ALIASES.get(str(species).lower(), str(species).title())
+        return priors.get(name, priors['*'])
+
+    # ── Precomputed grid ──────────────────────────────────────
+
+    def homography(self, camera_id, width, height):
+        calibration = self.cameras[camera_id]
+        image_points = np.asarray(calibration['image_points'], dtype=np.float64) * [width, height]
+        ground_points = np.asarray(calibration['ground_points'], dtype=np.float64)
+        H, _ = cv2.findHomography(image_points, ground_points)
+        if H is None:
+            raise ValueError(f"Degenerate ground calibration for camera {camera_id!r}")
+        # H is only defined up to scale; fix the sign so visible ground has w > 0
+        if (H[2, :2] @ image_points.mean(axis=0) + H[2, 2]) < 0:
+            H = -H
+        return H
+
+    def distance_grid(self, camera_id, width, height):
+        """
+        Return (grid, scale): float32 meters from each grid cell's ground
+        point to the road, and the image→grid scale factor
+        """
+        key = (camera_id, width, height)
+        cached = self._grids.get(key)
+        if cached is not None:
+            self._grids.move_to_end(key)
+            return cached
+
+        H = self.homography(camera_id, width, height)
+        scale = min(1.0, self.max_side / max(width, height))
+        grid_w, grid_h = max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+        # Cell centres in image pixels, projected with homogeneous coordinates
+        xs = (np.arange(grid_w) + 0.5) / scale
+        ys = (np.arange(grid_h) + 0.5) / scale
+        gx, gy = np.meshgrid(xs, ys)
+        pixels = np.stack([gx.ravel(), gy.ravel(), np.ones(gx.size)])
+        projected = H @ pixels
+        w = projected[2]
+        valid = w > 1e-9  # Beyond the horizon the plane maps behind the camera
+        ground = (projected[:2, valid] / w[valid]).T
+
+        distances = np.full(gx.size, np.inf)
+        distances[valid] = point_to_polyline(ground, self.cameras[camera_id]['road'])
+        grid = distances.reshape(grid_h, grid_w).astype(np.float32)
+
+        self._grids[key] = (grid, scale)
+        if len(self._grids) > self.cache_size:
+            self._grids.popitem(last=False)
+        return grid, scale
+
+    # ── Lookup ────────────────────────────────────────────────
+
+    def distances_m(self, camera_id, image_shape, bboxes):
+        """
+        Ground distance to the road in meters for an array of
+        [x1, y1, x2, y2] boxes
+        """
+        h, w = image_shape[:2]
+        grid, scale = self.distance_grid(camera_id, w, h)
+        bboxes = np.asarray(bboxes, dtype=np.float32).reshape(-1, 4)
+        cols = np.clip(((bboxes[:, 0] + bboxes[:, 2]) / 2 * scale).astype(np.int32), 0, grid.shape[1] - 1)
+        rows = np.clip((bboxes[:, 3] * scale).astype(np.int32), 0, grid.shape[0] - 1)
+        return grid[rows, cols]
+
+    def time_to_collision(self, camera_id, image_shape, bboxes, species, vehicle_speed_kmh):
+        """
+        Vectorized metric risk for all detections of one frame:
+          distance_m      - ground distance from the animal to the road
+          time_to_road_s  - distance_m / species speed prior
+          vehicle_eta_s   - time for a vehicle at vehicle_speed_kmh to cover
+                            the camera's approach distance
+          conflict        - the animal can reach the road before the
+                            vehicle has passed through the crossing zone
+        """
+        distance_m = self.distances_m(camera_id, image_shape, bboxes).astype(np.float64)
+        speeds = np.array([self.species_speed(s) for s in species], dtype=np.float64)
+        time_to_road_s = distance_m / np.maximum(speeds, 1e-3)
+
+        approach_m = self.cameras[camera_id].get('approach_m', DEFAULT_APPROACH_M)
+        vehicle_eta_s = approach_m / max(vehicle_speed_kmh / 3.6, 1e-3)
+        return {
+            'distance_m': distance_m,
+            'speed_prior_mps': speeds,
+            'time_to_road_s': time_to_road_s,
+            'vehicle_eta_s': vehicle_eta_s,
+            'conflict': time_to_road_s <= vehicle_eta_s
+        }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != 'build-priors':
+        print("Usage: python ground_calibration.py build-priors")
+        sys.exit(1)
+    build_speed_priors()
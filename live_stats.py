@@ -0,0 +1,119 @@
+# ═══════════════════════════════════════════════════════════════
+# WildGuard - Live Statistics
+# Sliding-window species counts, alerts per camera and peak risk for the
+# dashboard, kept in fixed time buckets with O(1) updates
+# ═══════════════════════════════════════════════════════════════
+
+import threading
+import time
+
+WINDOWS_S = (300, 900, 3600)  # 5 / 15 / 60 minutes
+
+
+class _Bucket:
+    __slots__ = ('index', 'species', 'alerts', 'detections', 'peak_risk')
+
+    def __init__(self):
+        self.reset(-1)
+
+    def reset(self, index):
+        self.index = index
+        self.species = {}
+        self.alerts = {}
+        self.detections = 0
+        self.peak_risk = 0.0
+
+
+class LiveStats:
+    """
+    Ring of bucket_s-wide buckets covering the longest window. A record
+    touches only the current bucket (recycled when its time slot comes
+    round again), and snapshot() merges at most longest_window / bucket_s
+    buckets however many detections they hold. Windows are aligned to
+    bucket boundaries, so the newest bucket may be partial.
+    """
+    def __init__(self, bucket_s=60, windows_s=WINDOWS_S):
+        self.bucket_s = bucket_s
+        self.windows_s = tuple(sorted(windows_s))
+        self._buckets = [_Bucket() for _ in range(-(-self.windows_s[-1] // bucket_s))]
+        self._lock = threading.Lock()
+        self._cached = None
+
+    def _bucket(self, ts):
+        index = int(ts // self.bucket_s)
+        bucket = self._buckets[index % len(self._buckets)]
+        if bucket.index > index:
+            return None  # Older than the longest window
+        if bucket.index != index:
+            bucket.reset(index)
+        return bucket
+
+    # ── Updates ───────────────────────────────────────────────
+
+    def record_detection(self, species, risk_score, ts=None):
+        with self._lock:
+            bucket = self._bucket(time.time() if ts is None else ts)
+            if bucket is None:
+                return
+            bucket.species[species] = bucket.species.get(species, 0) + 1
+            bucket.detections += 1
+            bucket.peak_risk = max(bucket.peak_risk, risk_score)
+            self._cached = None
+
+    def record_alert(self, camera_id=None, ts=None):
+        with self._lock:
+            bucket = self._bucket(time.time() if ts is None else ts)
+            if bucket is None:
+                return
+            bucket.alerts[camera_id] = bucket.alerts.get(camera_id, 0) + 1
+            self._cached = None
+
+    # ── Snapshot ──────────────────────────────────────────────
+
+    def snapshot(self, now=None):
+        """
+        Per-window totals, newest first:
+          {'5m': {'detections', 'species', 'species_per_minute',
+                  'alerts_by_camera', 'peak_risk'}, ..., 'timeline': [...]}
+        Repeated calls within a bucket with no new records are served from
+        a cache.
+        """
+        now = time.time() if now is None else now
+        current = int(now // self.bucket_s)
+        with self._lock:
+            if self._cached is not None and self._cached[0] == current:
+                return self._cached[1]
+
+            buckets = [b for b in self._buckets if current - len(self._buckets) < b.index <= current]
+            buckets.sort(key=lambda b: b.index, reverse=True)
+
+            # Windows are nested, so one newest-to-oldest pass fills them all
+            species, alerts, detections, peak = {}, {}, 0, 0.0
+            result = {}
+            windows = list(self.windows_s)
+            for bucket in buckets + [None]:
+                while windows and (bucket is None or bucket.index <= current - windows[0] // self.bucket_s):
+                    minutes = windows[0] / 60
+                    result[f"{windows[0] // 60}m"] = {
+                        'detections': detections,
+                        'species': dict(species),
+                        'species_per_minute': {k: v / minutes for k, v in species.items()},
+                        'alerts_by_camera': dict(alerts),
+                        'peak_risk': peak
+                    }
+                    windows.pop(0)
+                if bucket is None:
+                    break
+                for name, count in bucket.species.items():
+                    species[name] = species.get(name, 0) + count
+                for camera_id, count in bucket.alerts.items():
+                    alerts[camera_id] = alerts.get(camera_id, 0) + count
+                detections += bucket.detections
+                peak = max(peak, bucket.peak_risk)
+
+            result['timeline'] = [{'start': b.index * self.bucket_s, 'species': dict(b.species),
+                                   'alerts': sum(b.alerts.values()), 'peak_risk': b.peak_risk}
+                                  for b in buckets]
+            result['generated_at'] = now
+            self._cached = (current, result)
+            return result
@@ -0,0 +1,202 @@
+# ═══════════════════════════════════════════════════════════════
+# WildGuard - Model Artifact Cache
+# Build-time pre-fused YOLO artifacts, warm-up at startup and
+# cold-start tracking
+# ═══════════════════════════════════════════════════════════════
+#
+# Usage:
+#   python model_cache.py build [weights ...]   # e.g. during docker build
+#   python model_cache.py report                # cold-start history
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, 'models')
+COLD_START_LOG = os.path.join(BASE_DIR, 'logs', 'cold_start.jsonl')
+COLD_START_MAX_RECORDS = 1000
+READY_FILE = os.environ.get('WILDGUARD_READY_FILE', '/tmp/wildguard.ready')
+DEFAULT_WEIGHTS = ('yolov8m.pt', 'yolov8n.pt')
+
+
+def artifact_paths(weights, cache_dir=CACHE_DIR):
+    stem = os.path.splitext(os.path.basename(weights))[0]
+    base = os.path.join(cache_dir, f"{stem}.fused")
+    return base + '.pt', base + '.json'
+
+
+def _versions():
+    import torch
+    import ultralytics
+    return {'ultralytics': ultralytics.__version__, 'torch': torch.__version__}
+
+
+# ═══════════════════════════════════════════════════════════════
+# BUILD
+# ═══════════════════════════════════════════════════════════════
+
+def build_artifact(weights, cache_dir=CACHE_DIR):
+    """
+    Load weights, fuse Conv+BN layers and save a checkpoint that YOLO()
+    loads without re-fusing
+    """
+    import torch
+    from ultralytics import YOLO
+
+    os.makedirs(cache_dir, exist_ok=True)
+    artifact, meta_path = artifact_paths(weights, cache_dir)
+
+    start = time.perf_counter()
+    model = YOLO(weights)
+    model.fuse()
+    torch.save({
+        'model': model.model,
+        'train_args': dict(getattr(model.model, 'args', None) or {}),
+        'date': datetime.now().isoformat(),
+    }, artifact)
+
+    source = model.ckpt_path or weights
+    meta = {
+        'source': os.path.abspath(source),
+        'source_mtime': os.path.getmtime(source) if os.path.exists(source) else None,
+        'fused': True,
+        'built_at': datetime.now().isoformat(),
+        'build_s': round(time.perf_counter() - start, 3),
+        **_versions()
+    }
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    print(f"✅ Built {artifact} in {meta['build_s']:.2f}s")
+    return artifact
+
+
+def cached_artifact(weights, cache_dir=CACHE_DIR):
+    """
+    Return the artifact path if it exists and still matches the source
+    weights and installed library versions, else None
+    """
+    artifact, meta_path = artifact_paths(weights, cache_dir)
+    if not (os.path.exists(artifact) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if any(meta.get(k) != v for k, v in _versions().items()):
+            return None
+        if os.path.exists(weights) and meta.get('source_mtime') is not None \
+                and os.path.getmtime(weights) > meta['source_mtime']:
+            return None
+    except (OSError, ValueError):
+        return None
+    return artifact
+
+
+# ═══════════════════════════════════════════════════════════════
+# LOAD & WARM UP
+# ═══════════════════════════════════════════════════════════════
+
+def load_model(weights, warmup_sizes=(640,), warmup_runs=2, cache_dir=CACHE_DIR, log_path=COLD_START_LOG,
+               predict_kwargs=None):
+    """
+    Load the pre-fused artifact when available (falling back to the raw
+    weights), run warm-up passes at each input size and record the
+    cold-start timings (skipped when log_path is None, e.g. for one-shot
+    processes). Returns the ready YOLO model.
+
+    predict_kwargs (device / half from the runtime profile) must match the
+    ones later inference uses: ultralytics sets up the predictor on the
+    first call, so the warm-up decides the device and precision.
+    """
+    predict_kwargs = predict_kwargs or {}
+    from ultralytics import YOLO
+
+    start = time.perf_counter()
+    # Pre-fused artifacts exist only for torch weights, not exported backends
+    artifact = cached_artifact(weights, cache_dir) if weights.endswith('.pt') else None
+    model = YOLO(artifact or weights)
+    load_s = time.perf_counter() - start
+
+    first_inference_s = None
+    for size in warmup_sizes:
+        frame = np.zeros((size, size, 3), dtype=np.uint8)
+        for _ in range(warmup_runs):
+            t = time.perf_counter()
+            model(frame, imgsz=size, verbose=False, **predict_kwargs)
+            if first_inference_s is None:
+                first_inference_s = time.perf_counter() - t
+
+    timings = {
+        'time': datetime.now().isoformat(),
+        'weights': os.path.basename(weights),
+        'artifact': artifact is not None,
+        'warmup_sizes': list(warmup_sizes),
+        'load_s': round(load_s, 3),
+        'first_inference_s': None if first_inference_s is None else round(first_inference_s, 3),
+        'cold_start_s': round(time.perf_counter() - start, 3)
+    }
+    if log_path is not None:
+        record_cold_start(timings, log_path)
+    return model
+
+
+def record_cold_start(timings, log_path=COLD_START_LOG, max_records=COLD_START_MAX_RECORDS):
+    """
+    Append one cold-start record, trimming the log to its newest
+    max_records once it holds twice that many
+    """
+    try:
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        with open(log_path, 'a+') as f:
+            f.write(json.dumps(timings) + '\n')
+            f.seek(0)
+            lines = f.readlines()
+            if len(lines) > 2 * max_records:
+                f.seek(0)
+                f.truncate()
+                f.writelines(lines[-max_records:])
+    except OSError:
+        pass
+
+
+def mark_ready(path=READY_FILE):
+    with open(path, 'w') as f:
+        f.write(datetime.now().isoformat())
+
+
+def clear_ready(path=READY_FILE):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def report(log_path=COLD_START_LOG):
+    if not os.path.exists(log_path):
+        print("No cold starts recorded yet")
+        return
+
+    with open(log_path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    print(f"{'Weights':15} {'Artifact':9} {'Starts':>6} {'Median (s)':>11} {'Last (s)':>9}")
+    groups = {}
+    for rec in records:
+        groups.setdefault((rec['weights'], rec['artifact']), []).append(rec['cold_start_s'])
+    for (weights, artifact), values in sorted(groups.items()):
+        print(f"{weights:15} {str(artifact):9} {len(values):6} {float(np.median(values)):11.3f} {values[-1]:9.3f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ('build', 'report'):
+        print("Usage: python model_cache.py build [weights ...] | report")
+        sys.exit(1)
+
+    if sys.argv[1] == 'build':
+        for weights in sys.argv[2:] or DEFAULT_WEIGHTS:
+            build_artifact(weights)
+    else:
+        report()
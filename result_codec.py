@@ -0,0 +1,155 @@
+# ═══════════════════════════════════════════════════════════════
+# WildGuard - Compact Result Encoding
+# Packed binary layout for detect_cli results, carrying exactly the same
+# information as the JSON document
+# ═══════════════════════════════════════════════════════════════
+#
+# Layout (little-endian):
+#   header     4s magic 'WGD1', u8 version, u8 riskLevel, u16 vehicleSpeed,
+#              i16 crossingProbability, i16 distanceToRoad, u16 detections
+#   species    u8 count, then per name: u8 length + UTF-8 bytes
+#   detection  u16 id, u16 species index, u16 confidence (tenths of a %),
+#              i32 x, i32 y, i32 width, i32 height, u8 alert_level,
+#              f64 risk_score, f64 crossing_probability, f64 distance_to_road
+#   ground     optional, present for ground-calibrated cameras: f64
+#              distanceToRoadM, f64 timeToRoad, f64 vehicleEta, then per
+#              detection f64 distance_m, f64 time_to_road_s, u8 conflict
+#              (NaN encodes null)
+
+import struct
+
+MAGIC = b'WGD1'
+VERSION = 1
+CONTENT_TYPE = 'application/x-wildguard-detections'
+
+HEADER = struct.Struct('<4sBBHhhH')
+DETECTION = struct.Struct('<HHHiiiiBddd')
+GROUND = struct.Struct('<ddd')
+GROUND_DETECTION = struct.Struct('<ddB')
+
+RISK_LEVELS = ('safe', 'caution', 'warning', 'critical')
+ALERT_LEVELS = ('LOW', 'CAUTION', 'WARNING', 'CRITICAL')
+
+
+def encode(output):
+    """
+    Pack a detect_cli result dict into bytes
+    """
+    detections = output['detections']
+    species = []
+    species_index = {}
+    for det in detections:
+        if det['animal'] not in species_index:
+            species_index[det['animal']] = len(species)
+            species.append(det['animal'])
+
+    parts = [HEADER.pack(
+        MAGIC,
+        VERSION,
+        RISK_LEVELS.index(output['riskLevel']),
+        output['vehicleSpeed'],
+        output['crossingProbability'],
+        output['distanceToRoad'],
+        len(detections)
+    )]
+
+    parts.append(struct.pack('<B', len(species)))
+    for name in species:
+        raw = name.encode('utf-8')
+        parts.append(struct.pack('<B', len(raw)) + raw)
+
+    for det in detections:
+        bbox = det['bbox']
+        risk = det['risk']
+        parts.append(DETECTION.pack(
+            det['id'],
+            species_index[det['animal']],
+            int(round(det['confidence'] * 10)),
+            bbox['x'], bbox['y'], bbox['width'], bbox['height'],
+            ALERT_LEVELS.index(risk['alert_level']),
+            risk['risk_score'],
+            risk['crossing_probability'],
+            risk['distance_to_road']
+        ))
+
+    if 'distanceToRoadM' in output:
+        parts.append(GROUND.pack(output['distanceToRoadM'], _nan(output['timeToRoad']), _nan(output['vehicleEta'])))
+        for det in detections:
+            risk = det['risk']
+            parts.append(GROUND_DETECTION.pack(_nan(risk['distance_m']), _nan(risk['time_to_road_s']),
+                                               int(risk['conflict'])))
+
+    return b''.join(parts)
+
+
+def _nan(value):
+    return float('nan') if value is None else value
+
+
+def _none(value):
+    return None if value != value else value
+
+
+def decode(data):
+    """
+    Unpack bytes produced by encode() back into the JSON-equivalent dict
+    """
+    magic, version, risk_level, vehicle_speed, crossing, distance, count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a WildGuard detection payload")
+    if version != VERSION:
+        raise ValueError(f"Unsupported payload version: {version}")
+    offset = HEADER.size
+
+    (n_species,) = struct.unpack_from('<B', data, offset)
+    offset += 1
+    species = []
+    for _ in range(n_species):
+        (length,) = struct.unpack_from('<B', data, offset)
+        offset += 1
+        species.append(data[offset:offset + length].decode('utf-8'))
+        offset += length
+
+    detections = []
+    for _ in range(count):
+        (det_id, species_idx, conf_tenths, x, y, width, height,
+         alert_level, risk_score, crossing_prob, distance_to_road) = DETECTION.unpack_from(data, offset)
+        offset += DETECTION.size
+        detections.append({
+            "id": det_id,
+            "animal": species[species_idx],
+            "confidence": conf_tenths / 10,
+            "bbox": {
+                "x": x,
+                "y": y,
+                "width": width,
+                "height": height
+            },
+            "risk": {
+                'risk_score': risk_score,
+                'alert_level': ALERT_LEVELS[alert_level],
+                'crossing_probability': crossing_prob,
+                'distance_to_road': distance_to_road
+            }
+        })
+
+    output = {
+        "detections": detections,
+        "vehicleSpeed": vehicle_speed,
+        "riskLevel": RISK_LEVELS[risk_level],
+        "crossingProbability": crossing,
+        "distanceToRoad": distance
+    }
+
+    if offset < len(data):
+        distance_to_road_m, time_to_road, vehicle_eta = GROUND.unpack_from(data, offset)
+        offset += GROUND.size
+        for det in detections:
+            distance_m, time_to_road_s, conflict = GROUND_DETECTION.unpack_from(data, offset)
+            offset += GROUND_DETECTION.size
+            det['risk'].update({'distance_m': _none(distance_m), 'time_to_road_s': _none(time_to_road_s),
+                                'conflict': bool(conflict)})
+        output.update({"distanceToRoadM": distance_to_road_m, "timeToRoad": _none(time_to_road),
+                       "vehicleEta": _none(vehicle_eta)})
+
+    return output
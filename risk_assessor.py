@@ -0,0 +1,54 @@
+# ═══════════════════════════════════════════════════════════════
+# WildGuard - Risk Assessor
+# Collision risk from an animal's distance to the road, shared by the
+# Gradio app and detect_cli
+# ═══════════════════════════════════════════════════════════════
+
+
+class RiskAssessor:
+    def __init__(self, road_geometry=None):
+        # Cameras without configured geometry keep the 75% road line
+        self.road_geometry = road_geometry
+
+    def assess_risk(self, bbox, image_shape, vehicle_speed=60, camera_id=None):
+        """
+        Fixed center_y calculation - was using bbox+bbox incorrectly
+        """
+        h, w = image_shape[:2]
+        if self.road_geometry is not None and self.road_geometry.has_camera(camera_id):
+            # One lookup in the camera's cached distance-transform map
+            distance_to_road = self.road_geometry.distance(camera_id, image_shape, bbox)
+        else:
+            x1, y1, x2, y2 = bbox
+            center_y = (y1 + y2) / 2
+            road_y = h * 0.75  # Road assumed at 75% of image height
+            distance_to_road = abs(center_y - road_y) / h
+        
+        # Risk scoring based on distance
+        if distance_to_road < 0.05:
+            risk_score = 0.95
+            alert_level = "CRITICAL"
+            crossing_prob = 0.98
+        elif distance_to_road < 0.15:
+            risk_score = 0.75
+            alert_level = "WARNING"
+            crossing_prob = 0.80
+        elif distance_to_road < 0.35:
+            risk_score = 0.45
+            alert_level = "CAUTION"
+            crossing_prob = 0.50
+        else:
+            risk_score = 0.15
+            alert_level = "LOW"
+            crossing_prob = 0.20
+        
+        # Speed factor adjustment
+        speed_factor = min(vehicle_speed / 100, 1.0)
+        risk_score = min(risk_score * (1 + speed_factor * 0.5), 1.0)
+        
+        return {
+            'risk_score': risk_score,
+            'alert_level': alert_level,
+            'crossing_probability': crossing_prob,
+            'distance_to_road': distance_to_road
+        }
@@ -0,0 +1,149 @@
+# ═══════════════════════════════════════════════════════════════
+# WildGuard - Per-Camera Road Geometry
+# Road polylines / polygons rasterized into a distance-transform map so
+# each detection's distance to the road is a single array lookup
+# ═══════════════════════════════════════════════════════════════
+#
+# Geometry file (JSON, coordinates normalized to 0..1 of width/height):
+#   {
+#     "cam-north": {"polylines": [[[0.0, 0.70], [0.5, 0.78], [1.0, 0.90]]]},
+#     "cam-bridge": {"polygons": [[[0.2, 0.6], [0.8, 0.6], [1.0, 1.0], [0.0, 1.0]]],
+#                    "anchor": "bottom"}
+#   }
+# Polylines are road centre lines; polygons are road surfaces (distance 0
+# inside). "anchor" picks the bbox point used for lookup: "center"
+# (default, matches RiskAssessor) or "bottom" (the animal's feet).
+
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_GEOMETRY_PATH = os.environ.get('WILDGUARD_ROAD_GEOMETRY', os.path.join(BASE_DIR, 'road_geometry.json'))
+
+# Equivalent of the legacy assumption: a horizontal road at 75% height
+DEFAULT_ROAD = {'polylines': [[[0.0, 0.75], [1.0, 0.75]]], 'anchor': 'center'}
+
+
+class RoadGeometry:
+    """
+    Registry of per-camera road geometry with an LRU cache of distance maps
+    keyed by (camera_id, width, height). Maps are computed at most
+    max_side pixels on their longest side; distances are returned as a
+    fraction of image height like RiskAssessor's distance_to_road.
+    Geometry that rasterizes to no road pixels (empty or misspelled keys)
+    falls back to the 75% line with a warning.
+    """
+    def __init__(self, cameras=None, max_side=512, cache_size=32):
+        self.cameras = dict(cameras or {})
+        self.max_side = max_side
+        self.cache_size = cache_size
+        self._maps = OrderedDict()
+        self._lock = threading.Lock()  # Gradio serves requests on several threads
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_GEOMETRY_PATH, **kwargs):
+        cameras = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                cameras = json.load(f)
+        return cls(cameras, **kwargs)
+
+    def has_camera(self, camera_id):
+        return camera_id in self.cameras
+
+    def set_camera(self, camera_id, polylines=None, polygons=None, anchor='center'):
+        with self._lock:
+            self.cameras[camera_id] = {'polylines': polylines or [], 'polygons': polygons or [], 'anchor': anchor}
+            for key in [k for k in self._maps if k[0] == camera_id]:
+                del self._maps[key]
+
+    def _geometry(self, camera_id):
+        return self.cameras.get(camera_id, DEFAULT_ROAD)
+
+    # ── Rasterization ─────────────────────────────────────────
+
+    def distance_map(self, camera_id, width, height):
+        """
+        Return (map, scale): float32 distances in map pixels to the nearest
+        road pixel, and the image→map scale factor
+        """
+        key = (camera_id, width, height)
+        with self._lock:
+            cached = self._maps.get(key)
+            if cached is not None:
+                self._maps.move_to_end(key)
+                return cached
+
+            scale = min(1.0, self.max_side / max(width, height))
+            map_w, map_h = max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+            mask = self._road_mask(self._geometry(camera_id), map_w, map_h)
+            if not (mask == 0).any():
+                print(f"⚠️  Road geometry for camera {camera_id!r} has no road pixels; "
+                      f"using the 75% line", file=sys.stderr)
+                mask = self._road_mask(DEFAULT_ROAD, map_w, map_h)
+
+            dist = cv2.distanceTransform(mask, cv2.DIST_L2, cv2.DIST_MASK_PRECISE)
+            self._maps[key] = (dist, scale)
+            if len(self._maps) > self.cache_size:
+                self._maps.popitem(last=False)
+            return dist, scale
+
+    @staticmethod
+    def _road_mask(geometry, map_w, map_h):
+        """
+        255 everywhere except road pixels: distanceTransform measures
+        distance to the nearest zero pixel
+        """
+        to_px = lambda points: np.round(np.array(points, dtype=np.float32) * [map_w - 1, map_h - 1]).astype(np.int32)
+        mask = np.full((map_h, map_w), 255, dtype=np.uint8)
+        for polygon in geometry.get('polygons', []):
+            if len(polygon):
+                cv2.fillPoly(mask, [to_px(polygon)], 0)
+        for polyline in geometry.get('polylines', []):
+            if len(polyline):
+                cv2.polylines(mask, [to_px(polyline)], False, 0, 1)
+        return mask
+
+    # ── Lookup ────────────────────────────────────────────────
+
+    def anchors(self, camera_id, bboxes):
+        bboxes = np.asarray(bboxes, dtype=np.float32).reshape(-1, 4)
+        x = (bboxes[:, 0] + bboxes[:, 2]) / 2
+        if self._geometry(camera_id).get('anchor', 'center') == 'bottom':
+            y = bboxes[:, 3]
+        else:
+            y = (bboxes[:, 1] + bboxes[:, 3]) / 2
+        return x, y
+
+    def distances(self, camera_id, image_shape, bboxes):
+        """
+        Vectorized distance_to_road (fraction of image height) for an
+        array of [x1, y1, x2, y2] boxes
+        """
+        h, w = image_shape[:2]
+        dist, scale = self.distance_map(camera_id, w, h)
+        x, y = self.anchors(camera_id, bboxes)
+        cols = np.clip((x * scale).astype(np.int32), 0, dist.shape[1] - 1)
+        rows = np.clip((y * scale).astype(np.int32), 0, dist.shape[0] - 1)
+        return dist[rows, cols] / (h * scale)
+
+    def distance(self, camera_id, image_shape, bbox):
+        return float(self.distances(camera_id, image_shape, [bbox])[0])
+
+    # ── Drawing ───────────────────────────────────────────────
+
+    def draw(self, image, camera_id, color=(0, 255, 255), thickness=3):
+        h, w = image.shape[:2]
+        geometry = self._geometry(camera_id)
+        to_px = lambda points: np.round(np.array(points, dtype=np.float32) * [w - 1, h - 1]).astype(np.int32)
+        for polygon in geometry.get('polygons', []):
+            cv2.polylines(image, [to_px(polygon)], True, color, thickness)
+        for polyline in geometry.get('polylines', []):
+            cv2.polylines(image, [to_px(polyline)], False, color, thickness)
+        return image
@@ -0,0 +1,100 @@
+# ═══════════════════════════════════════════════════════════════
+# WildGuard - Runtime Profile
+# Host-specific inference settings (torch threads, backend) chosen by
+# scripts/autotune.py and applied at detector startup. Messages go to
+# stderr: detect_cli's stdout carries the result document
+# ═══════════════════════════════════════════════════════════════
+
+import json
+import os
+import platform
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_PATH = os.environ.get('WILDGUARD_RUNTIME_PROFILE', os.path.join(BASE_DIR, 'models', 'runtime_profile.json'))
+
+BACKENDS = ('torch-cpu', 'torch-cuda', 'torch-cuda-half', 'onnx')
+
+
+def host_fingerprint():
+    """
+    What a profile was measured on; a profile from a different host shape
+    or library version is ignored
+    """
+    import torch
+    return {
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'torch': torch.__version__,
+        'cuda': torch.cuda.get_device_name(0) if torch.cuda.is_available() else None,
+    }
+
+
+def backend_weights(weights, backend, cache_dir=os.path.join(BASE_DIR, 'models')):
+    """
+    Weights file a backend loads: the .pt itself for torch, the exported
+    model in cache_dir otherwise
+    """
+    if backend == 'onnx':
+        stem = os.path.splitext(os.path.basename(weights))[0]
+        return os.path.join(cache_dir, f"{stem}.onnx")
+    return weights
+
+
+def predict_kwargs(backend):
+    if backend == 'torch-cuda':
+        return {'device': 0}
+    if backend == 'torch-cuda-half':
+        return {'device': 0, 'half': True}
+    return {'device': 'cpu'}
+
+
+def load_profile(path=PROFILE_PATH, weights=None):
+    """
+    Return the selected configuration from an autotune profile, or None
+    when there is no profile or it was measured on a different host or
+    for different weights
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            profile = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Ignoring unreadable runtime profile {path}: {e}", file=sys.stderr)
+        return None
+
+    if weights is not None and os.path.basename(profile.get('weights', '')) != os.path.basename(weights):
+        print(f"⚠️  Ignoring runtime profile {path}: tuned for {profile.get('weights')}, not {weights}",
+              file=sys.stderr)
+        return None
+
+    host = host_fingerprint()
+    if profile.get('host') != host:
+        print(f"⚠️  Ignoring runtime profile {path}: measured on {profile.get('host')}, this host is {host}",
+              file=sys.stderr)
+        return None
+    return profile['selected']
+
+
+def apply_profile(selected, weights):
+    """
+    Apply process-wide settings from a selected configuration and return
+    (weights to load, predict kwargs). Without a profile the library
+    defaults are kept.
+    """
+    if selected is None:
+        return weights, {}
+
+    import torch
+    if selected.get('threads'):
+        torch.set_num_threads(selected['threads'])
+
+    backend = selected['backend']
+    path = backend_weights(weights, backend)
+    if not os.path.exists(path) and path != weights:
+        print(f"⚠️  {backend} model {path} missing, using {weights} on torch-cpu", file=sys.stderr)
+        return weights, predict_kwargs('torch-cpu')
+
+    print(f"⚙️  Runtime profile: {backend}, {selected.get('threads')} threads", file=sys.stderr)
+    return path, predict_kwargs(backend)
@@ -0,0 +1,207 @@
+"""
+Autotune WildGuard inference settings for this host
+
+Benchmarks torch intra-op thread counts and the available backends
+(torch CPU, CUDA fp32/fp16, ONNX Runtime when installed) on
+representative frames, one frame per call as the detector and detect_cli
+run them. The configuration with the highest throughput whose p95 latency
+meets the SLO is written to the runtime profile, which WildGuardDetector
+loads at startup.
+
+Usage:
+    python scripts/autotune.py --slo-ms 250
+    python scripts/autotune.py --weights yolov8n.pt --threads 1,2,4 --backends torch-cpu
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, 'scripts'))
+
+from runtime_profile import PROFILE_PATH, backend_weights, host_fingerprint, predict_kwargs
+
+
+# ═══════════════════════════════════════════════════════════════
+# CANDIDATES
+# ═══════════════════════════════════════════════════════════════
+
+def available_backends():
+    import torch
+    backends = ['torch-cpu']
+    if torch.cuda.is_available():
+        backends += ['torch-cuda', 'torch-cuda-half']
+    try:
+        import onnxruntime  # noqa: F401
+        backends.append('onnx')
+    except ImportError:
+        pass
+    return backends
+
+
+def default_threads():
+    cpus = os.cpu_count() or 1
+    counts = {1, cpus}
+    n = 2
+    while n < cpus:
+        counts.add(n)
+        n *= 2
+    return sorted(counts)
+
+
+def load_frames(count, imgsz):
+    """
+    Frames from test_images/ when present, else synthetic crossing scenes
+    """
+    paths = sorted(p for ext in ('*.jpg', '*.png') for p in glob.glob(os.path.join(BASE_DIR, 'test_images', ext)))
+    paths = paths[:count]
+    frames = [frame for frame in (cv2.imread(p) for p in paths) if frame is not None]
+    if len(frames) < count:
+        from generate_test_video import iter_frames
+        height = imgsz * 3 // 4
+        for _, frame, _ in iter_frames(width=imgsz, height=height, duration=count, fps=1, animals=6, seed=3):
+            frames.append(frame.copy())
+            if len(frames) == count:
+                break
+    return frames
+
+
+def prepare_backend(weights, backend, imgsz):
+    """
+    Load the model for a backend, exporting to ONNX first if needed
+    """
+    from model_cache import load_model
+
+    if backend == 'onnx':
+        path = backend_weights(weights, backend)
+        if not os.path.exists(path):
+            from ultralytics import YOLO
+            print(f"📦 Exporting {weights} to ONNX...")
+            exported = YOLO(weights).export(format='onnx', imgsz=imgsz, dynamic=True)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(exported, path)
+        return load_model(path, warmup_sizes=())
+    return load_model(weights, warmup_sizes=())
+
+
+# ═══════════════════════════════════════════════════════════════
+# BENCHMARK
+# ═══════════════════════════════════════════════════════════════
+
+def benchmark(model, frames, backend, threads, imgsz, runs, warmup):
+    """
+    Time single-frame calls, the only way the runtime invokes the model
+    """
+    import torch
+    if threads:
+        torch.set_num_threads(threads)
+    kwargs = predict_kwargs(backend)
+
+    for i in range(warmup):
+        model(frames[i % len(frames)], imgsz=imgsz, conf=0.25, verbose=False, **kwargs)
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(runs):
+        t = time.perf_counter()
+        model(frames[i % len(frames)], imgsz=imgsz, conf=0.25, verbose=False, **kwargs)
+        latencies.append((time.perf_counter() - t) * 1000)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'backend': backend,
+        'threads': threads,
+        'imgsz': imgsz,
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p95_ms': round(float(np.percentile(latencies, 95)), 2),
+        'fps': round(runs / elapsed, 2),
+    }
+
+
+def select(results, slo_ms):
+    """
+    Highest throughput within the SLO (fewer threads on ties); if nothing
+    meets it, the lowest-latency configuration
+    """
+    eligible = [r for r in results if r['p95_ms'] <= slo_ms]
+    if eligible:
+        best = max(eligible, key=lambda r: (r['fps'], -(r['threads'] or 0)))
+        return {**best, 'meets_slo': True}
+    best = min(results, key=lambda r: r['p95_ms'])
+    return {**best, 'meets_slo': False}
+
+
+def print_results(results, selected):
+    print(f"\n{'Backend':16} {'Threads':>7} {'p50 ms':>8} {'p95 ms':>8} {'FPS':>7}")
+    for r in sorted(results, key=lambda r: -r['fps']):
+        mark = '  ◀' if all(r[k] == selected[k] for k in ('backend', 'threads')) else ''
+        threads = r['threads'] if r['threads'] else '-'
+        print(f"{r['backend']:16} {threads:>7} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['fps']:7.2f}{mark}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Autotune WildGuard inference settings for this host")
+    parser.add_argument('--weights', default='yolov8m.pt')
+    parser.add_argument('--slo-ms', type=float, default=250.0, help="p95 latency budget per frame")
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--threads', help="Comma-separated torch thread counts (default: 1, 2, 4 ... cpu count)")
+    parser.add_argument('--backends', help="Comma-separated subset of the available backends")
+    parser.add_argument('--frames', type=int, default=8, help="Representative frames to cycle through")
+    parser.add_argument('--runs', type=int, default=10, help="Timed calls per configuration")
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--output', default=PROFILE_PATH)
+    args = parser.parse_args()
+
+    threads = [int(t) for t in args.threads.split(',')] if args.threads else default_threads()
+    backends = available_backends()
+    if args.backends:
+        backends = [b for b in args.backends.split(',') if b in backends]
+    if not backends:
+        print(f"❌ None of the requested backends are available here: {args.backends}")
+        return 1
+
+    frames = load_frames(args.frames, args.imgsz)
+    print(f"🔧 Autotuning {args.weights} on {len(frames)} frames | backends: {', '.join(backends)}")
+
+    results = []
+    for backend in backends:
+        model = prepare_backend(args.weights, backend, args.imgsz)
+        # Intra-op threads only matter for torch on CPU; other backends manage their own
+        thread_options = threads if backend == 'torch-cpu' else [None]
+        for thread_count in thread_options:
+            result = benchmark(model, frames, backend, thread_count, args.imgsz, args.runs, args.warmup)
+            results.append(result)
+            print(f"  {backend:16} threads={thread_count or '-':<3} "
+                  f"p95={result['p95_ms']:8.1f} ms  {result['fps']:6.2f} fps", flush=True)
+
+    selected = select(results, args.slo_ms)
+    print_results(results, selected)
+    if not selected['meets_slo']:
+        print(f"\n⚠️  No configuration meets the {args.slo_ms:.0f} ms SLO; using the fastest one")
+
+    profile = {
+        'created_at': datetime.now().isoformat(),
+        'weights': args.weights,
+        'slo_ms': args.slo_ms,
+        'host': host_fingerprint(),
+        'selected': selected,
+        'candidates': results,
+    }
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(profile, f, indent=2)
+    print(f"\n💾 Runtime profile saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Memory benchmark for the WildGuard frame pipeline
+
+Compares the original per-frame allocation pattern with the pooled
+FramePool pipeline and the low-memory configuration. Each mode runs in a
+fresh process so peak RSS is not shared between modes.
+
+Usage:
+    python scripts/benchmark_memory.py [--frames 300] [--width 1920] [--height 1080] [--with-model]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODES = ('baseline', 'pooled', 'low-memory')
+
+
+def current_rss_mb():
+    """
+    Resident set size from /proc (Linux); falls back to the peak value
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / 1e6 if sys.platform == 'darwin' else peak * 1024 / 1e6
+
+
+def make_frame(width, height):
+    import numpy as np
+    from PIL import Image
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    return Image.fromarray(pixels)
+
+
+def annotate(output, h, w):
+    import cv2
+    road_y = int(h * 0.75)
+    cv2.line(output, (0, road_y), (w, road_y), (0, 255, 255), 3)
+    cv2.rectangle(output, (w // 4, h // 3), (w // 2, h // 2), (0, 0, 255), 4)
+    cv2.putText(output, "DEER", (w // 4 + 5, h // 3 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+
+
+def baseline_pipeline(image):
+    """
+    The allocation pattern process_wildlife_image used before FramePool
+    """
+    import cv2
+    import numpy as np
+    image = np.array(image)
+    image_bgr = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    h, w = image_bgr.shape[:2]
+    output = image_bgr.copy()
+    annotate(output, h, w)
+    return cv2.cvtColor(output, cv2.COLOR_BGR2RGB)
+
+
+def pooled_pipeline(pool, image):
+    image_bgr = pool.to_bgr(image)
+    h, w = image_bgr.shape[:2]
+    output = pool.annotation_copy(image_bgr)
+    annotate(output, h, w)
+    return pool.to_rgb(output)
+
+
+def run_mode(mode, frames, width, height, with_model, queue):
+    os.environ['WILDGUARD_LOW_MEMORY'] = '1' if mode == 'low-memory' else '0'
+    image = make_frame(width, height)
+
+    if with_model:
+        import wildguard_detector
+        if mode == 'baseline':
+            queue.put((mode, None))
+            return
+        step = lambda: wildguard_detector.process_wildlife_image(image)
+    elif mode == 'baseline':
+        step = lambda: baseline_pipeline(image)
+    else:
+        from frame_buffers import FramePool
+        pool = FramePool(low_memory=(mode == 'low-memory'))
+        step = lambda: pooled_pipeline(pool, image)
+
+    start_rss = current_rss_mb()
+    samples = []
+    alloc_peaks = []
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    for i in range(frames):
+        # Transient allocation of this frame, excluding buffers already alive
+        tracemalloc.reset_peak()
+        live = tracemalloc.get_traced_memory()[0]
+        step()
+        alloc_peaks.append((tracemalloc.get_traced_memory()[1] - live) / 1e6)
+        samples.append(current_rss_mb())
+
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+
+    steady = sorted(samples[len(samples) // 2:])
+    queue.put((mode, {
+        'start_rss_mb': start_rss,
+        'steady_rss_mb': steady[len(steady) // 2],
+        'peak_rss_mb': peak_rss_mb(),
+        'alloc_per_frame_mb': sum(alloc_peaks) / len(alloc_peaks),
+        'ms_per_frame': elapsed / frames * 1000
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WildGuard frame buffer memory")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--with-model', action='store_true',
+                        help="Run the full process_wildlife_image pipeline (loads YOLO)")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print(f"MEMORY BENCHMARK: {args.frames} frames at {args.width}x{args.height}")
+    print("="*60 + "\n")
+
+    ctx = mp.get_context('spawn')
+    queue = ctx.Queue()
+    results = {}
+    for mode in MODES:
+        proc = ctx.Process(target=run_mode, args=(mode, args.frames, args.width, args.height,
+                                                  args.with_model, queue))
+        proc.start()
+        name, stats = queue.get()
+        proc.join()
+        results[name] = stats
+
+    print(f"{'Mode':12} {'Steady RSS':>11} {'Peak RSS':>10} {'Alloc/frame':>12} {'ms/frame':>9}")
+    for mode in MODES:
+        stats = results[mode]
+        if stats is None:
+            print(f"{mode:12} {'(n/a with --with-model)':>45}")
+            continue
+        print(f"{mode:12} {stats['steady_rss_mb']:9.1f}MB {stats['peak_rss_mb']:8.1f}MB "
+              f"{stats['alloc_per_frame_mb']:10.2f}MB {stats['ms_per_frame']:9.2f}")
+
+    print("\n✅ Memory benchmark completed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Build a multi-resolution heatmap tile pyramid of animal movement density
+for the WildGuard dashboard.
+
+Layers are built per species and per hour band from the forest movement
+dataset. Raw counts for every layer are kept at the finest resolution so a
+new batch of telemetry only re-renders the tiles it actually touches.
+
+Usage:
+    python scripts/build_heatmap_tiles.py                       # full rebuild
+    python scripts/build_heatmap_tiles.py --append batch.csv    # incremental
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import sys
+
+import cv2
+import numpy as np
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET_PATH = os.path.join(BASE_DIR, 'public', 'forest_animal_movement_dataset.csv')
+OUTPUT_DIR = os.path.join(BASE_DIR, 'outputs', 'heatmap_tiles')
+
+GRID_EXTENT = 1000.0   # Forest grid spans 0..1000 on both axes
+TILE_SIZE = 256        # Pixels per tile edge
+MAX_LEVEL = 2          # Level 0 is one tile, level N is 2^N x 2^N tiles
+SATURATION = 32.0      # Count at which a finest-level pixel renders fully hot
+
+ALL = 'all'
+HOUR_BANDS = {
+    'night': (0, 6),
+    'morning': (6, 12),
+    'afternoon': (12, 18),
+    'evening': (18, 24),
+}
+
+
+# ═══════════════════════════════════════════════════════════════
+# DATA LOADING
+# ═══════════════════════════════════════════════════════════════
+
+def load_movements(csv_path):
+    """
+    Load the movement CSV into column arrays (species, hour, x, y)
+    """
+    species, hours, xs, ys = [], [], [], []
+    with open(csv_path, newline='') as f:
+        for row in csv.DictReader(f):
+            species.append(row['animal_type'].strip().lower())
+            hours.append(int(row['time'][:2]))
+            xs.append(float(row['location_x']))
+            ys.append(float(row['location_y']))
+
+    return {
+        'species': np.array(species),
+        'hour': np.array(hours, dtype=np.int16),
+        'x': np.array(xs, dtype=np.float64),
+        'y': np.array(ys, dtype=np.float64),
+    }
+
+
+def hour_band(hours):
+    """
+    Map an array of hours to an array of hour band names
+    """
+    bands = np.empty(len(hours), dtype=object)
+    for name, (start, end) in HOUR_BANDS.items():
+        bands[(hours >= start) & (hours < end)] = name
+    return bands
+
+
+def layer_masks(data):
+    """
+    Yield (species, band, mask) for every layer including the 'all' aggregates
+    """
+    bands = hour_band(data['hour'])
+    species_names = [ALL] + sorted(set(data['species'].tolist()))
+    band_names = [ALL] + list(HOUR_BANDS)
+
+    for species in species_names:
+        species_mask = np.ones(len(bands), dtype=bool) if species == ALL else data['species'] == species
+        if not species_mask.any():
+            continue
+        for band in band_names:
+            mask = species_mask if band == ALL else species_mask & (bands == band)
+            if mask.any():
+                yield species, band, mask
+
+
+# ═══════════════════════════════════════════════════════════════
+# HISTOGRAMS & PYRAMID
+# ═══════════════════════════════════════════════════════════════
+
+def base_resolution():
+    return TILE_SIZE * (2 ** MAX_LEVEL)
+
+
+def histogram(x, y):
+    """
+    Vectorized 2D histogram of points on the finest pyramid level (rows = y)
+    """
+    res = base_resolution()
+    counts, _, _ = np.histogram2d(y, x, bins=res, range=[[0, GRID_EXTENT], [0, GRID_EXTENT]])
+    return counts.astype(np.uint32)
+
+
+def downsample(counts, factor):
+    """
+    Sum factor x factor blocks so density is preserved across levels
+    """
+    if factor == 1:
+        return counts
+    h, w = counts.shape
+    return counts.reshape(h // factor, factor, w // factor, factor).sum(axis=(1, 3), dtype=np.uint32)
+
+
+def tile_counts(base, level, tx, ty):
+    """
+    Extract tile (tx, ty) of a pyramid level directly from the base counts
+    """
+    factor = 2 ** (MAX_LEVEL - level)
+    span = TILE_SIZE * factor
+    block = base[ty * span:(ty + 1) * span, tx * span:(tx + 1) * span]
+    return downsample(block, factor)
+
+
+def affected_tiles(delta, level):
+    """
+    Return the set of (tx, ty) tiles on a level touched by non-zero delta cells
+    """
+    span = TILE_SIZE * (2 ** (MAX_LEVEL - level))
+    rows, cols = np.nonzero(delta)
+    return set(zip((cols // span).tolist(), (rows // span).tolist()))
+
+
+# ═══════════════════════════════════════════════════════════════
+# STORAGE
+# ═══════════════════════════════════════════════════════════════
+
+def layer_dir(output_dir, species, band):
+    return os.path.join(output_dir, species, band)
+
+
+def base_path(output_dir, species, band):
+    return os.path.join(layer_dir(output_dir, species, band), 'base.npz')
+
+
+def load_base(output_dir, species, band):
+    path = base_path(output_dir, species, band)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as stored:
+        return stored['counts']
+
+
+def save_base(output_dir, species, band, counts):
+    path = base_path(output_dir, species, band)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez_compressed(path, counts=counts)
+
+
+def render_png(counts, level):
+    """
+    Colorize tile counts on a fixed log scale so tiles render independently
+    """
+    # Coarser levels sum 4x more cells per pixel per level
+    saturation = SATURATION * (4 ** (MAX_LEVEL - level))
+    intensity = np.log1p(counts.astype(np.float32)) / np.log1p(saturation)
+    gray = (np.clip(intensity, 0.0, 1.0) * 255).astype(np.uint8)
+    colored = cv2.applyColorMap(gray, cv2.COLORMAP_INFERNO)
+    alpha = np.where(counts > 0, 255, 0).astype(np.uint8)
+    return np.dstack([colored, alpha])
+
+
+def write_tile(output_dir, species, band, level, tx, ty, counts, write_png):
+    tile_dir = os.path.join(layer_dir(output_dir, species, band), str(level))
+    os.makedirs(tile_dir, exist_ok=True)
+    stem = os.path.join(tile_dir, f"{tx}_{ty}")
+    np.savez_compressed(stem + '.npz', counts=counts)
+    if write_png:
+        cv2.imwrite(stem + '.png', render_png(counts, level))
+
+
+def render_layer(output_dir, species, band, base, delta, write_png):
+    """
+    Re-render every tile of a layer that the delta histogram touched
+    """
+    written = 0
+    for level in range(MAX_LEVEL + 1):
+        for tx, ty in sorted(affected_tiles(delta, level)):
+            counts = tile_counts(base, level, tx, ty)
+            write_tile(output_dir, species, band, level, tx, ty, counts, write_png)
+            written += 1
+    return written
+
+
+def manifest_path(output_dir):
+    return os.path.join(output_dir, 'manifest.json')
+
+
+def clear_tiles(output_dir):
+    """
+    Remove the layers and manifest a previous build wrote, leaving anything
+    else in output_dir alone. Refuses a non-empty directory without a
+    manifest, since it was not written by this tool.
+    """
+    if not os.path.isdir(output_dir) or not os.listdir(output_dir):
+        return
+    path = manifest_path(output_dir)
+    if not os.path.exists(path):
+        raise ValueError(f"{output_dir} is not empty and has no manifest.json; "
+                         "refusing to overwrite it")
+
+    with open(path) as f:
+        manifest = json.load(f)
+    for species, bands in manifest.get('layers', {}).items():
+        for band in bands:
+            shutil.rmtree(layer_dir(output_dir, species, band), ignore_errors=True)
+        species_dir = os.path.join(output_dir, species)
+        if os.path.isdir(species_dir) and not os.listdir(species_dir):
+            os.rmdir(species_dir)
+    os.remove(path)
+
+
+def update_manifest(output_dir, layers, records):
+    path = manifest_path(output_dir)
+    manifest = {'layers': {}, 'records': 0}
+    if os.path.exists(path):
+        with open(path) as f:
+            manifest = json.load(f)
+
+    for species, band in layers:
+        manifest['layers'].setdefault(species, [])
+        if band not in manifest['layers'][species]:
+            manifest['layers'][species].append(band)
+
+    manifest.update({
+        'extent': [0.0, 0.0, GRID_EXTENT, GRID_EXTENT],
+        'tile_size': TILE_SIZE,
+        'max_level': MAX_LEVEL,
+        'hour_bands': HOUR_BANDS,
+        'records': manifest['records'] + records,
+        'tile_path': '{species}/{band}/{level}/{x}_{y}.png',
+    })
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+# ═══════════════════════════════════════════════════════════════
+# BUILD
+# ═══════════════════════════════════════════════════════════════
+
+def build_tiles(csv_path, output_dir=OUTPUT_DIR, append=False, write_png=True):
+    """
+    Build (or incrementally update) the tile pyramid from a movement CSV
+    """
+    data = load_movements(csv_path)
+    if len(data['x']) == 0:
+        print("✓ No records in batch, nothing to render")
+        return 0
+
+    if not append:
+        clear_tiles(output_dir)
+
+    layers = []
+    tiles_written = 0
+    for species, band, mask in layer_masks(data):
+        delta = histogram(data['x'][mask], data['y'][mask])
+        base = load_base(output_dir, species, band) if append else None
+        base = delta if base is None else base + delta
+
+        save_base(output_dir, species, band, base)
+        tiles_written += render_layer(output_dir, species, band, base, delta, write_png)
+        layers.append((species, band))
+
+    update_manifest(output_dir, layers, len(data['x']))
+    print(f"✅ Rendered {tiles_written} tiles across {len(layers)} layers into {output_dir}")
+    return tiles_written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build WildGuard movement heatmap tiles")
+    parser.add_argument('--dataset', default=DATASET_PATH, help="Movement CSV for a full rebuild")
+    parser.add_argument('--append', metavar='CSV', help="New telemetry batch to merge incrementally")
+    parser.add_argument('--output', default=OUTPUT_DIR, help="Tile output directory")
+    parser.add_argument('--no-png', action='store_true', help="Only write compressed .npz tiles")
+    args = parser.parse_args()
+
+    csv_path = args.append or args.dataset
+    if not os.path.exists(csv_path):
+        print(f"❌ Error: {csv_path} not found")
+        return 1
+
+    print(f"🗺️  Building heatmap tiles from {csv_path}...")
+    try:
+        build_tiles(csv_path, args.output, append=bool(args.append), write_png=not args.no_png)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
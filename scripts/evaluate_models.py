@@ -0,0 +1,461 @@
+"""
+Evaluate WildGuard detection accuracy against latency across model sizes,
+input sizes, confidence thresholds and backends
+
+Runs a labeled image set through every configuration and reports per-class
+precision / recall / AP, alert-level agreement with the ground truth and
+per-image latency, then marks the accuracy-versus-p95-latency Pareto
+frontier. Images are decoded once on a thread pool and reused by every
+configuration.
+
+Datasets:
+    labels.jsonl   one line per image, bboxes in pixels:
+                   {"image": "a.jpg", "camera": "cam-north",
+                    "objects": [{"class": "deer", "bbox": [x1, y1, x2, y2]}]}
+    <dir>/         YOLO layout: images/*.jpg + labels/*.txt ("cls cx cy w h",
+                   normalized); class ids are COCO unless <dir>/classes.txt
+                   lists the names one per line
+    --synthetic N  N frames from generate_test_video with their ground truth
+
+Usage:
+    python scripts/evaluate_models.py --dataset labels.jsonl
+    python scripts/evaluate_models.py --dataset data/ --models yolov8n.pt,yolov8m.pt \
+        --imgsz 480,640 --conf 0.05,0.25,0.4 --backends torch-cpu,onnx
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, 'scripts'))
+
+from risk_assessor import RiskAssessor
+from road_geometry import RoadGeometry
+
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+
+ALERT_RANK = {'NONE': 0, 'LOW': 1, 'CAUTION': 2, 'WARNING': 3, 'CRITICAL': 4}
+
+
+# ═══════════════════════════════════════════════════════════════
+# DATASET
+# ═══════════════════════════════════════════════════════════════
+
+def load_jsonl_dataset(path):
+    root = os.path.dirname(os.path.abspath(path))
+    samples = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            image = record['image']
+            samples.append({
+                'path': image if os.path.isabs(image) else os.path.join(root, image),
+                'camera': record.get('camera'),
+                'objects': [{'class': o['class'].lower(), 'bbox': [float(v) for v in o['bbox']]}
+                            for o in record.get('objects', [])],
+            })
+    return samples
+
+
+def load_yolo_dataset(root, names=None):
+    """
+    YOLO-format labels are normalized, so boxes are converted to pixels
+    after decoding (see decode_dataset)
+    """
+    names_path = os.path.join(root, 'classes.txt')
+    if os.path.exists(names_path):
+        with open(names_path) as f:
+            names = [line.strip() for line in f if line.strip()]
+    if names is None:
+        raise ValueError(f"{root} has no classes.txt; pass the label names")
+
+    image_dir = os.path.join(root, 'images')
+    samples = []
+    for path in sorted(p for ext in ('*.jpg', '*.jpeg', '*.png') for p in glob.glob(os.path.join(image_dir, ext))):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        label_path = os.path.join(root, 'labels', stem + '.txt')
+        objects = []
+        if os.path.exists(label_path):
+            with open(label_path) as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) < 5:
+                        continue
+                    cx, cy, w, h = (float(v) for v in parts[1:5])
+                    objects.append({'class': names[int(parts[0])].lower(),
+                                    'normalized': [cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2]})
+        samples.append({'path': path, 'camera': None, 'objects': objects})
+    return samples
+
+
+def synthetic_dataset(count, width=640, height=480, seed=11):
+    """
+    In-memory frames from the synthetic crossing video, one per second so
+    animals move between samples
+    """
+    from generate_test_video import iter_frames
+    samples = []
+    for index, frame, truth in iter_frames(width=width, height=height, fps=1, duration=count,
+                                           animals=6, seed=seed):
+        samples.append({
+            'path': f"synthetic/{index:04d}",
+            'camera': None,
+            'image': frame.copy(),
+            'objects': [{'class': t['species'], 'bbox': [float(v) for v in t['bbox']]} for t in truth],
+        })
+    return samples
+
+
+def decode_dataset(samples, workers=8):
+    """
+    Decode every image once on a thread pool (cv2.imread releases the GIL)
+    and resolve normalized YOLO boxes to pixels. Unreadable images are
+    dropped with a warning.
+    """
+    todo = [s for s in samples if 'image' not in s]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for sample, image in zip(todo, pool.map(cv2.imread, [s['path'] for s in todo])):
+            sample['image'] = image
+
+    decoded = []
+    for sample in samples:
+        if sample['image'] is None:
+            print(f"⚠️  Skipping unreadable image {sample['path']}")
+            continue
+        h, w = sample['image'].shape[:2]
+        for obj in sample['objects']:
+            if 'normalized' in obj:
+                x1, y1, x2, y2 = obj.pop('normalized')
+                obj['bbox'] = [x1 * w, y1 * h, x2 * w, y2 * h]
+        decoded.append(sample)
+    return decoded
+
+
+# ═══════════════════════════════════════════════════════════════
+# METRICS
+# ═══════════════════════════════════════════════════════════════
+
+def box_iou(a, b):
+    """
+    Pairwise IoU between (N, 4) and (M, 4) xyxy arrays
+    """
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+def average_precision(recall, precision):
+    """
+    All-point interpolated area under the precision-recall curve
+    """
+    r = np.concatenate(([0.0], recall, [1.0]))
+    p = np.concatenate(([1.0], precision, [0.0]))
+    p = np.maximum.accumulate(p[::-1])[::-1]
+    steps = np.where(r[1:] != r[:-1])[0]
+    return float(np.sum((r[steps + 1] - r[steps]) * p[steps + 1]))
+
+
+def match_detections(predictions, truths):
+    """
+    Greedy matching per image and class, highest confidence first. Returns
+    (scores, tp) where tp[i, t] says whether detection i is a true positive
+    at IOU_THRESHOLDS[t].
+    """
+    scores, tp = [], []
+    for preds, gts in zip(predictions, truths):
+        if not preds:
+            continue
+        order = sorted(range(len(preds)), key=lambda i: -preds[i]['confidence'])
+        preds = [preds[i] for i in order]
+        hits = np.zeros((len(preds), len(IOU_THRESHOLDS)), dtype=bool)
+        if gts:
+            iou = box_iou([p['bbox'] for p in preds], [g['bbox'] for g in gts])
+            for t, threshold in enumerate(IOU_THRESHOLDS):
+                taken = np.zeros(len(gts), dtype=bool)
+                for i in range(len(preds)):
+                    candidates = np.where(~taken & (iou[i] >= threshold))[0]
+                    if len(candidates):
+                        j = candidates[np.argmax(iou[i, candidates])]
+                        taken[j] = True
+                        hits[i, t] = True
+        scores.extend(p['confidence'] for p in preds)
+        tp.append(hits)
+    if not tp:
+        return np.zeros(0), np.zeros((0, len(IOU_THRESHOLDS)), dtype=bool)
+    return np.array(scores), np.concatenate(tp)
+
+
+def class_metrics(predictions, truths):
+    """
+    Precision / recall at IoU 0.5 and AP@0.5 / AP@0.5:0.95 for one class.
+    predictions and truths are per-image lists of {'bbox', 'confidence'}.
+    """
+    n_truth = sum(len(g) for g in truths)
+    scores, tp = match_detections(predictions, truths)
+    if n_truth == 0:
+        return {'truths': 0, 'detections': len(scores), 'precision': 0.0, 'recall': 0.0,
+                'ap50': 0.0, 'ap50_95': 0.0}
+    if len(scores) == 0:
+        return {'truths': n_truth, 'detections': 0, 'precision': 0.0, 'recall': 0.0,
+                'ap50': 0.0, 'ap50_95': 0.0}
+
+    tp = tp[np.argsort(-scores, kind='stable')]
+    tp_cum = np.cumsum(tp, axis=0)
+    precision = tp_cum / np.arange(1, len(tp) + 1)[:, None]
+    recall = tp_cum / n_truth
+    aps = [average_precision(recall[:, t], precision[:, t]) for t in range(len(IOU_THRESHOLDS))]
+    return {
+        'truths': n_truth,
+        'detections': len(scores),
+        'precision': float(precision[-1, 0]),
+        'recall': float(recall[-1, 0]),
+        'ap50': aps[0],
+        'ap50_95': float(np.mean(aps)),
+    }
+
+
+def image_alert(road, camera, image_shape, boxes):
+    """
+    Highest alert level RiskAssessor raises for these boxes, 'NONE'
+    without any
+    """
+    if not boxes:
+        return 'NONE'
+    assessor = RiskAssessor(road)
+    levels = [assessor.assess_risk(box, image_shape, camera_id=camera)['alert_level'] for box in boxes]
+    return max(levels, key=ALERT_RANK.get)
+
+
+def alert_agreement(samples, predictions, road):
+    """
+    Compare the per-image alert level from detections with the one from
+    the ground-truth boxes. missed: truth WARNING or above, prediction
+    below it; false: the reverse.
+    """
+    confusion = {}
+    agree = missed = false = 0
+    for sample, preds in zip(samples, predictions):
+        shape = sample['image'].shape
+        expected = image_alert(road, sample['camera'], shape, [o['bbox'] for o in sample['objects']])
+        predicted = image_alert(road, sample['camera'], shape, [p['bbox'] for p in preds])
+        confusion.setdefault(expected, {}).setdefault(predicted, 0)
+        confusion[expected][predicted] += 1
+        agree += expected == predicted
+        warn = ALERT_RANK['WARNING']
+        missed += ALERT_RANK[expected] >= warn > ALERT_RANK[predicted]
+        false += ALERT_RANK[predicted] >= warn > ALERT_RANK[expected]
+    return {
+        'agreement': agree / len(samples) if samples else 0.0,
+        'missed_alerts': missed,
+        'false_alerts': false,
+        'confusion': confusion,
+    }
+
+
+def evaluate(samples, predictions, conf, road, class_map=None):
+    """
+    Accuracy of one configuration: raw predictions filtered at conf, with
+    detector class names mapped onto dataset names. Detections of classes
+    absent from the dataset are ignored.
+    """
+    class_map = class_map or {}
+    classes = sorted({o['class'] for s in samples for o in s['objects']})
+    kept = [[{**p, 'class': class_map.get(p['class'], p['class'])} for p in preds if p['confidence'] >= conf]
+            for preds in predictions]
+    kept = [[p for p in preds if p['class'] in classes] for preds in kept]
+
+    per_class = {}
+    for name in classes:
+        per_class[name] = class_metrics([[p for p in preds if p['class'] == name] for preds in kept],
+                                        [[o for o in s['objects'] if o['class'] == name] for s in samples])
+    mean = lambda key: float(np.mean([m[key] for m in per_class.values()])) if per_class else 0.0
+    return {
+        'precision': mean('precision'),
+        'recall': mean('recall'),
+        'map50': mean('ap50'),
+        'map50_95': mean('ap50_95'),
+        'per_class': per_class,
+        'alerts': alert_agreement(samples, kept, road),
+    }
+
+
+def pareto_frontier(rows, metric='map50', cost='p95_ms'):
+    """
+    Indices of rows not dominated by another row with at least the metric
+    at no more cost (and strictly better on one), cheapest first
+    """
+    frontier = []
+    for i, row in enumerate(rows):
+        dominated = any(
+            other[metric] >= row[metric] and other[cost] <= row[cost]
+            and (other[metric] > row[metric] or other[cost] < row[cost])
+            for j, other in enumerate(rows) if j != i)
+        if not dominated:
+            frontier.append(i)
+    return sorted(frontier, key=lambda i: rows[i][cost])
+
+
+# ═══════════════════════════════════════════════════════════════
+# INFERENCE
+# ═══════════════════════════════════════════════════════════════
+
+def run_model(model, samples, imgsz, conf, kwargs, warmup):
+    """
+    Predict every image once at the lowest swept confidence; higher
+    thresholds are evaluated by filtering these results. Returns
+    (per-image predictions, per-image latencies in ms).
+    """
+    for sample in samples[:warmup]:
+        model(sample['image'], imgsz=imgsz, conf=conf, verbose=False, **kwargs)
+
+    predictions, latencies = [], []
+    for sample in samples:
+        t = time.perf_counter()
+        result = model(sample['image'], imgsz=imgsz, conf=conf, verbose=False, **kwargs)[0]
+        latencies.append((time.perf_counter() - t) * 1000)
+
+        preds = []
+        if result.boxes is not None and len(result.boxes):
+            boxes = result.boxes.xyxy.cpu().numpy()
+            confs = result.boxes.conf.cpu().numpy()
+            classes = result.boxes.cls.cpu().numpy().astype(int)
+            for box, score, cls in zip(boxes, confs, classes):
+                preds.append({'bbox': box.tolist(), 'confidence': float(score),
+                              'class': result.names[cls].lower()})
+        predictions.append(preds)
+    return predictions, latencies
+
+
+def print_report(rows, frontier, metric):
+    print(f"\n{'Model':14} {'Backend':16} {'Size':>5} {'Conf':>5} {'P':>6} {'R':>6} "
+          f"{'mAP50':>6} {'mAP':>6} {'Alert':>6} {'Miss':>5} {'p50 ms':>8} {'p95 ms':>8}")
+    for i, r in enumerate(rows):
+        mark = '  ◀' if i in frontier else ''
+        print(f"{r['model']:14} {r['backend']:16} {r['imgsz']:5} {r['conf']:5.2f} {r['precision']:6.3f} "
+              f"{r['recall']:6.3f} {r['map50']:6.3f} {r['map50_95']:6.3f} {r['alert_agreement']:6.3f} "
+              f"{r['missed_alerts']:5} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f}{mark}")
+    print(f"\n◀ Pareto frontier ({metric} vs p95 latency):")
+    for i in frontier:
+        r = rows[i]
+        print(f"  {r['model']} {r['backend']} imgsz={r['imgsz']} conf={r['conf']:.2f}: "
+              f"{metric}={r[metric]:.3f} at {r['p95_ms']:.1f} ms p95")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate WildGuard accuracy versus latency")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--dataset', help="labels.jsonl or a YOLO-layout directory")
+    source.add_argument('--synthetic', type=int, help="Evaluate on N synthetic crossing frames")
+    parser.add_argument('--models', default='yolov8n.pt,yolov8m.pt')
+    parser.add_argument('--imgsz', default='640')
+    parser.add_argument('--conf', default='0.05,0.25,0.4')
+    parser.add_argument('--backends', default='torch-cpu')
+    parser.add_argument('--class-map', help="JSON object mapping detector class names to dataset names")
+    parser.add_argument('--metric', default='map50', choices=['map50', 'map50_95', 'recall', 'alert_agreement'],
+                        help="Accuracy axis of the Pareto frontier")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4, help="Decode threads")
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--output', default=os.path.join(
+        BASE_DIR, 'outputs', f"model_eval_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"))
+    args = parser.parse_args()
+
+    from autotune import available_backends, prepare_backend
+    from runtime_profile import predict_kwargs
+
+    models = args.models.split(',')
+    sizes = [int(s) for s in args.imgsz.split(',')]
+    confs = sorted(float(c) for c in args.conf.split(','))
+    backends = [b for b in args.backends.split(',') if b in available_backends()]
+    if not backends:
+        print(f"❌ None of the requested backends are available here: {args.backends}")
+        return 1
+    class_map = json.loads(args.class_map) if args.class_map else {}
+
+    start = time.perf_counter()
+    if args.synthetic:
+        samples = synthetic_dataset(args.synthetic)
+    elif os.path.isdir(args.dataset):
+        # Label ids default to the detector's own (COCO) class list
+        coco_names = list(prepare_backend(models[0], 'torch-cpu', sizes[0]).names.values())
+        samples = load_yolo_dataset(args.dataset, names=coco_names)
+    else:
+        samples = load_jsonl_dataset(args.dataset)
+    samples = decode_dataset(samples, args.workers)
+    if not samples:
+        print("❌ No readable images in the dataset")
+        return 1
+    print(f"📂 {len(samples)} images, {sum(len(s['objects']) for s in samples)} objects "
+          f"decoded in {time.perf_counter() - start:.1f}s")
+
+    road = RoadGeometry.from_file()
+    rows = []
+    for weights in models:
+        for backend in backends:
+            for imgsz in sizes:
+                model = prepare_backend(weights, backend, imgsz)
+                predictions, latencies = run_model(model, samples, imgsz, confs[0],
+                                                   predict_kwargs(backend), args.warmup)
+                latency = {
+                    'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+                    'p95_ms': round(float(np.percentile(latencies, 95)), 2),
+                    'mean_ms': round(float(np.mean(latencies)), 2),
+                }
+                for conf in confs:
+                    result = evaluate(samples, predictions, conf, road, class_map)
+                    rows.append({
+                        'model': os.path.basename(weights), 'backend': backend, 'imgsz': imgsz, 'conf': conf,
+                        'precision': result['precision'], 'recall': result['recall'],
+                        'map50': result['map50'], 'map50_95': result['map50_95'],
+                        'alert_agreement': result['alerts']['agreement'],
+                        'missed_alerts': result['alerts']['missed_alerts'],
+                        'false_alerts': result['alerts']['false_alerts'],
+                        **latency,
+                        'per_class': result['per_class'],
+                        'alert_confusion': result['alerts']['confusion'],
+                    })
+                print(f"  {os.path.basename(weights):14} {backend:16} imgsz={imgsz:<5} "
+                      f"p95={latency['p95_ms']:8.1f} ms  mAP50@{confs[0]}={rows[-len(confs)]['map50']:.3f}",
+                      flush=True)
+
+    frontier = pareto_frontier(rows, metric=args.metric)
+    print_report(rows, frontier, args.metric)
+
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'dataset': args.dataset or f"synthetic:{args.synthetic}",
+        'images': len(samples),
+        'metric': args.metric,
+        # Latency is measured once per model/backend/size at the lowest confidence
+        'latency_conf': confs[0],
+        'results': rows,
+        'frontier': [rows[i] for i in frontier],
+    }
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Report saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+Generate deterministic synthetic wildlife video for WildGuard load and soak
+testing
+
+Animals (simple body + head sprites) walk across the scene toward and over
+the road line. Every frame comes with ground-truth tracks, so streaming
+throughput and alert latency can be measured without real footage.
+
+Usage:
+    python scripts/generate_test_video.py --output test_videos/crossing.mp4 \
+        --width 1280 --height 720 --fps 30 --duration 20 --animals 6 --seed 7
+
+Or in-memory from Python:
+    from generate_test_video import iter_frames
+    for index, frame, truth in iter_frames(width=640, height=480, fps=15):
+        ...
+"""
+
+import argparse
+import json
+import os
+
+import cv2
+import numpy as np
+
+SPECIES = ['deer', 'bear', 'dog', 'horse', 'cow', 'elephant']
+SPECIES_COLORS = {
+    'deer': (60, 110, 170),
+    'bear': (30, 40, 60),
+    'dog': (90, 140, 200),
+    'horse': (40, 80, 140),
+    'cow': (220, 220, 220),
+    'elephant': (130, 130, 130),
+}
+
+DEFAULTS = {
+    'width': 640,
+    'height': 480,
+    'fps': 15,
+    'duration': 10.0,
+    'animals': 4,
+    'speed': 0.12,        # Mean speed in image heights per second
+    'speed_jitter': 0.5,  # Speeds vary by +/- this fraction of the mean
+    'size': 0.12,         # Mean sprite height as a fraction of image height
+    'road_y': 0.75,       # Road line as a fraction of image height (matches RiskAssessor)
+    'seed': 0,
+}
+
+
+# ═══════════════════════════════════════════════════════════════
+# SCENE & TRACKS
+# ═══════════════════════════════════════════════════════════════
+
+def draw_background(height, width, road_y):
+    """
+    Sky, forest floor and road - same palette as the still test images
+    """
+    img = np.empty((height, width, 3), dtype=np.uint8)
+    img[:int(height * 0.5)] = [235, 206, 135]  # Sky blue (BGR)
+    img[int(height * 0.5):] = [34, 139, 34]    # Forest green
+
+    road_h = max(8, height // 12)
+    road_top = int(height * road_y) - road_h // 2
+    img[road_top:road_top + road_h] = [70, 70, 70]
+    cv2.line(img, (0, int(height * road_y)), (width, int(height * road_y)), (0, 255, 255), 2)
+    return img
+
+
+def make_tracks(config):
+    """
+    Plan every animal's path: spawn time, start point, velocity and size
+    """
+    rng = np.random.default_rng(config['seed'])
+    w, h, fps = config['width'], config['height'], config['fps']
+    total_frames = int(config['duration'] * fps)
+
+    tracks = []
+    for track_id in range(config['animals']):
+        species = SPECIES[int(rng.integers(len(SPECIES)))]
+        sprite_h = h * config['size'] * rng.uniform(0.7, 1.3)
+        sprite_w = sprite_h * rng.uniform(1.3, 1.8)
+        speed = h * config['speed'] * (1 + rng.uniform(-1, 1) * config['speed_jitter'])
+
+        # Start in the forest above the road, head downhill across it
+        start_x = rng.uniform(sprite_w, w - sprite_w)
+        start_y = rng.uniform(h * 0.35, h * 0.55)
+        angle = rng.uniform(np.radians(45), np.radians(135))
+
+        tracks.append({
+            'track_id': track_id,
+            'species': species,
+            'spawn_frame': int(rng.uniform(0, max(1, total_frames * 0.6))),
+            'start': (start_x, start_y),
+            'velocity': (speed * np.cos(angle) / fps, speed * np.sin(angle) / fps),
+            'size': (sprite_w, sprite_h),
+            'road_frame': None,
+            'exit_frame': None,
+        })
+    return tracks
+
+
+def track_bbox(track, frame_index):
+    age = frame_index - track['spawn_frame']
+    cx = track['start'][0] + track['velocity'][0] * age
+    cy = track['start'][1] + track['velocity'][1] * age
+    sw, sh = track['size']
+    return [cx - sw / 2, cy - sh / 2, cx + sw / 2, cy + sh / 2]
+
+
+def draw_animal(img, bbox, species):
+    x1, y1, x2, y2 = [int(round(v)) for v in bbox]
+    color = SPECIES_COLORS.get(species, (80, 80, 80))
+    w, h = x2 - x1, y2 - y1
+    center = ((x1 + x2) // 2, y1 + h // 2)
+
+    # Body, head and legs
+    cv2.ellipse(img, center, (max(1, w // 2 - w // 6), max(1, h // 3)), 0, 0, 360, color, -1)
+    cv2.circle(img, (x2 - w // 6, y1 + h // 4), max(1, h // 5), color, -1)
+    for lx in (x1 + w // 4, x1 + w // 2, x2 - w // 3):
+        cv2.line(img, (lx, center[1]), (lx, y2), color, max(1, w // 20))
+
+
+# ═══════════════════════════════════════════════════════════════
+# FRAME ITERATOR & VIDEO WRITER
+# ═══════════════════════════════════════════════════════════════
+
+def iter_frames(tracks=None, **overrides):
+    """
+    Yield (frame_index, BGR frame, ground_truth) for the configured clip.
+    ground_truth lists visible animals with track_id, species, clipped
+    bbox [x1, y1, x2, y2], normalized distance_to_road and on_road flag.
+    Output is identical for identical settings and seed.
+
+    The frame array is reused between iterations; copy it to keep it.
+    Pass tracks from make_tracks() to read road/exit frames afterwards.
+    """
+    config = {**DEFAULTS, **overrides}
+    w, h = config['width'], config['height']
+    road_y = h * config['road_y']
+    total_frames = int(config['duration'] * config['fps'])
+
+    background = draw_background(h, w, config['road_y'])
+    if tracks is None:
+        tracks = make_tracks(config)
+    frame = np.empty_like(background)
+
+    for frame_index in range(total_frames):
+        np.copyto(frame, background)
+        truth = []
+
+        for track in tracks:
+            if frame_index < track['spawn_frame'] or track['exit_frame'] is not None:
+                continue
+            x1, y1, x2, y2 = track_bbox(track, frame_index)
+            if x2 < 0 or x1 > w or y1 > h:
+                track['exit_frame'] = frame_index
+                continue
+
+            center_y = float((y1 + y2) / 2)
+            if track['road_frame'] is None and center_y >= road_y:
+                track['road_frame'] = frame_index
+
+            draw_animal(frame, (x1, y1, x2, y2), track['species'])
+            truth.append({
+                'track_id': track['track_id'],
+                'species': track['species'],
+                'bbox': [max(0, int(x1)), max(0, int(y1)), min(w, int(x2)), min(h, int(y2))],
+                'distance_to_road': abs(center_y - road_y) / h,
+                'on_road': bool(abs(center_y - road_y) / h < 0.05)
+            })
+
+        yield frame_index, frame, truth
+
+
+def track_summary(tracks):
+    return [{
+        'track_id': t['track_id'],
+        'species': t['species'],
+        'spawn_frame': t['spawn_frame'],
+        'road_frame': t['road_frame'],
+        'exit_frame': t['exit_frame'],
+    } for t in tracks]
+
+
+def write_video(output_path, **overrides):
+    """
+    Render the clip to a video file plus <output>.tracks.jsonl (per-frame
+    ground truth) and <output>.tracks.json (per-track summary)
+    """
+    config = {**DEFAULTS, **overrides}
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    writer = cv2.VideoWriter(output_path, fourcc, config['fps'], (config['width'], config['height']))
+    stem = os.path.splitext(output_path)[0]
+
+    tracks = make_tracks(config)
+    frames = 0
+    with open(stem + '.tracks.jsonl', 'w') as truth_file:
+        for frame_index, frame, truth in iter_frames(tracks, **config):
+            writer.write(frame)
+            truth_file.write(json.dumps({'frame': frame_index, 'animals': truth}) + '\n')
+            frames += 1
+    writer.release()
+
+    with open(stem + '.tracks.json', 'w') as f:
+        json.dump({'config': config, 'tracks': track_summary(tracks)}, f, indent=2)
+
+    print(f"✅ Wrote {frames} frames to {output_path}")
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic WildGuard test video")
+    parser.add_argument('--output', default='test_videos/synthetic_crossing.mp4')
+    for key in ('width', 'height', 'fps', 'animals', 'seed'):
+        parser.add_argument(f'--{key}', type=int, default=DEFAULTS[key])
+    for key in ('duration', 'speed', 'speed_jitter', 'size', 'road_y'):
+        parser.add_argument(f"--{key.replace('_', '-')}", type=float, default=DEFAULTS[key])
+    args = vars(parser.parse_args())
+
+    output = args.pop('output')
+    write_video(output, **args)
+
+
+if __name__ == "__main__":
+    main()
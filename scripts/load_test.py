@@ -0,0 +1,262 @@
+"""
+Load-testing harness for the WildGuard detection path
+
+Drives either the Python entry point the API spawns (detect_cli.py, one
+process per request) or a running /api/detect endpoint with a configurable
+concurrency and arrival rate, using images from a corpus. For every
+concurrency level it records a latency histogram, error rate and
+throughput, then prints the saturation curve and writes a JSON report.
+
+Usage:
+    python scripts/load_test.py --corpus test_images --concurrency 1,2,4,8,16,20 --requests 100
+    python scripts/load_test.py --target http --url http://localhost:3000/api/detect --rate 5 --duration 60
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DETECT_CLI = os.path.join(BASE_DIR, 'detect_cli.py')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+# Histogram bucket upper bounds in ms (log-spaced), last bucket is overflow
+BUCKETS_MS = [25 * 2 ** (i / 2) for i in range(20)]
+
+
+# ═══════════════════════════════════════════════════════════════
+# TARGETS
+# ═══════════════════════════════════════════════════════════════
+
+def cli_target(python=sys.executable, timeout=120):
+    """
+    One detect_cli.py process per request, exactly like /api/detect does
+    """
+    def call(image_path):
+        proc = subprocess.run([python, DETECT_CLI, image_path], capture_output=True, timeout=timeout)
+        if proc.returncode != 0:
+            raise RuntimeError(f"exit {proc.returncode}: {proc.stdout[-200:]!r}")
+        result = json.loads(proc.stdout)
+        if 'error' in result:
+            raise RuntimeError(result['error'])
+        return result
+    return call
+
+
+def http_target(url, timeout=120):
+    """
+    Multipart upload to a running /api/detect endpoint
+    """
+    def call(image_path):
+        boundary = uuid.uuid4().hex
+        with open(image_path, 'rb') as f:
+            payload = f.read()
+        body = (
+            f"--{boundary}\r\n"
+            f"Content-Disposition: form-data; name=\"file\"; filename=\"{os.path.basename(image_path)}\"\r\n"
+            f"Content-Type: application/octet-stream\r\n\r\n"
+        ).encode() + payload + f"\r\n--{boundary}--\r\n".encode()
+
+        request = urllib.request.Request(url, data=body, method='POST',
+                                         headers={'Content-Type': f"multipart/form-data; boundary={boundary}"})
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            result = json.loads(response.read())
+        if 'error' in result:
+            raise RuntimeError(result['error'])
+        return result
+    return call
+
+
+def load_corpus(corpus):
+    if os.path.isdir(corpus):
+        paths = [os.path.join(root, name) for root, _, files in os.walk(corpus)
+                 for name in files if name.lower().endswith(IMAGE_EXTENSIONS)]
+    else:
+        paths = glob.glob(corpus, recursive=True)
+    return sorted(paths)
+
+
+# ═══════════════════════════════════════════════════════════════
+# LOAD GENERATION
+# ═══════════════════════════════════════════════════════════════
+
+def histogram(latencies_ms):
+    counts = [0] * (len(BUCKETS_MS) + 1)
+    for value in latencies_ms:
+        for i, bound in enumerate(BUCKETS_MS):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    return [{'le_ms': round(bound, 1), 'count': count}
+            for bound, count in zip(BUCKETS_MS + [math.inf], counts) if count]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(math.ceil(pct / 100 * len(sorted_values))) - 1)
+    return sorted_values[max(index, 0)]
+
+
+def run_level(call, corpus, concurrency, requests=None, duration=None, rate=0.0, seed=0):
+    """
+    Run one concurrency level.
+
+    rate == 0 is closed-loop: each of `concurrency` workers sends the next
+    request as soon as the previous one finishes. rate > 0 is open-loop:
+    Poisson arrivals at `rate` req/s, at most `concurrency` in flight, and
+    latency is measured from the scheduled arrival so queueing delay is
+    included.
+    """
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    latencies = []
+    errors = []
+    issued = [0]
+
+    def record(start, error=None):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with lock:
+            if error is None:
+                latencies.append(elapsed_ms)
+            else:
+                errors.append(str(error)[:200])
+
+    def attempt(image_path, start):
+        try:
+            call(image_path)
+            record(start)
+        except Exception as e:
+            record(start, e)
+
+    def more(started_at):
+        if requests is not None and issued[0] >= requests:
+            return False
+        if duration is not None and time.perf_counter() - started_at >= duration:
+            return False
+        return True
+
+    started_at = time.perf_counter()
+
+    if rate <= 0:
+        def worker():
+            while True:
+                with lock:
+                    if not more(started_at):
+                        return
+                    issued[0] += 1
+                    image_path = rng.choice(corpus)
+                attempt(image_path, time.perf_counter())
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    else:
+        slots = threading.Semaphore(concurrency)
+
+        def bounded(image_path, scheduled):
+            with slots:
+                attempt(image_path, scheduled)
+
+        with ThreadPoolExecutor(max_workers=max(concurrency * 4, 8)) as pool:
+            next_arrival = started_at
+            while more(started_at):
+                next_arrival += rng.expovariate(rate)
+                delay = next_arrival - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                issued[0] += 1
+                pool.submit(bounded, rng.choice(corpus), next_arrival)
+
+    elapsed = time.perf_counter() - started_at
+    ordered = sorted(latencies)
+    total = len(latencies) + len(errors)
+    return {
+        'concurrency': concurrency,
+        'rate': rate,
+        'requests': total,
+        'errors': len(errors),
+        'error_rate': len(errors) / total if total else 0.0,
+        'throughput_rps': len(latencies) / elapsed if elapsed else 0.0,
+        'elapsed_s': elapsed,
+        'latency_ms': {
+            'mean': sum(ordered) / len(ordered) if ordered else None,
+            'p50': percentile(ordered, 50),
+            'p90': percentile(ordered, 90),
+            'p99': percentile(ordered, 99),
+            'max': ordered[-1] if ordered else None
+        },
+        'histogram': histogram(ordered),
+        'sample_errors': errors[:5]
+    }
+
+
+def print_curve(levels):
+    print(f"\n{'Conc':>5} {'Reqs':>6} {'Err%':>6} {'RPS':>8} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}")
+    fmt = lambda v: f"{v:9.1f}" if v is not None else f"{'-':>9}"
+    for level in levels:
+        lat = level['latency_ms']
+        print(f"{level['concurrency']:5} {level['requests']:6} {level['error_rate']:6.1%} "
+              f"{level['throughput_rps']:8.2f} {fmt(lat['p50'])} {fmt(lat['p90'])} {fmt(lat['p99'])}")
+
+    # Saturation: the first level where throughput stops growing by >10%
+    for prev, level in zip(levels, levels[1:]):
+        if prev['throughput_rps'] and level['throughput_rps'] < prev['throughput_rps'] * 1.1:
+            print(f"\n⚠️  Throughput saturates around concurrency {prev['concurrency']} "
+                  f"(~{prev['throughput_rps']:.2f} req/s)")
+            break
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the WildGuard detection path")
+    parser.add_argument('--target', choices=('cli', 'http'), default='cli')
+    parser.add_argument('--url', default='http://localhost:3000/api/detect')
+    parser.add_argument('--python', default=sys.executable, help="Interpreter used for detect_cli.py")
+    parser.add_argument('--corpus', default=os.path.join(BASE_DIR, 'test_images'),
+                        help="Image directory or glob pattern")
+    parser.add_argument('--concurrency', default='1,2,4,8,16,20', help="Comma-separated levels")
+    parser.add_argument('--requests', type=int, help="Requests per level")
+    parser.add_argument('--duration', type=float, help="Seconds per level")
+    parser.add_argument('--rate', type=float, default=0.0, help="Open-loop arrivals/s (0 = closed loop)")
+    parser.add_argument('--report', default=os.path.join(BASE_DIR, 'outputs', 'load_test.json'))
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print(f"❌ No images found in {args.corpus} (run scripts/generate_test_data.py first)")
+        return 1
+
+    if args.requests is None and args.duration is None:
+        args.requests = 50
+
+    call = cli_target(args.python) if args.target == 'cli' else http_target(args.url)
+    levels = []
+    for concurrency in [int(c) for c in args.concurrency.split(',') if c]:
+        print(f"🚦 Concurrency {concurrency}...", flush=True)
+        levels.append(run_level(call, corpus, concurrency, args.requests, args.duration, args.rate))
+
+    print_curve(levels)
+
+    os.makedirs(os.path.dirname(args.report) or '.', exist_ok=True)
+    with open(args.report, 'w') as f:
+        json.dump({'target': args.target, 'corpus_size': len(corpus), 'levels': levels}, f, indent=2)
+    print(f"\n💾 Report saved to: {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -108,6 +108,874 @@ def test_billboard_generator():
     print("\n✅ Billboard Generator tests completed")
 
 
+def test_alert_debouncing():
+    """Test per-camera hysteresis, cooldown and escalation bypass"""
+    print("\n" + "="*60)
+    print("TESTING: Alert Debouncing")
+    print("="*60)
+    
+    billboard = BillboardGenerator(cooldown_s=2.0, release_s=3.0, max_alerts=3, rate_window_s=10.0)
+    
+    # (name, species, level, time, camera, expect alert)
+    test_cases = [
+        ("FIRST CAUTION", "deer", "CAUTION", 0.0, "cam1", True),
+        ("REPEAT CAUTION", "deer", "CAUTION", 0.5, "cam1", False),
+        ("ESCALATE", "deer", "CRITICAL", 1.0, "cam1", True),
+        ("FLICKER DOWN", "deer", "WARNING", 1.5, "cam1", False),
+        ("REPEAT CRITICAL", "deer", "CRITICAL", 2.0, "cam1", False),
+        ("OTHER CAMERA", "deer", "CRITICAL", 2.0, "cam2", True),
+        ("COOLDOWN EXPIRED", "deer", "CRITICAL", 3.5, "cam1", True),
+        ("HELD CRITICAL", "deer", "WARNING", 4.0, "cam1", False),
+        ("RATE LIMITED", "deer", "WARNING", 7.5, "cam1", False),
+        ("RE-ESCALATE", "deer", "CRITICAL", 8.0, "cam1", True),
+        ("STILL IMAGE", "deer", "CRITICAL", 8.0, None, True),
+    ]
+    
+    for test_name, species, level, now, camera, expected in test_cases:
+        alert = billboard.generate_alert(species, 0.9, level, camera_id=camera, now=now)
+        status = "✓" if (alert is not None) == expected else "✗"
+        print(f"{status} {test_name:20} | {species:6} {level:10} @ {now:4.1f}s | Alert: {alert is not None}")
+    
+    print("\n✅ Alert debouncing tests completed")
+
+
+def test_road_geometry():
+    """Test distance-map lookups against the legacy road line and a diagonal road"""
+    print("\n" + "="*60)
+    print("TESTING: Road Geometry")
+    print("="*60)
+    
+    from road_geometry import RoadGeometry
+    
+    geometry = RoadGeometry()
+    geometry.set_camera("straight", polylines=[[[0.0, 0.75], [1.0, 0.75]]])
+    geometry.set_camera("diagonal", polylines=[[[0.0, 0.5], [1.0, 1.0]]])
+    geometry.set_camera("surface", polygons=[[[0.0, 0.7], [1.0, 0.7], [1.0, 1.0], [0.0, 1.0]]], anchor="bottom")
+    geometry.cameras["misspelled"] = {"polyline": [[[0.0, 0.5], [1.0, 0.5]]]}  # No road pixels
+    assessor = RiskAssessor(geometry)
+    legacy = RiskAssessor()
+    image_shape = (480, 640, 3)
+    road_y = int(480 * 0.75)  # 360
+    
+    # (name, camera, bbox, expected level)
+    test_cases = [
+        ("STRAIGHT ON ROAD", "straight", [100, road_y-10, 200, road_y+10], "CRITICAL"),
+        ("STRAIGHT APPROACH", "straight", [100, road_y-150, 200, road_y-100], "CAUTION"),
+        ("DIAGONAL NEAR", "diagonal", [580, 440, 620, 470], "CRITICAL"),
+        ("DIAGONAL FAR", "diagonal", [20, 420, 60, 460], "LOW"),  # legacy line: WARNING
+        ("SURFACE FEET ON", "surface", [100, 250, 200, 340], "CRITICAL"),
+        ("UNKNOWN CAMERA", "missing", [100, 50, 200, 100], "LOW"),
+        ("EMPTY GEOMETRY", "misspelled", [100, road_y-10, 200, road_y+10], "CRITICAL"),  # 75% fallback
+    ]
+    
+    for test_name, camera, bbox, expected_level in test_cases:
+        risk = assessor.assess_risk(bbox, image_shape, 60, camera)
+        status = "✓" if risk['alert_level'] == expected_level else "✗"
+        print(f"{status} {test_name:20} | Distance: {risk['distance_to_road']:.3f} | Level: {risk['alert_level']}")
+    
+    # A straight polyline must agree with the hard-coded 75% line
+    bboxes = [[100, y, 200, y + 40] for y in range(0, 440, 20)]
+    mapped = geometry.distances("straight", image_shape, bboxes)
+    expected = [legacy.assess_risk(b, image_shape)['distance_to_road'] for b in bboxes]
+    error = float(np.max(np.abs(mapped - expected)))
+    status = "✓" if error < 0.01 else "✗"
+    print(f"{status} {'LEGACY AGREEMENT':20} | Max error: {error:.4f}")
+    
+    print("\n✅ Road geometry tests completed")
+
+
+def test_ground_calibration():
+    """Test homography distances in meters and time-to-road from speed priors"""
+    print("\n" + "="*60)
+    print("TESTING: Ground Calibration")
+    print("="*60)
+    
+    from ground_calibration import GroundCalibration
+    
+    # Top-down camera: 640x480 image covers 64 m x 48 m, road along y = 36 m
+    calibration = GroundCalibration(speed_priors={'Bear': 10.0, 'Deer': 5.0, '*': 8.0})
+    calibration.set_camera("topdown",
+                           image_points=[[0, 0], [1, 0], [1, 1], [0, 1]],
+                           ground_points=[[0, 0], [64, 0], [64, 48], [0, 48]],
+                           road=[[0, 36], [64, 36]], approach_m=100)
+    image_shape = (480, 640, 3)
+    
+    # (name, bbox [feet at y2], species, expected meters, expected seconds)
+    test_cases = [
+        ("ON ROAD", [100, 300, 200, 360], "bear", 0.0, 0.0),
+        ("10 M AWAY", [100, 200, 200, 260], "bear", 10.0, 1.0),
+        ("SLOW SPECIES", [100, 200, 200, 260], "deer", 10.0, 2.0),
+        ("UNKNOWN SPECIES", [100, 100, 200, 160], "giraffe", 20.0, 2.5),
+    ]
+    
+    metrics = calibration.time_to_collision("topdown", image_shape, [c[1] for c in test_cases],
+                                            [c[2] for c in test_cases], vehicle_speed_kmh=72)
+    for i, (test_name, bbox, species, meters, seconds) in enumerate(test_cases):
+        distance = metrics['distance_m'][i]
+        ttr = metrics['time_to_road_s'][i]
+        status = "✓" if abs(distance - meters) < 0.6 and abs(ttr - seconds) < 0.1 else "✗"
+        print(f"{status} {test_name:20} | {distance:5.1f} m | Reaches road in {ttr:4.1f} s")
+    
+    status = "✓" if abs(metrics['vehicle_eta_s'] - 5.0) < 1e-6 else "✗"
+    print(f"{status} {'VEHICLE ETA':20} | {metrics['vehicle_eta_s']:.1f} s for 100 m at 72 km/h")
+    
+    print("\n✅ Ground calibration tests completed")
+
+
+def test_frame_ring():
+    """Test shared-memory slot handoff, oldest-frame reclaim and zero-copy views"""
+    print("\n" + "="*60)
+    print("TESTING: Shared-Memory Frame Ring")
+    print("="*60)
+    
+    from frame_ring import FrameRing
+    
+    ring = FrameRing(slots=2, shape=(480, 640, 3))
+    try:
+        frames = [np.full((480, 640, 3), value, dtype=np.uint8) for value in (10, 20, 30)]
+        handles = [ring.write(frame, camera_id="cam1") for frame in frames]
+        
+        # Two slots, three frames: the oldest unread frame is reclaimed
+        first, view = ring.read(timeout=1)
+        status = "✓" if first.seq == handles[1].seq and view[0, 0, 0] == 20 else "✗"
+        print(f"{status} {'RECLAIM OLDEST':20} | Read seq {first.seq} value {view[0, 0, 0]}")
+        
+        status = "✓" if np.shares_memory(view, ring.view(first)) and view.base is not None else "✗"
+        print(f"{status} {'ZERO-COPY VIEW':20} | Shape {view.shape}")
+        ring.release(first)
+        
+        small = ring.write(np.full((240, 320, 3), 40, dtype=np.uint8), camera_id="cam2")
+        second, _ = ring.read(timeout=1)
+        third, small_view = ring.read(timeout=1)
+        status = "✓" if third.seq == small.seq and small_view.shape == (240, 320, 3) else "✗"
+        print(f"{status} {'SMALLER FRAME':20} | Shape {small_view.shape} from {third.meta['camera_id']}")
+        
+        try:
+            ring.write(np.zeros((720, 1280, 3), dtype=np.uint8))
+            print(f"✗ {'OVERSIZED FRAME':20} | Accepted")
+        except ValueError:
+            print(f"✓ {'OVERSIZED FRAME':20} | Rejected")
+        
+        stats = ring.stats()
+        status = "✓" if stats['written'] == 4 and stats['reclaimed'] == 1 else "✗"
+        print(f"{status} {'STATS':20} | {stats}")
+    finally:
+        ring.close()
+    
+    print("\n✅ Frame ring tests completed")
+
+
+def test_frame_pool():
+    """Test pooled frame buffers: reuse, reallocation, per-thread pools and the low-memory cap"""
+    print("\n" + "="*60)
+    print("TESTING: Frame Buffer Pool")
+    print("="*60)
+    
+    import threading
+    from frame_buffers import FramePool
+    
+    pool = FramePool(low_memory=False)
+    rgb = np.zeros((480, 640, 3), dtype=np.uint8)
+    rgb[..., 0] = 255                                    # Pure red in RGB
+    
+    first = pool.to_bgr(rgb)
+    second = pool.to_bgr(rgb.copy())
+    resized = pool.to_bgr(np.zeros((720, 1280, 3), dtype=np.uint8))
+    
+    shared = FramePool(low_memory=False)
+    main_thread = shared.to_bgr(rgb)
+    other_thread = {}
+    def convert():
+        other_thread["bgr"] = shared.to_bgr(rgb)
+    worker = threading.Thread(target=convert)
+    worker.start()
+    worker.join()
+    separate = other_thread["bgr"] is not main_thread and shared.to_bgr(rgb) is main_thread
+    
+    low = FramePool(low_memory=True)
+    capped = low.to_bgr(np.zeros((1080, 1920, 3), dtype=np.uint8))
+    small = low.to_bgr(np.zeros((480, 640, 3), dtype=np.uint8))
+    
+    # (name, passed, detail)
+    test_cases = [
+        ("CONVERTS TO BGR", tuple(first[0, 0]) == (0, 0, 255), tuple(int(v) for v in first[0, 0])),
+        ("SAME SHAPE REUSED", second is first, f"same buffer: {second is first}"),
+        ("NEW SHAPE REALLOCATED", resized is not first and resized.shape == (720, 1280, 3), resized.shape),
+        ("PER-THREAD POOLS", separate, f"separate buffers: {separate}"),
+        ("LOW MEMORY CAP", max(capped.shape[:2]) == 960 and capped.shape[:2] == (540, 960), capped.shape),
+        ("SMALL FRAME KEPT", small.shape == (480, 640, 3), small.shape),
+        ("DEFAULT NOT CAPPED", pool.max_side is None, pool.max_side),
+    ]
+    
+    for test_name, passed, detail in test_cases:
+        status = "✓" if passed else "✗"
+        print(f"{status} {test_name:22} | {detail}")
+    
+    print("\n✅ Frame pool tests completed")
+
+
+def test_live_stats():
+    """Test sliding-window counts, alerts per camera and peak risk"""
+    print("\n" + "="*60)
+    print("TESTING: Live Statistics")
+    print("="*60)
+    
+    from live_stats import LiveStats
+    
+    stats = LiveStats(bucket_s=60)
+    start = 1_700_000_000 - 1_700_000_000 % 60
+    
+    # One deer per minute for 70 minutes, a bear 10 minutes ago, alerts every 20 minutes
+    for minute in range(70):
+        stats.record_detection("deer", 0.2, ts=start + minute * 60)
+        if minute % 20 == 0:
+            stats.record_alert("cam1", ts=start + minute * 60 + 1)
+    stats.record_detection("bear", 0.95, ts=start + 59 * 60)
+    stats.record_alert("cam2", ts=start + 68 * 60)
+    stats.record_detection("deer", 0.99, ts=start)  # Older than every window
+    
+    snapshot = stats.snapshot(now=start + 69 * 60 + 30)
+    
+    # (window, expected deer, expected bear, expected alerts by camera, expected peak)
+    test_cases = [
+        ("5m", 5, 0, {"cam2": 1}, 0.2),
+        ("15m", 15, 1, {"cam1": 1, "cam2": 1}, 0.95),
+        ("60m", 60, 1, {"cam1": 3, "cam2": 1}, 0.95),
+    ]
+    
+    for window, deer, bear, alerts, peak in test_cases:
+        result = snapshot[window]
+        ok = (result['species'].get("deer", 0) == deer and result['species'].get("bear", 0) == bear
+              and result['alerts_by_camera'] == alerts and result['peak_risk'] == peak)
+        status = "✓" if ok else "✗"
+        print(f"{status} {window:20} | Species: {result['species']} | Alerts: {result['alerts_by_camera']} "
+              f"| Peak: {result['peak_risk']:.2f}")
+    
+    status = "✓" if stats.snapshot(now=start + 69 * 60 + 45) is snapshot else "✗"
+    print(f"{status} {'CACHED SNAPSHOT':20} | Timeline buckets: {len(snapshot['timeline'])}")
+    
+    print("\n✅ Live statistics tests completed")
+
+
+def test_alert_stream():
+    """Test subscriber buffering, drop priority and the local SSE server"""
+    print("\n" + "="*60)
+    print("TESTING: Alert Stream")
+    print("="*60)
+    
+    import json
+    import urllib.request
+    from alert_stream import AlertHub, start_server
+    
+    hub = AlertHub(max_events=4, max_dropped=3)
+    sub = hub.subscribe()
+    alert_only = hub.subscribe(event_types=["alert"], camera_id="cam-1")
+    
+    hub.publish("alert", {"level": "warning"}, camera_id="cam-1")
+    hub.publish("alert", {"level": "critical"}, camera_id="cam-2")
+    hub.publish("detection", {"n": 1}, camera_id="cam-1")
+    hub.publish("detection", {"n": 2}, camera_id="cam-2")
+    hub.publish("detection", {"n": 3}, camera_id="cam-3")   # Full: drops a detection, not an alert
+    pending = [e["type"] for e in sub.events]
+    status = "✓" if pending.count("alert") == 2 and sub.dropped == 1 else "✗"
+    print(f"{status} {'ALERTS KEPT':20} | Pending: {pending} | Dropped: {sub.dropped}")
+    
+    status = "✓" if [e["data"] for e in alert_only.events] == [{"level": "warning"}] else "✗"
+    print(f"{status} {'FILTERS':20} | cam-1 alerts: {len(alert_only.events)}")
+    
+    # Draining resets the overflow count, so drops spread over time never close a healthy consumer
+    def drain():
+        while sub.get(timeout=0) is not None:
+            pass
+    
+    drain()
+    for batch in range(3):
+        for n in range(6):
+            hub.publish("detection", {"n": n}, camera_id=f"cam-{batch}-{n}")
+        drain()
+    status = "✓" if not sub.closed and sub.dropped > sub.max_dropped else "✗"
+    print(f"{status} {'DRAINING CONSUMER':20} | Dropped: {sub.dropped} | Closed: {sub.closed}")
+    
+    for n in range(10):
+        hub.publish("detection", {"n": n}, camera_id=f"cam-stuck-{n}")
+    status = "✓" if sub.closed and sub not in hub.subscribers else "✗"
+    print(f"{status} {'STUCK CONSUMER':20} | Closed: {sub.closed}")
+    
+    server = start_server(hub, port=0)
+    host, port = server.server_address
+    with urllib.request.urlopen(f"http://{host}:{port}/stats", timeout=5) as response:
+        cors = response.headers.get("Access-Control-Allow-Origin")
+        stats = json.loads(response.read())
+    server.shutdown()
+    status = "✓" if host == "127.0.0.1" and cors is None and stats["subscribers"] == 1 else "✗"
+    print(f"{status} {'LOCAL SERVER':20} | Bound: {host} | CORS: {cors} | Subscribers: {stats['subscribers']}")
+    
+    print("\n✅ Alert stream tests completed")
+
+
+def test_flight_recorder():
+    """Test that only requests above the rolling p99 are captured, with rotation"""
+    print("\n" + "="*60)
+    print("TESTING: Flight Recorder")
+    print("="*60)
+    
+    import os
+    import tempfile
+    import time
+    from flight_recorder import FlightRecorder
+    
+    capture_dir = tempfile.mkdtemp(prefix="wildguard_flight_")
+    recorder = FlightRecorder(capture_dir, ring_size=200, min_samples=20, max_captures=2)
+    image = np.zeros((48, 64, 3), dtype=np.uint8)
+    
+    def request(delay_s):
+        trace = recorder.start(model="test", backend="none")
+        trace.set_input(image=image)
+        with trace.stage("inference"):
+            time.sleep(delay_s)
+        return trace.finish()
+    
+    # (name, delay, expect capture)
+    test_cases = [("WARM-UP", 0.002, False)] * 30 + [
+        ("FAST", 0.002, False),
+        ("SLOW 1", 0.05, True),
+        ("SLOW 2", 0.06, True),
+        ("SLOW 3", 0.07, True),
+    ]
+    
+    for test_name, delay, expected in test_cases:
+        record = request(delay)
+        if test_name == "WARM-UP":
+            continue
+        status = "✓" if ('capture' in record) == expected else "✗"
+        print(f"{status} {test_name:20} | {record['total_ms']:6.1f} ms | Captured: {'capture' in record}")
+    
+    captures = recorder.captures()
+    files = sorted(os.listdir(captures[-1])) if captures else []
+    status = "✓" if len(captures) == 2 and files == ['input.png', 'stacks.txt', 'trace.json'] else "✗"
+    print(f"{status} {'ROTATION':20} | {len(captures)} kept | {files}")
+    
+    # Two one-shot processes sharing the persisted ring: compaction must
+    # keep the other's records, not rewrite from a stale in-memory ring
+    persist_dir = tempfile.mkdtemp(prefix="wildguard_flight_persist_")
+    first = FlightRecorder(persist_dir, ring_size=10, profiler=None, persist=True)
+    second = FlightRecorder(persist_dir, ring_size=10, profiler=None, persist=True)
+    ids = []
+    for idx in range(30):
+        writer = first if idx % 2 == 0 else second
+        ids.append(writer.start(model="test").finish()['id'])
+    persisted = [r['id'] for r in FlightRecorder(persist_dir, ring_size=10, persist=True).traces]
+    status = "✓" if persisted == ids[-10:] else "✗"
+    print(f"{status} {'SHARED PERSIST':20} | {len(persisted)} kept | newest: {persisted[-1:] == ids[-1:]}")
+    
+    started_at = time.perf_counter() - 0.5
+    trace = FlightRecorder(capture_dir, profiler=None).start(started_at=started_at, model="test")
+    trace.add_stage("load", 500.0)
+    record = trace.finish()
+    status = "✓" if record['total_ms'] >= 500 and record['stages_ms']['load'] == 500.0 else "✗"
+    print(f"{status} {'LOAD STAGE':20} | {record['total_ms']:6.1f} ms | {record['stages_ms']}")
+    
+    print("\n✅ Flight recorder tests completed")
+
+
+def test_batch_inputs():
+    """Test batch input expansion and resume from the checkpoint and output"""
+    print("\n" + "="*60)
+    print("TESTING: Batch Inputs & Resume")
+    print("="*60)
+    
+    import json
+    import os
+    import tempfile
+    from batch_inputs import expand_inputs, load_checkpoint, load_completed
+    
+    work_dir = tempfile.mkdtemp(prefix="wildguard_batch_")
+    for name in ["a.jpg", "b.PNG", "notes.txt", os.path.join("sub", "c.jpeg")]:
+        path = os.path.join(work_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "w").close()
+    a, b, c = (os.path.join(work_dir, name) for name in ["a.jpg", "b.PNG", os.path.join("sub", "c.jpeg")])
+    
+    manifest = os.path.join(work_dir, "list.txt")
+    with open(manifest, "w") as f:
+        f.write(f"# archive\n{c}\n\n{a}\n")
+    
+    # (name, inputs, manifest, expected paths)
+    test_cases = [
+        ("DIRECTORY", [work_dir], None, [a, b, c]),
+        ("GLOB", [os.path.join(work_dir, "**", "*.jpeg")], None, [c]),
+        ("MANIFEST FIRST", [work_dir], manifest, [c, a, b]),
+        ("EXPLICIT FILE", [a, a], None, [a]),
+    ]
+    for test_name, inputs, manifest_path, expected in test_cases:
+        paths = expand_inputs(inputs, manifest_path)
+        status = "✓" if paths == expected else "✗"
+        print(f"{status} {test_name:20} | {[os.path.relpath(p, work_dir) for p in paths]}")
+    
+    # Interrupted after writing b's record but before its checkpoint entry,
+    # then mid-way through c's record
+    output = os.path.join(work_dir, "results.jsonl")
+    checkpoint = output + ".checkpoint"
+    with open(output, "w") as f:
+        f.write(json.dumps({"path": a, "detections": []}) + "\n")
+        f.write(json.dumps({"path": b, "error": "Could not read image"}) + "\n")
+        f.write(json.dumps({"path": c})[:12])
+    with open(checkpoint, "w") as f:
+        f.write(a + "\n")
+    
+    done = load_checkpoint(checkpoint) | load_completed(output)
+    with open(output) as f:
+        lines = f.read().splitlines()
+    status = "✓" if done == {a, b} else "✗"
+    print(f"{status} {'RESUME':20} | Done: {sorted(os.path.relpath(p, work_dir) for p in done)}")
+    status = "✓" if len(lines) == 2 and all(json.loads(line) for line in lines) else "✗"
+    print(f"{status} {'TORN LINE DROPPED':20} | Lines: {len(lines)}")
+    
+    status = "✓" if load_checkpoint(None) == set() and load_completed(os.path.join(work_dir, "none")) == set() else "✗"
+    print(f"{status} {'FRESH RUN':20} | Nothing to skip")
+    
+    print("\n✅ Batch input tests completed")
+
+
+def test_result_codec():
+    """Test that JSON and binary result encodings carry the same information"""
+    print("\n" + "="*60)
+    print("TESTING: Result Codec Round-Trip")
+    print("="*60)
+    
+    import json
+    import result_codec
+    
+    assessor = RiskAssessor()
+    image_shape = (480, 640, 3)
+    boxes = [
+        ("Deer", 87.3, [100, 340, 220, 380]),
+        ("Dog", 45.0, [300, 200, 360, 260]),
+        ("Deer", 25.1, [10, 20, 90, 70]),
+    ]
+    
+    detections = []
+    for idx, (animal, conf, bbox) in enumerate(boxes):
+        x1, y1, x2, y2 = bbox
+        detections.append({
+            "id": idx,
+            "animal": animal,
+            "confidence": conf,
+            "bbox": {"x": x1, "y": y1, "width": x2 - x1, "height": y2 - y1},
+            "risk": assessor.assess_risk(bbox, image_shape)
+        })
+    
+    # Ground-calibrated cameras add metric distance and TTC; a box above
+    # the horizon carries nulls
+    calibrated = json.loads(json.dumps(detections))
+    ground = [(12.5, 1.84, True), (37.25, 6.1, False), (None, None, False)]
+    for det, (distance_m, time_to_road_s, conflict) in zip(calibrated, ground):
+        det["risk"].update({"distance_m": distance_m, "time_to_road_s": time_to_road_s, "conflict": conflict})
+    
+    test_cases = [
+        ("NO DETECTIONS", {"detections": [], "vehicleSpeed": 65, "riskLevel": "safe",
+                           "crossingProbability": 0, "distanceToRoad": 100}),
+        ("MULTIPLE", {"detections": detections, "vehicleSpeed": 65, "riskLevel": "critical",
+                      "crossingProbability": 98, "distanceToRoad": 1}),
+        ("CALIBRATED", {"detections": calibrated, "vehicleSpeed": 65, "riskLevel": "critical",
+                        "crossingProbability": 98, "distanceToRoad": 1,
+                        "distanceToRoadM": 12.5, "timeToRoad": 1.84, "vehicleEta": 3.27}),
+        ("CALIBRATED NO ETA", {"detections": calibrated[1:], "vehicleSpeed": 0, "riskLevel": "caution",
+                               "crossingProbability": 40, "distanceToRoad": 30,
+                               "distanceToRoadM": 37.25, "timeToRoad": 6.1, "vehicleEta": None}),
+    ]
+    
+    for test_name, output in test_cases:
+        as_json = json.dumps(output)
+        as_binary = result_codec.encode(output)
+        decoded = result_codec.decode(as_binary)
+        status = "✓" if decoded == json.loads(as_json) == output else "✗"
+        print(f"{status} {test_name:20} | JSON: {len(as_json):5} bytes | Binary: {len(as_binary):5} bytes")
+    
+    print("\n✅ Result codec tests completed")
+
+
+def test_event_store():
+    """Test event writes (background and synchronous) and filtered queries"""
+    print("\n" + "="*60)
+    print("TESTING: Event Store")
+    print("="*60)
+    
+    import os
+    import tempfile
+    from event_store import EventStore
+    
+    path = os.path.join(tempfile.mkdtemp(prefix="wildguard_events_"), "events.db")
+    t0 = 1_700_000_000
+    
+    store = EventStore(path, flush_interval_s=0.05)
+    store.record_detection("deer", [0, 0, 10, 10], 0.9, 0.95, "CRITICAL", "cam1", ts=t0)
+    store.record_detection("deer", [0, 0, 10, 10], 0.8, 0.45, "CAUTION", "cam2", ts=t0 + 60)
+    store.record_detection("bear", [0, 0, 10, 10], 0.7, 0.15, "LOW", "cam1", ts=t0 + 120)
+    store.record_alert("deer", "CRITICAL", 0.95, "DANGER: DEER ON ROAD!", "cam1", ts=t0)
+    store.close()
+    
+    # One-shot (detect_cli) mode writes on close without a writer thread
+    oneshot = EventStore(path, background=False)
+    oneshot.record_detection("deer", [0, 0, 10, 10], 0.6, 0.75, "WARNING", "cam1", ts=t0 + 180)
+    oneshot.record_alert("deer", "WARNING", 0.75, "CAUTION: DEER DETECTED", "cam1", ts=t0 + 180)
+    oneshot.close()
+    
+    # (name, results, expected count)
+    test_cases = [
+        ("ALL DETECTIONS", store.query_detections(), 4),
+        ("TIME RANGE", store.query_detections(start=t0 + 60, end=t0 + 180), 2),
+        ("SPECIES", store.query_detections(species="deer"), 3),
+        ("CAMERA", store.query_detections(camera_id="cam1"), 3),
+        ("SPECIES + CAMERA", store.query_detections(species="deer", camera_id="cam2"), 1),
+        ("ALERTS", store.query_alerts(camera_id="cam1"), 2),
+        ("ALERTS IN RANGE", store.query_alerts(start=t0 + 1), 1),
+    ]
+    
+    for test_name, rows, expected in test_cases:
+        status = "✓" if len(rows) == expected else "✗"
+        print(f"{status} {test_name:20} | Rows: {len(rows)}")
+    
+    counts = store.species_counts(camera_id="cam1")
+    status = "✓" if counts == {"deer": 2, "bear": 1} else "✗"
+    print(f"{status} {'SPECIES COUNTS':20} | {counts}")
+    
+    print("\n✅ Event store tests completed")
+
+
+def test_resolution_policy():
+    """Test adaptive input size choices from recent detection sizes and risk"""
+    print("\n" + "="*60)
+    print("TESTING: Adaptive Resolution Policy")
+    print("="*60)
+    
+    import os
+    import tempfile
+    from adaptive_resolution import ResolutionPolicy
+    
+    image_shape = (480, 640, 3)
+    large = [{"class": "bear", "bbox": [0, 0, 320, 240]}]   # Half the longest side
+    small = [{"class": "deer", "bbox": [0, 0, 16, 12]}]     # 2.5% of the longest side
+    medium = [{"class": "dog", "bbox": [0, 0, 64, 48]}]     # 10% of the longest side
+    small_car = [{"class": "car", "bbox": [0, 0, 16, 12]}]
+    degenerate = [{"class": "deer", "bbox": [50, 50, 50, 50]}]
+    
+    # (name, observations [(detections, alert levels)], expected size)
+    test_cases = [
+        ("IDLE", [], 640),
+        ("NOTHING SEEN", [([], ())], 640),
+        ("LARGE ANIMAL", [(large, ("LOW",))], 320),
+        ("MEDIUM ANIMAL", [(medium, ("LOW",))], 480),
+        ("SMALL ANIMAL", [(large, ("LOW",)), (small, ("LOW",))], 1280),
+        ("LARGE NEAR ROAD", [(large, ("WARNING",))], 640),
+        ("SMALL AGED OUT", [(small, ("LOW",))] + [(large, ("LOW",))] * 8, 320),
+        ("SMALL CAR IGNORED", [(large + small_car, ("LOW", "LOW"))], 320),
+        ("CAR NEAR ROAD", [(large + small_car, ("LOW", "CRITICAL"))], 320),
+        ("ZERO-SIZE BOX", [(degenerate, ("LOW",))], 1280),
+    ]
+    
+    for test_name, observations, expected in test_cases:
+        policy = ResolutionPolicy()
+        for detections, levels in observations:
+            policy.observe("cam", detections, image_shape, levels)
+        size = policy.choose("cam")
+        status = "✓" if size == expected else "✗"
+        print(f"{status} {test_name:20} | Size: {size}")
+    
+    # detect_cli keeps the history across processes in a state file
+    policy = ResolutionPolicy()
+    policy.observe("cam", small, image_shape, ("CRITICAL",))
+    path = os.path.join(tempfile.mkdtemp(prefix="wildguard_resolution_"), "state.json")
+    policy.save(path)
+    restored = ResolutionPolicy().load(path)
+    status = "✓" if restored.choose("cam") == policy.choose("cam") == 1280 else "✗"
+    print(f"{status} {'STATE ROUND-TRIP':20} | Size: {restored.choose('cam')}")
+    
+    print("\n✅ Adaptive resolution tests completed")
+
+
+def test_cascade_escalation():
+    """Test that only ambiguous or near-road animals escalate to the medium model"""
+    print("\n" + "="*60)
+    print("TESTING: Cascade Escalation")
+    print("="*60)
+    
+    from cascade_detector import CascadeDetector
+    from road_geometry import RoadGeometry
+    
+    image = np.zeros((480, 640, 3), dtype=np.uint8)
+    road_y = int(480 * 0.75)  # 360
+    geometry = RoadGeometry()
+    geometry.set_camera("raised", polylines=[[[0.0, 0.3], [1.0, 0.3]]])
+    
+    class StubCascade(CascadeDetector):
+        """Models are callables returning detection lists"""
+        def _run(self, model, image, conf, imgsz=None):
+            return [det for det in model(image) if det['confidence'] >= conf]
+    
+    def det(cls, conf, y):
+        return {"class": cls, "confidence": conf, "bbox": [100, y - 20, 200, y + 20], "class_id": 0}
+    
+    # (name, fast detections, camera, expected reasons)
+    test_cases = [
+        ("CAR ON ROAD", [det("car", 0.9, road_y)], None, set()),
+        ("DEER ON ROAD", [det("deer", 0.9, road_y)], None, {"near_road"}),
+        ("DEER FAR CONFIDENT", [det("deer", 0.9, 60)], None, set()),
+        ("DOG FAR AMBIGUOUS", [det("dog", 0.3, 60)], None, {"ambiguous"}),
+        ("CAR AMBIGUOUS", [det("car", 0.3, 60)], None, set()),
+        ("CAMERA GEOMETRY", [det("deer", 0.9, road_y)], "raised", set()),
+        ("CAMERA ROAD", [det("deer", 0.9, 144)], "raised", {"near_road"}),
+    ]
+    
+    accurate = [det("deer", 0.95, road_y)]
+    frame = {}
+    cascade = StubCascade(fast_model=lambda image: frame["fast"], accurate_model=lambda image: accurate,
+                          road_geometry=geometry)
+    for test_name, fast, camera, expected in test_cases:
+        frame["fast"] = fast
+        before = cascade.stats['escalated']
+        result = cascade.detect(image, camera_id=camera)
+        escalated = cascade.stats['escalated'] > before
+        ok = (cascade.escalation_reasons(fast, image.shape, camera) == expected
+              and escalated == bool(expected) and (result == accurate) == escalated)
+        status = "✓" if ok else "✗"
+        print(f"{status} {test_name:20} | Reasons: {sorted(expected) or '-'} | Escalated: {escalated}")
+    
+    status = "✓" if abs(cascade.escalation_rate - 3 / 7) < 1e-9 else "✗"
+    print(f"{status} {'ESCALATION RATE':20} | {cascade.escalation_rate:.2f}")
+    
+    print("\n✅ Cascade escalation tests completed")
+
+
+def test_camera_scheduler():
+    """Test that risky cameras are sampled more often and failures don't stall a camera"""
+    print("\n" + "="*60)
+    print("TESTING: Camera Scheduler")
+    print("="*60)
+    
+    import threading
+    import time
+    from camera_scheduler import CameraScheduler, level_from_result
+    
+    calls = {"hot": 0, "near": 0, "quiet": 0, "flaky": 0}
+    frame = np.zeros((80, 80, 3), dtype=np.uint8)                # Road line at y=60
+    near_road = [{"class": "deer", "bbox": [10, 55, 30, 65], "confidence": 0.9}]
+    far_from_road = [{"class": "deer", "bbox": [10, 0, 30, 10], "confidence": 0.9}]
+    car_on_road = [{"class": "car", "bbox": [10, 55, 30, 65], "confidence": 0.9}]
+    
+    def process(camera_id, frame):
+        calls[camera_id] += 1
+        if camera_id == "flaky" and calls[camera_id] % 2 == 1:
+            raise RuntimeError("decoder hiccup")
+        if camera_id == "hot":
+            return {"riskLevel": "critical", "detections": []}
+        # WildGuardDetector.detect style: plain detections without a risk
+        return near_road if camera_id == "near" else far_from_road
+    
+    def on_result(camera_id, frame, result):
+        if camera_id == "quiet":
+            raise ValueError("subscriber failed")
+    
+    scheduler = CameraScheduler(process, workers=2, min_fps=1.0, max_fps=10.0, on_result=on_result)
+    for camera_id in calls:
+        scheduler.add_camera(camera_id)
+    scheduler.start()
+    
+    stop = threading.Event()
+    def feed():
+        while not stop.is_set():
+            for camera_id in calls:
+                scheduler.submit_frame(camera_id, frame)
+            time.sleep(0.02)
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    time.sleep(2.0)
+    stop.set()
+    feeder.join()
+    stats = scheduler.stats()
+    scheduler.stop()
+    
+    assessor = RiskAssessor()
+    raw_level = level_from_result(near_road, frame.shape, None, assessor)
+    car_level = level_from_result(car_on_road, frame.shape, None, assessor)
+    
+    # (name, passed, detail)
+    test_cases = [
+        ("RAW DETECTIONS", raw_level == "CRITICAL", raw_level),
+        ("CAR IGNORED", car_level == "LOW", car_level),
+        ("HOT PRIORITIZED", stats["hot"]["inferences"] > 3 * stats["quiet"]["inferences"],
+         f"hot {stats['hot']['inferences']} vs quiet {stats['quiet']['inferences']}"),
+        ("HOT LEVEL", stats["hot"]["level"] == "CRITICAL", stats["hot"]["level"]),
+        ("NEAR-ROAD ANIMAL", stats["near"]["level"] == "CRITICAL"
+         and stats["near"]["inferences"] > 3 * stats["quiet"]["inferences"],
+         f"{stats['near']['level']}, near {stats['near']['inferences']} vs quiet {stats['quiet']['inferences']}"),
+        ("QUIET LEVEL", stats["quiet"]["level"] == "LOW", stats["quiet"]["level"]),
+        ("RECOVERS FROM ERRORS", stats["flaky"]["inferences"] >= 2 and stats["quiet"]["inferences"] >= 2,
+         f"flaky {stats['flaky']['inferences']}, quiet {stats['quiet']['inferences']}"),
+    ]
+    
+    for test_name, passed, detail in test_cases:
+        status = "✓" if passed else "✗"
+        print(f"{status} {test_name:20} | {detail}")
+    
+    print("\n✅ Camera scheduler tests completed")
+
+
+def test_autotune_selection():
+    """Test that autotune picks the fastest configuration within the SLO"""
+    print("\n" + "="*60)
+    print("TESTING: Autotune Selection")
+    print("="*60)
+    
+    from autotune import select
+    
+    results = [
+        {"backend": "torch-cpu", "threads": 1, "p95_ms": 90, "fps": 11.0},
+        {"backend": "torch-cpu", "threads": 4, "p95_ms": 240, "fps": 16.0},
+        {"backend": "torch-cpu", "threads": 8, "p95_ms": 200, "fps": 16.0},
+        {"backend": "onnx", "threads": None, "p95_ms": 400, "fps": 25.0},
+    ]
+    
+    # (name, slo, expected (backend, threads), expected meets_slo)
+    test_cases = [
+        ("HIGHEST FPS IN SLO", 250, ("torch-cpu", 4), True),
+        ("TIGHT SLO", 100, ("torch-cpu", 1), True),
+        ("NOTHING MEETS SLO", 50, ("torch-cpu", 1), False),
+        ("LOOSE SLO", 500, ("onnx", None), True),
+    ]
+    
+    for test_name, slo, expected, meets_slo in test_cases:
+        selected = select(results, slo)
+        chosen = (selected['backend'], selected['threads'])
+        status = "✓" if chosen == expected and selected['meets_slo'] == meets_slo else "✗"
+        print(f"{status} {test_name:20} | SLO: {slo:4} ms | Selected: {chosen} | Meets SLO: {selected['meets_slo']}")
+    
+    print("\n✅ Autotune selection tests completed")
+
+
+def test_heatmap_tiles():
+    """Test a full tile build followed by an incremental append"""
+    print("\n" + "="*60)
+    print("TESTING: Heatmap Tiles")
+    print("="*60)
+    
+    import json
+    import os
+    import tempfile
+    from build_heatmap_tiles import build_tiles, load_base
+    
+    work_dir = tempfile.mkdtemp(prefix="wildguard_tiles_")
+    output_dir = os.path.join(work_dir, "tiles")
+    
+    def write_csv(name, rows):
+        path = os.path.join(work_dir, name)
+        with open(path, "w") as f:
+            f.write("record_id,animal_type,date,time,location_x,location_y\n")
+            for idx, (animal, hour, x, y) in enumerate(rows):
+                f.write(f"{idx},{animal},2024-01-01,{hour:02d}:00:00,{x},{y}\n")
+        return path
+    
+    full = write_csv("full.csv", [("Deer", 2, 100.0, 100.0), ("Wolf", 14, 900.0, 900.0)])
+    batch = write_csv("batch.csv", [("Deer", 8, 110.0, 120.0), ("Bear", 20, 500.0, 500.0)])
+    
+    os.makedirs(output_dir)
+    with open(os.path.join(output_dir, "notes.txt"), "w") as f:
+        f.write("not a tile")
+    try:
+        build_tiles(full, output_dir, write_png=False)
+        refused = False
+    except ValueError:
+        refused = True
+    status = "✓" if refused and os.path.exists(os.path.join(output_dir, "notes.txt")) else "✗"
+    print(f"{status} {'FOREIGN DIR REFUSED':20} | Refused: {refused}")
+    os.remove(os.path.join(output_dir, "notes.txt"))
+    
+    build_tiles(full, output_dir, write_png=False)
+    build_tiles(batch, output_dir, append=True, write_png=False)
+    with open(os.path.join(output_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    
+    # (name, species, band, expected total count)
+    test_cases = [
+        ("ALL SPECIES", "all", "all", 4),
+        ("DEER MERGED", "deer", "all", 2),
+        ("DEER NIGHT KEPT", "deer", "night", 1),
+        ("NEW SPECIES", "bear", "evening", 1),
+        ("UNTOUCHED LAYER", "wolf", "afternoon", 1),
+    ]
+    for test_name, species, band, expected in test_cases:
+        base = load_base(output_dir, species, band)
+        total = int(base.sum()) if base is not None else 0
+        status = "✓" if total == expected else "✗"
+        print(f"{status} {test_name:20} | {species}/{band} | Count: {total}")
+    
+    status = "✓" if manifest["records"] == 4 and "bear" in manifest["layers"] else "✗"
+    print(f"{status} {'MANIFEST':20} | Records: {manifest['records']} | Species: {sorted(manifest['layers'])}")
+    
+    # A full rebuild drops the appended layers but keeps files it did not write
+    with open(os.path.join(output_dir, "notes.txt"), "w") as f:
+        f.write("keep me")
+    build_tiles(full, output_dir, write_png=False)
+    kept = os.path.exists(os.path.join(output_dir, "notes.txt"))
+    status = "✓" if kept and load_base(output_dir, "bear", "all") is None else "✗"
+    print(f"{status} {'REBUILD':20} | Other files kept: {kept} | Bear layer removed: {load_base(output_dir, 'bear', 'all') is None}")
+    
+    print("\n✅ Heatmap tile tests completed")
+
+
+def test_model_evaluation():
+    """Test evaluation metrics, alert agreement and the Pareto frontier"""
+    print("\n" + "="*60)
+    print("TESTING: Model Evaluation Metrics")
+    print("="*60)
+    
+    from evaluate_models import evaluate, pareto_frontier, image_alert
+    from road_geometry import RoadGeometry
+    
+    road = RoadGeometry()
+    image = np.zeros((480, 640, 3), dtype=np.uint8)
+    samples = [
+        {"image": image, "camera": None, "objects": [{"class": "deer", "bbox": [100, 340, 200, 380]}]},
+        {"image": image, "camera": None, "objects": [{"class": "deer", "bbox": [300, 40, 380, 100]},
+                                                     {"class": "bear", "bbox": [400, 20, 480, 80]}]},
+    ]
+    predictions = [
+        [{"class": "deer", "confidence": 0.9, "bbox": [102, 342, 198, 380]},
+         {"class": "car", "confidence": 0.8, "bbox": [0, 0, 50, 50]}],
+        [{"class": "deer", "confidence": 0.3, "bbox": [300, 40, 380, 100]},
+         {"class": "deer", "confidence": 0.2, "bbox": [500, 400, 560, 460]}],
+    ]
+    
+    # (name, conf, expected precision, expected recall, expected mAP50, expected alert agreement)
+    test_cases = [
+        ("CONF 0.05", 0.05, (2 / 3 + 0) / 2, (1.0 + 0) / 2, 0.5, 0.5),
+        ("CONF 0.25", 0.25, 0.5, 0.5, 0.5, 1.0),
+        ("CONF 0.4", 0.4, 0.5, 0.25, 0.25, 0.5),
+    ]
+    
+    for test_name, conf, precision, recall, map50, agreement in test_cases:
+        result = evaluate(samples, predictions, conf, road)
+        ok = (abs(result['precision'] - precision) < 1e-6 and abs(result['recall'] - recall) < 1e-6
+              and abs(result['map50'] - map50) < 1e-6 and result['alerts']['agreement'] == agreement)
+        status = "✓" if ok else "✗"
+        print(f"{status} {test_name:20} | P: {result['precision']:.3f} | R: {result['recall']:.3f} "
+              f"| mAP50: {result['map50']:.3f} | Alert agreement: {result['alerts']['agreement']:.2f}")
+    
+    # Alert levels must match RiskAssessor for the same box
+    bbox = [100, 340, 200, 380]
+    expected = RiskAssessor().assess_risk(bbox, image.shape)['alert_level']
+    status = "✓" if image_alert(road, None, image.shape, [bbox]) == expected else "✗"
+    print(f"{status} {'ALERT LEVEL':20} | {expected}")
+    
+    rows = [{"map50": 0.6, "p95_ms": 40}, {"map50": 0.7, "p95_ms": 120},
+            {"map50": 0.5, "p95_ms": 60}, {"map50": 0.7, "p95_ms": 150}]
+    frontier = pareto_frontier(rows)
+    status = "✓" if frontier == [0, 1] else "✗"
+    print(f"{status} {'PARETO FRONTIER':20} | {frontier}")
+    
+    print("\n✅ Model evaluation tests completed")
+
+
 def test_detector_with_synthetic_data():
     """Test detector with synthetic images"""
     print("\n" + "="*60)
@@ -199,6 +1067,23 @@ def run_all_tests():
     try:
         test_risk_assessor()
         test_billboard_generator()
+        test_alert_debouncing()
+        test_road_geometry()
+        test_ground_calibration()
+        test_frame_ring()
+        test_frame_pool()
+        test_live_stats()
+        test_alert_stream()
+        test_flight_recorder()
+        test_batch_inputs()
+        test_result_codec()
+        test_event_store()
+        test_resolution_policy()
+        test_cascade_escalation()
+        test_camera_scheduler()
+        test_autotune_selection()
+        test_heatmap_tiles()
+        test_model_evaluation()
         test_detector_with_synthetic_data()
         test_end_to_end()
         generate_performance_report()
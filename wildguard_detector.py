@@ -9,106 +9,142 @@ from ultralytics import YOLO
 from PIL import Image
 import gradio as gr
 from datetime import datetime
+from collections import deque
+import time
+import os
+import atexit
 import warnings
 warnings.filterwarnings('ignore')
 
+from alert_stream import hub as alert_hub, start_server as start_alert_stream
+from model_cache import load_model, mark_ready, clear_ready
+from runtime_profile import load_profile, apply_profile
+from frame_buffers import FramePool
+from event_store import EventStore
+from road_geometry import RoadGeometry
+from risk_assessor import RiskAssessor
+from detections import to_detections
+from cascade_detector import CascadeDetector
+from adaptive_resolution import AdaptiveDetector
+from ground_calibration import GroundCalibration
+from live_stats import LiveStats
+from flight_recorder import FlightRecorder
+
 print("🚀 Initializing WildGuard System...")
 
 # ═══════════════════════════════════════════════════════════════
 # ANIMAL DETECTOR - YOLOv8 Based
 # ═══════════════════════════════════════════════════════════════
 
+# Input sizes warmed up at startup, e.g. WILDGUARD_WARMUP_SIZES=480,640
+WARMUP_SIZES = tuple(int(size) for size in os.environ.get('WILDGUARD_WARMUP_SIZES', '640').split(',') if size)
+
+
 class WildGuardDetector:
-    def __init__(self):
+    def __init__(self, warmup_sizes=WARMUP_SIZES, weights='yolov8m.pt'):
         print("📥 Loading YOLOv8 model...")
-        # Upgraded to Medium model for better accuracy
-        self.model = YOLO('yolov8m.pt')
-        print("✅ Model loaded successfully!")
+        # Host-specific threads / backend from scripts/autotune.py
+        self.profile = load_profile(weights=weights)
+        self.weights, self.predict_kwargs = apply_profile(self.profile, weights)
+        # Upgraded to Medium model for better accuracy; uses the pre-fused
+        # artifact from `python model_cache.py build` when present
+        self.model = load_model(self.weights, warmup_sizes=warmup_sizes, predict_kwargs=self.predict_kwargs)
+        print("✅ Model loaded and warmed up!")
     
-    def detect(self, image):
+    def detect(self, image, imgsz=None, camera_id=None):
         """
-        Detects all objects in the image using YOLOv8
+        Detects all objects in the image using YOLOv8.
+        imgsz overrides the model's default inference size. camera_id is
+        unused here; it keeps the signature of CascadeDetector.detect.
         """
         try:
-            results = self.model(image, conf=0.25, verbose=False)
-            detections = []
-            
-            if results and len(results) > 0:
-                result = results[0]
-                if result.boxes is not None and len(result.boxes) > 0:
-                    for box in result.boxes:
-                        xyxy = box.xyxy[0].cpu().numpy()
-                        x1, y1, x2, y2 = float(xyxy[0]), float(xyxy[1]), float(xyxy[2]), float(xyxy[3])
-                        conf = float(box.conf.cpu().numpy()[0])
-                        cls = int(box.cls.cpu().numpy()[0])
-                        class_name = result.names[cls]
-                        
-                        # No filtering - return all detections
-                        detections.append({
-                            'bbox': [int(x1), int(y1), int(x2), int(y2)],
-                            'class': class_name,
-                            'confidence': conf,
-                            'class_id': cls
-                        })
-            
-            return detections
+            kwargs = {'imgsz': imgsz} if imgsz else {}
+            results = self.model(image, conf=0.25, verbose=False, **self.predict_kwargs, **kwargs)
+            return self._to_detections(results[0]) if results else []
         except Exception as e:
             print(f"Detection error: {e}")
             return []
+    
+    _to_detections = staticmethod(to_detections)
 
 
 # ═══════════════════════════════════════════════════════════════
-# RISK ASSESSOR - Collision Risk Analysis
+# BILLBOARD GENERATOR - Alert Messages
 # ═══════════════════════════════════════════════════════════════
 
-class RiskAssessor:
-    def assess_risk(self, bbox, image_shape, vehicle_speed=60):
+LEVEL_RANK = {'LOW': 0, 'CAUTION': 1, 'WARNING': 2, 'CRITICAL': 3}
+
+
+class AlertStateMachine:
+    """
+    Alert state for a single camera: hysteresis between levels, a cooldown
+    per species/level and a fixed-size ring of recent emissions that caps
+    alert traffic regardless of frame rate
+    """
+    def __init__(self, cooldown_s=10.0, release_s=3.0, max_alerts=5, rate_window_s=10.0):
+        self.cooldown_s = cooldown_s
+        self.release_s = release_s
+        self.rate_window_s = rate_window_s
+        self.levels = {}       # species -> (held level, last time seen at or above it)
+        self.last_sent = {}    # (species, level) -> last emission time
+        self.recent = deque(maxlen=max_alerts)
+    
+    def update(self, species, alert_level, now):
         """
-        Fixed center_y calculation - was using bbox+bbox incorrectly
+        Feed one raw assessment; returns (effective_level, should_emit)
         """
-        h, w = image_shape[:2]
-        x1, y1, x2, y2 = bbox
-        center_y = (y1 + y2) / 2
-        road_y = h * 0.75  # Road assumed at 75% of image height
-        
-        distance_to_road = abs(center_y - road_y) / h
+        rank = LEVEL_RANK.get(alert_level, 0)
+        prev_level, held_since = self.levels.get(species, ('LOW', now))
+        prev_rank = LEVEL_RANK.get(prev_level, 0)
         
-        # Risk scoring based on distance
-        if distance_to_road < 0.05:
-            risk_score = 0.95
-            alert_level = "CRITICAL"
-            crossing_prob = 0.98
-        elif distance_to_road < 0.15:
-            risk_score = 0.75
-            alert_level = "WARNING"
-            crossing_prob = 0.80
-        elif distance_to_road < 0.35:
-            risk_score = 0.45
-            alert_level = "CAUTION"
-            crossing_prob = 0.50
+        # Escalate immediately, de-escalate only after the lower level held for release_s
+        if rank >= prev_rank or now - held_since >= self.release_s:
+            level, held_since = alert_level, now
         else:
-            risk_score = 0.15
-            alert_level = "LOW"
-            crossing_prob = 0.20
+            level = prev_level
+        self.levels[species] = (level, held_since)
         
-        # Speed factor adjustment
-        speed_factor = min(vehicle_speed / 100, 1.0)
-        risk_score = min(risk_score * (1 + speed_factor * 0.5), 1.0)
+        if level == 'LOW':
+            return level, False
         
-        return {
-            'risk_score': risk_score,
-            'alert_level': alert_level,
-            'crossing_probability': crossing_prob,
-            'distance_to_road': distance_to_road
-        }
-
+        # Escalations bypass cooldown and rate limiting
+        if LEVEL_RANK.get(level, 0) <= prev_rank:
+            last = self.last_sent.get((species, level))
+            if last is not None and now - last < self.cooldown_s:
+                return level, False
+            if len(self.recent) == self.recent.maxlen and now - self.recent[0] < self.rate_window_s:
+                return level, False
+        
+        self.last_sent[(species, level)] = now
+        self.recent.append(now)
+        return level, True
 
-# ═══════════════════════════════════════════════════════════════
-# BILLBOARD GENERATOR - Alert Messages
-# ═══════════════════════════════════════════════════════════════
 
 class BillboardGenerator:
-    def generate_alert(self, species, risk_score, alert_level):
+    def __init__(self, cooldown_s=10.0, release_s=3.0, max_alerts=5, rate_window_s=10.0, history_size=100):
+        self.state_config = {
+            'cooldown_s': cooldown_s,
+            'release_s': release_s,
+            'max_alerts': max_alerts,
+            'rate_window_s': rate_window_s
+        }
+        self.cameras = {}
+        self.history = deque(maxlen=history_size)
+    
+    def generate_alert(self, species, risk_score, alert_level, camera_id=None, now=None):
+        """
+        Without a camera_id every call is independent (single images).
+        With a camera_id alerts go through that camera's state machine and
+        repeated alerts for the same situation are suppressed.
+        """
+        if camera_id is not None:
+            state = self.cameras.get(camera_id)
+            if state is None:
+                state = self.cameras[camera_id] = AlertStateMachine(**self.state_config)
+            alert_level, emit = state.update(species, alert_level, time.monotonic() if now is None else now)
+            if not emit:
+                return None
+        
         if alert_level == "LOW":
             return None
         
@@ -123,20 +159,44 @@ class BillboardGenerator:
             'CAUTION': f"Wildlife Alert: {species.upper()}"
         }
         
-        return {
+        alert = {
             'icon': icons.get(alert_level, 'ℹ️'),
             'main_message': messages.get(alert_level, 'Alert'),
-            'timestamp': datetime.now().strftime('%H:%M:%S')
+            'timestamp': datetime.now().strftime('%H:%M:%S'),
+            'alert_level': alert_level,
+            'camera_id': camera_id
         }
+        self.history.append(alert)
+        return alert
 
 
 # ═══════════════════════════════════════════════════════════════
 # INITIALIZE SYSTEMS
 # ═══════════════════════════════════════════════════════════════
 
+if __name__ == "__main__":
+    # Only the server start drops a stale marker; importing this module
+    # (tests, scripts) must not mark a live server unready
+    clear_ready()
 detector = WildGuardDetector()
-assessor = RiskAssessor()
+road_geometry = RoadGeometry.from_file()
+assessor = RiskAssessor(road_geometry)
+if os.environ.get('WILDGUARD_CASCADE') == '1':
+    # Nano model first, escalating to the already loaded medium model
+    frame_detector = CascadeDetector(accurate_model=detector.model, road_geometry=road_geometry,
+                                     warmup_sizes=WARMUP_SIZES, predict_kwargs=detector.predict_kwargs)
+else:
+    frame_detector = detector
+if os.environ.get('WILDGUARD_ADAPTIVE_RESOLUTION') == '1':
+    # Per-camera input size from recent detections; logs per-size latency
+    frame_detector = AdaptiveDetector(frame_detector, assessor=assessor)
+ground_calibration = GroundCalibration.from_file()
 billboard = BillboardGenerator()
+frame_pool = FramePool()
+event_store = EventStore()
+atexit.register(event_store.close)
+live_stats = LiveStats()
+flight_recorder = FlightRecorder()
 
 print("✅ All detection systems initialized!\n")
 
@@ -145,53 +205,63 @@ print("✅ All detection systems initialized!\n")
 # MAIN PROCESSING FUNCTION
 # ═══════════════════════════════════════════════════════════════
 
-def process_wildlife_image(image, vehicle_speed=60):
+def process_wildlife_image(image, vehicle_speed=60, camera_id=None):
     """
-    Process wildlife image and return detection results with risk assessment
+    Process wildlife image and return detection results with risk assessment.
+    Detection and alert events are published to the alert stream hub.
+    Slow calls are captured by the flight recorder.
     """
+    trace = flight_recorder.start(model=os.path.basename(detector.weights), backend=f"torch-{getattr(detector.model, 'device', 'cpu')}",
+                                  camera_id=camera_id)
     try:
         if image is None:
             return None, "No image provided", "No alerts"
         
-        # Convert PIL to numpy if needed
-        if isinstance(image, Image.Image):
-            image = np.array(image)
-        
-        # Handle grayscale
-        if len(image.shape) == 2:
-            image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
-        
-        # Handle RGBA
-        if image.shape[2] == 4:
-            image = cv2.cvtColor(image, cv2.COLOR_RGBA2RGB)
-        
-        image_bgr = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        # Convert PIL / grayscale / RGBA / RGB to BGR in a reused buffer
+        with trace.stage('convert'):
+            image_bgr = frame_pool.to_bgr(image)
         h, w = image_bgr.shape[:2]
+        trace.set(width=w, height=h)
+        trace.set_input(image=image_bgr)
         
         # Detect animals
-        detections = detector.detect(image_bgr)
+        with trace.stage('inference'):
+            detections = frame_detector.detect(image_bgr, camera_id=camera_id)
+        trace.set(detections=len(detections))
         
         if len(detections) == 0:
-            output = image_bgr.copy()
+            alert_hub.publish('detection', {'detections': [], 'width': w, 'height': h}, camera_id)
+            output = frame_pool.annotation_copy(image_bgr)
             cv2.putText(output, "No animals detected", (50, 50),
                        cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 255), 2)
-            output_rgb = cv2.cvtColor(output, cv2.COLOR_BGR2RGB)
+            output_rgb = frame_pool.to_rgb(output)
             return output_rgb, "No animals detected", "No alerts"
         
         # Process detections
-        output = image_bgr.copy()
+        output = frame_pool.annotation_copy(image_bgr)
         results_text = f"Detected {len(detections)} animal(s)\n\n"
         billboard_alerts = []
+        stream_detections = []
         
-        # Draw road line
-        road_y = int(h * 0.75)
-        cv2.line(output, (0, road_y), (w, road_y), (0, 255, 255), 3)
-        cv2.putText(output, "ROAD LINE", (w//2 - 80, road_y + 30),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+        # Draw road line (or the camera's configured road geometry)
+        if road_geometry.has_camera(camera_id):
+            road_geometry.draw(output, camera_id)
+        else:
+            road_y = int(h * 0.75)
+            cv2.line(output, (0, road_y), (w, road_y), (0, 255, 255), 3)
+            cv2.putText(output, "ROAD LINE", (w//2 - 80, road_y + 30),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+        
+        # Metric distance / time-to-road for all detections at once
+        ground = None
+        if ground_calibration.has_camera(camera_id):
+            ground = ground_calibration.time_to_collision(camera_id, image_bgr.shape,
+                                                          [d['bbox'] for d in detections],
+                                                          [d['class'] for d in detections], vehicle_speed)
         
         # Process each detection
         for idx, det in enumerate(detections):
-            risk = assessor.assess_risk(det['bbox'], image_bgr.shape, vehicle_speed)
+            risk = assessor.assess_risk(det['bbox'], image_bgr.shape, vehicle_speed, camera_id)
             
             x1, y1, x2, y2 = det['bbox']
             
@@ -231,11 +301,31 @@ def process_wildlife_image(image, vehicle_speed=60):
             results_text += f"  Crossing Probability: {risk['crossing_probability']:.1%}\n"
             results_text += f"  Risk Score: {risk['risk_score']:.2f}/1.0\n"
             results_text += f"  Alert Level: {risk['alert_level']}\n"
-            results_text += f"  Distance to Road: {risk['distance_to_road']:.2%}\n\n"
+            results_text += f"  Distance to Road: {risk['distance_to_road']:.2%}\n"
+            if ground is not None and np.isfinite(ground['distance_m'][idx]):
+                results_text += f"  Ground Distance: {ground['distance_m'][idx]:.1f} m\n"
+                results_text += f"  Reaches Road In: {ground['time_to_road_s'][idx]:.1f} s"
+                results_text += f" (vehicle ETA {ground['vehicle_eta_s']:.1f} s)\n"
+            results_text += "\n"
+            
+            event_store.record_detection(det['class'], det['bbox'], det['confidence'],
+                                         risk['risk_score'], risk['alert_level'], camera_id)
+            live_stats.record_detection(det['class'], risk['risk_score'])
+            stream_detections.append({
+                'class': det['class'],
+                'confidence': det['confidence'],
+                'bbox': det['bbox'],
+                'risk_score': risk['risk_score'],
+                'alert_level': risk['alert_level']
+            })
             
             # Billboard alert
-            alert = billboard.generate_alert(det['class'], risk['risk_score'], risk['alert_level'])
+            alert = billboard.generate_alert(det['class'], risk['risk_score'], risk['alert_level'], camera_id)
             if alert:
+                alert_hub.publish('alert', {**alert, 'species': det['class'], 'risk_score': risk['risk_score']}, camera_id)
+                event_store.record_alert(det['class'], alert['alert_level'], risk['risk_score'],
+                                         alert['main_message'], camera_id)
+                live_stats.record_alert(camera_id)
                 billboard_msg = f"{alert['icon']} {alert['main_message']}\n"
                 billboard_msg += f"   Species: {det['class'].upper()}\n"
                 billboard_msg += f"   Risk Score: {risk['risk_score']:.2f}\n"
@@ -244,8 +334,10 @@ def process_wildlife_image(image, vehicle_speed=60):
                 billboard_msg += f"   Time: {alert['timestamp']}\n"
                 billboard_alerts.append(billboard_msg)
         
+        alert_hub.publish('detection', {'detections': stream_detections, 'width': w, 'height': h}, camera_id)
+        
         # Convert back to RGB for display
-        output_rgb = cv2.cvtColor(output, cv2.COLOR_BGR2RGB)
+        output_rgb = frame_pool.to_rgb(output)
         
         if billboard_alerts:
             billboard_text = "BILLBOARD ALERTS:\n\n" + "\n---\n\n".join(billboard_alerts)
@@ -255,7 +347,10 @@ def process_wildlife_image(image, vehicle_speed=60):
         return output_rgb, results_text, billboard_text
         
     except Exception as e:
+        trace.set(error=str(e)[:500])
         return image if image is not None else None, f"Error: {str(e)}", "Error"
+    finally:
+        trace.finish()
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -291,4 +386,11 @@ if __name__ == "__main__":
     print("=" * 60)
     print("LAUNCHING WILDGUARD SYSTEM")
     print("=" * 60 + "\n")
+    stream_host = os.environ.get('WILDGUARD_STREAM_HOST', '127.0.0.1')
+    stream_port = int(os.environ.get('WILDGUARD_STREAM_PORT', 8000))
+    start_alert_stream(alert_hub, host=stream_host, port=stream_port, live_stats=live_stats,
+                       allow_origin=os.environ.get('WILDGUARD_STREAM_ORIGIN'))
+    print(f"📡 Alert stream at http://{stream_host}:{stream_port}/events")
+    print(f"📊 Live statistics at http://{stream_host}:{stream_port}/live")
+    mark_ready()
     interface.launch(share=True)